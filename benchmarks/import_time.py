@@ -0,0 +1,76 @@
+"""Import time regression check for the CLI
+
+Runs the CLI with -X importtime in fresh interpreters and fails if startup goes over budget
+or if a command imports modules it should only load when they are used.
+
+    python benchmarks/import_time.py --runs 10 --budget-ms 150
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MAIN = Path(__file__).resolve().parent.parent.joinpath('src', 'main.py')
+
+# the modules each command must not import, matched as prefixes of the module name
+CASES: dict[str, tuple[list[str], list[str]]] = {
+    'help': (['--help'], ['addons', 'PIL', 'colorama']),
+    'items help': (['items', '--help'], ['PIL', 'colorama', 'addons.entity', 'addons.project', 'addons.custom.components']),
+    'entity help': (['entity', '--help'], ['PIL', 'addons.project', 'addons.blocks', 'addons.custom.components', 'addons.custom.templates']),
+    'blocks help': (['blocks', '--help'], ['PIL', 'addons.entity', 'addons.project', 'addons.custom.components']),
+}
+
+def run_once(args: list[str]) -> tuple[float, dict[str, int]]:
+    """Runs the CLI once and returns the wall time in ms and the cumulative import time in us of each module"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', str(MAIN), *args], cwd=MAIN.parent, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f'{" ".join(args)} exited with {proc.returncode}:\n{proc.stderr}')
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return elapsed, modules
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='runs of each case, the median is reported')
+    parser.add_argument('--budget-ms', type=float, default=None, help='fail if the median wall time of a case is above this')
+    parser.add_argument('--top', type=int, default=5, help='number of slowest imports to show for each case')
+    parser.add_argument('--json', type=Path, default=None, help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for name, (cli_args, forbidden) in CASES.items():
+        times = []
+        for _ in range(args.runs):
+            elapsed, modules = run_once(cli_args)
+            times.append(elapsed)
+        median = statistics.median(times)
+        leaked = sorted(m for m in modules if any(m == f or m.startswith(f + '.') for f in forbidden))
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        results[name] = {'median_ms': round(median, 1), 'min_ms': round(min(times), 1), 'modules': len(modules), 'leaked': leaked}
+
+        print(f'{name:<12} median {median:7.1f}ms  min {min(times):7.1f}ms  {len(modules)} modules')
+        for module, cumulative in slowest:
+            print(f'    {cumulative / 1000:7.1f}ms  {module}')
+        if leaked:
+            failed = True
+            print(f'    FAIL imports {", ".join(leaked)}')
+        if args.budget_ms is not None and median > args.budget_ms:
+            failed = True
+            print(f'    FAIL over the budget of {args.budget_ms}ms')
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=4))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
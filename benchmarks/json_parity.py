@@ -0,0 +1,82 @@
+"""Release JSON parity check
+
+Encodes documents in release mode with orjson and with the json module and fails if the bytes differ,
+since build digests and archives must not depend on whether orjson is installed.
+Covers the values the two encoders write differently, which the release encoder has to route through json,
+as well as random floats at every precision.
+
+    python benchmarks/json_parity.py --floats 100000
+"""
+import argparse
+import random
+import struct
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.joinpath('src')))
+from addons import jsonformat
+
+class _Float(float):
+    pass
+
+CASES = {
+    'small float': {'value': 1e-05},
+    'large float': {'value': 1e20},
+    'float at 1e16': [1e16, 123456789012345678.0, 1.7976931348623157e308],
+    'float at 1e-4': [0.0001, 0.00009999, 5e-324],
+    'negative zero': [-0.0],
+    'nan and infinity': [float('nan'), float('inf'), float('-inf')],
+    'integer beyond 64 bits': [1 << 64, -(1 << 63) - 1],
+    'integer at 64 bits': [(1 << 64) - 1, -(1 << 63)],
+    'integer keys': {1: 'a', 1 << 70: 'b'},
+    'float keys': {2.5: 'a', 1e-05: 'b'},
+    'float subclass': [_Float(1.5)],
+    'text': ['\x00\x1f\x7f "quoted" \\ é ✓ 🐄'],
+    'nested': {'minecraft:geometry': [{'bones': [{'pivot': [0.0, 24.000001, -1e-7], 'cubes': []}]}]}
+}
+
+def encode(data, precision: int | None, use_orjson: bool) -> bytes:
+    if use_orjson:
+        return b''.join(jsonformat.iter_json(data, release=True, precision=precision))
+    with mock.patch.object(jsonformat, '_orjson', return_value=None):
+        return b''.join(jsonformat.iter_json(data, release=True, precision=precision))
+
+def random_floats(count: int, seed: int) -> list[float]:
+    """Floats from random bits, most of them are written with an exponent so the document goes through json"""
+    rng = random.Random(seed)
+    return [struct.unpack('<d', rng.getrandbits(64).to_bytes(8, 'little'))[0] for _ in range(count)]
+
+def geometry_floats(count: int, seed: int) -> list[float]:
+    """Floats in the range of pivots, sizes and uvs, which orjson writes"""
+    rng = random.Random(seed)
+    return [rng.uniform(-1024, 1024) for _ in range(count)]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--floats', type=int, default=100000, help='the random floats encoded at each precision')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if jsonformat._orjson() is None:
+        print('orjson is not installed, release JSON is always written by the json module')
+        return 0
+
+    cases = dict(CASES)
+    cases['random floats'] = random_floats(args.floats, args.seed)
+    cases['geometry floats'] = geometry_floats(args.floats, args.seed)
+    failed = False
+    for precision in [None, jsonformat.DEFAULT_PRECISION, 2]:
+        for name, data in cases.items():
+            try:
+                expected = encode(data, precision, False)
+            except (ValueError, TypeError):
+                continue # the json module cannot write it either, so there is nothing to compare
+            actual = encode(data, precision, True)
+            if actual != expected:
+                failed = True
+                print(f'MISMATCH {name} at precision {precision}: {actual[:200]!r} != {expected[:200]!r}')
+    print('release JSON differs between encoders' if failed else 'release JSON is the same with and without orjson')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Timing suite for the define and package commands on synthetic projects
+
+Generates a project at each scale, runs the commands on it in fresh interpreters like a user would
+and reports the wall time of each. Commands run on single files are timed on an evenly spaced sample.
+Results can be written to JSON and compared with the results of another version.
+
+    python benchmarks/suite.py --scales 10 1000 10000 --json results.json
+    python benchmarks/suite.py --scales 10 1000 --compare results.json
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from synthetic import NAMESPACE, SRC, SyntheticProject, generate_project
+
+MAIN = SRC.joinpath('main.py')
+
+@dataclass
+class Case:
+    """A command timed at every scale, run once for each list of arguments"""
+    name: str
+    runs: list[list[str]]
+    items: int
+
+def _sample(paths: list[Path], size: int) -> list[Path]:
+    """Evenly spaced paths, so the sample covers files defined early and late in the project"""
+    if len(paths) <= size:
+        return list(paths)
+    step = len(paths) / size
+    return [paths[int(index * step)] for index in range(size)]
+
+def cases(project: SyntheticProject, sample: int) -> list[Case]:
+    rp, bp = str(project.rp_path), str(project.bp_path)
+    entities = _sample(project.entities, sample)
+    with_sounds = [path for path in entities if project.rp_path.joinpath('sounds', 'entity', path.stem).is_dir()]
+    return [
+        Case('define_block_sounds', [['blocks', 'sounds', rp, NAMESPACE]], len(project.blocks)),
+        Case('entity define-all', [['entity', 'define-all', rp, bp]], len(project.entities)),
+        Case('entity define-all cached', [['entity', 'define-all', rp, bp]], len(project.entities)),
+        Case('entity define', [['entity', 'define', rp, str(path), '--force'] for path in entities], len(entities)),
+        Case('implement_sounds', [['entity', 'add-sounds', rp, path.stem] for path in with_sounds], len(with_sounds)),
+        Case('blocks define', [['blocks', 'define', str(path), rp, 'Bench', '--answers', str(project.answers)] for path in _sample(project.blocks, sample)], min(sample, len(project.blocks))),
+        Case('blocks define-all', [['blocks', 'define-all', bp, rp, 'Bench', '--answers', str(project.answers)]], len(project.blocks)),
+        Case('items define', [['items', 'define', str(path), rp] for path in _sample(project.items, sample)], min(sample, len(project.items))),
+        Case('project package', [['project', 'package', 'Bench Package', 'A synthetic world', str(project.art_zip), str(project.world)]], 1)
+    ]
+
+def run_case(case: Case) -> dict:
+    """Runs every command of a case and returns its total, median and slowest time in ms"""
+    times = []
+    for args in case.runs:
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, str(MAIN), *args], cwd=MAIN.parent, capture_output=True, text=True)
+        times.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            return {'error': f'{" ".join(args[:2])} exited with {proc.returncode}: {(proc.stderr or proc.stdout).strip()[-500:]}'}
+    return {
+        'runs': len(times),
+        'items': case.items,
+        'total_ms': round(sum(times), 1),
+        'median_ms': round(statistics.median(times), 1) if times else None,
+        'max_ms': round(max(times), 1) if times else None
+    }
+
+def startup_ms(runs: int = 5) -> float:
+    """The median time of `--help`, which every timed command pays before doing any work"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(MAIN), '--help'], cwd=MAIN.parent, capture_output=True, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 1)
+
+def _version() -> dict:
+    info = {'python': platform.python_version(), 'platform': platform.platform()}
+    sys.path.insert(0, str(SRC))
+    import addons
+    info['version'] = addons.__version__
+    try:
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SRC, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info['commit'] = None
+    return info
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lists the cases whose median is more than tolerance times slower than in the baseline"""
+    regressions = []
+    for scale, scale_results in results['scales'].items():
+        for name, result in scale_results['cases'].items():
+            before = baseline.get('scales', {}).get(scale, {}).get('cases', {}).get(name, {})
+            if result.get('median_ms') and before.get('median_ms') and result['median_ms'] > before['median_ms'] * tolerance:
+                regressions.append(f'{name} at {scale}: {before["median_ms"]}ms -> {result["median_ms"]}ms')
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 1000, 10000], help='the number of entities of each project, blocks and items are a quarter of it')
+    parser.add_argument('--sample', type=int, default=20, help='the files the single file commands are run on at each scale')
+    parser.add_argument('--workdir', type=Path, default=None, help='where projects are generated, a temporary folder by default')
+    parser.add_argument('--keep', action='store_true', help='keep the generated projects')
+    parser.add_argument('--json', type=Path, default=None, help='also write the results to this file')
+    parser.add_argument('--compare', type=Path, default=None, help='fail if a case is slower than in these results')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='how many times slower than the compared results a case may be')
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix='mcbe-bench-'))
+    results = {**_version(), 'startup_ms': startup_ms(), 'sample': args.sample, 'scales': {}}
+    print(f'startup {results["startup_ms"]:.1f}ms')
+    failed = False
+    for scale in args.scales:
+        start = time.perf_counter()
+        project = generate_project(workdir.joinpath(str(scale)), entities=scale, blocks=max(1, scale // 4), items=max(1, scale // 4), sounds=scale // 2)
+        generated = time.perf_counter() - start
+        print(f'\n{scale} entities, {len(project.blocks)} blocks, {len(project.items)} items (generated in {generated:.1f}s)')
+        scale_results = {'entities': scale, 'blocks': len(project.blocks), 'items': len(project.items), 'cases': {}}
+        for case in cases(project, args.sample):
+            result = run_case(case)
+            scale_results['cases'][case.name] = result
+            if 'error' in result:
+                failed = True
+                print(f'  {case.name:<26} FAIL {result["error"]}')
+            else:
+                print(f'  {case.name:<26} total {result["total_ms"]:>10.1f}ms  median {result["median_ms"]:>9.1f}ms  over {result["runs"]} runs of {result["items"]} items')
+        results['scales'][str(scale)] = scale_results
+        if not args.keep:
+            shutil.rmtree(project.root, ignore_errors=True)
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=4))
+    if args.compare is not None:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Synthetic project generator for the benchmarks
+
+Creates a project with the layout of `project create` and fills it with entities that have a geometry,
+animations, an animation controller and a texture or an array of textures, blocks with a texture per face,
+items and entity sound folders. The same seed always produces the same project.
+
+    python benchmarks/synthetic.py /tmp/bench --entities 1000 --blocks 250 --items 250 --sounds 500
+"""
+import argparse
+import io
+import json
+import random
+import shutil
+import sys
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent.joinpath('src')
+NAMESPACE = 'bench'
+PROJECT_NAME = 'Bench Project'
+ENTITY_EVENTS = ['ambient', 'hurt', 'death', 'step']
+BLOCK_EVENTS = ['break', 'hit']
+BLOCK_FACES = {'up': 'up', 'down': 'down', 'side': '*'}
+
+@dataclass
+class SyntheticProject:
+    """The paths of a generated project and the files the benchmarks run the define commands on"""
+    root: Path
+    bp_path: Path
+    rp_path: Path
+    answers: Path
+    world: Path
+    art_zip: Path
+    entities: list[Path] = field(default_factory=list)
+    blocks: list[Path] = field(default_factory=list)
+    items: list[Path] = field(default_factory=list)
+
+def _png(width: int, height: int, color: tuple[int, int, int, int]) -> bytes:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGBA', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def _jpeg(width: int, height: int, seed: int) -> bytes:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.effect_noise((width, height), 32 + seed % 64).convert('RGB').save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+def _ogg(rng: random.Random) -> bytes:
+    # only the capture pattern is real, no command decodes sounds and the sizes vary like real files do
+    return b'OggS' + rng.randbytes(rng.randint(2_000, 20_000))
+
+def _write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=4), encoding='UTF-8')
+
+def _bone(rng: random.Random, index: int, parent: str | None) -> dict:
+    bone = {
+        'name': f'bone{index}',
+        'pivot': [rng.randint(-8, 8), rng.randint(0, 24), rng.randint(-8, 8)],
+        'cubes': [
+            {'origin': [rng.randint(-8, 8), rng.randint(0, 24), rng.randint(-8, 8)], 'size': [rng.randint(1, 8) for _ in range(3)], 'uv': [rng.randint(0, 48), rng.randint(0, 48)]}
+            for _ in range(rng.randint(1, 6))
+        ]
+    }
+    if parent is not None:
+        bone['parent'] = parent
+    if rng.random() < 0.2:
+        bone['locators'] = {f'locator{index}': [rng.randint(-8, 8), rng.randint(0, 24), rng.randint(-8, 8)]}
+    return bone
+
+def _entity(rng: random.Random, rp_path: Path, bp_path: Path, name: str, textures: dict[str, bytes]) -> Path:
+    identifier = f'{NAMESPACE}:{name}'
+    entity_file = bp_path.joinpath('entities', f'{name}.json')
+    _write_json(entity_file, {
+        'format_version': '1.19.0',
+        'minecraft:entity': {
+            'description': {'identifier': identifier, 'is_spawnable': True, 'is_summonable': True},
+            'components': {
+                'minecraft:health': {'value': rng.randint(4, 40)},
+                'minecraft:movement': {'value': round(rng.uniform(0.1, 0.4), 2)},
+                'minecraft:collision_box': {'width': round(rng.uniform(0.4, 2), 1), 'height': round(rng.uniform(0.4, 2), 1)},
+                'minecraft:physics': {}
+            }
+        }
+    })
+
+    bones = [_bone(rng, 0, None)]
+    for index in range(1, rng.randint(3, 12)):
+        bones.append(_bone(rng, index, bones[rng.randrange(len(bones))]['name']))
+    _write_json(rp_path.joinpath('models', 'entity', f'{name}.geo.json'), {
+        'format_version': '1.12.0',
+        'minecraft:geometry': [{
+            'description': {'identifier': f'geometry.{name}', 'texture_width': 64, 'texture_height': 64, 'visible_bounds_width': 2, 'visible_bounds_height': 2},
+            'bones': bones
+        }]
+    })
+
+    animations = {}
+    for animation in ['idle', 'walk', 'attack', 'death'][:rng.randint(2, 4)]:
+        animations[f'animation.{name}.{animation}'] = {
+            'loop': animation != 'death',
+            'animation_length': 1.0,
+            'bones': {
+                bone['name']: {'rotation': {f'{time:.2f}': [rng.randint(-45, 45), 0, 0] for time in (0.0, 0.5, 1.0)}}
+                for bone in rng.sample(bones, min(len(bones), 4))
+            }
+        }
+    _write_json(rp_path.joinpath('animations', f'{name}.animation.json'), {'format_version': '1.8.0', 'animations': animations})
+    _write_json(rp_path.joinpath('animation_controllers', f'{name}.animation_controllers.json'), {
+        'format_version': '1.10.0',
+        'animation_controllers': {
+            f'controller.animation.{name}.move': {
+                'initial_state': 'default',
+                'states': {
+                    'default': {'animations': ['idle'], 'transitions': [{'walking': 'q.modified_move_speed > 0.1'}]},
+                    'walking': {'animations': ['walk'], 'transitions': [{'default': 'q.modified_move_speed <= 0.1'}]}
+                }
+            }
+        }
+    })
+
+    # a third of the entities have variants, which define writes as a texture array in a render controller
+    variants = rng.randint(2, 4) if rng.random() < 1 / 3 else 0
+    if variants:
+        for variant in range(variants):
+            path = rp_path.joinpath('textures', 'entity', name, f'{name}_v{variant}.png')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(textures['entity'])
+    else:
+        rp_path.joinpath('textures', 'entity', f'{name}.png').write_bytes(textures['entity'])
+    return entity_file
+
+def _block(rng: random.Random, rp_path: Path, bp_path: Path, name: str, textures: dict[str, bytes], answers: dict) -> Path:
+    identifier = f'{NAMESPACE}:{name}'
+    block_file = bp_path.joinpath('blocks', f'{name}.json')
+    _write_json(block_file, {
+        'format_version': '1.19.30',
+        'minecraft:block': {
+            'description': {'identifier': identifier},
+            'components': {
+                'minecraft:destructible_by_mining': {'seconds_to_destroy': round(rng.uniform(0.5, 5), 1)},
+                'minecraft:map_color': f'#{rng.randrange(1 << 24):06x}'
+            }
+        }
+    })
+    folder = rp_path.joinpath('textures', 'blocks', name)
+    folder.mkdir(parents=True, exist_ok=True)
+    for face in BLOCK_FACES:
+        folder.joinpath(f'{name}_{face}.png').write_bytes(textures['block'])
+    answers[identifier] = {'faces': BLOCK_FACES}
+    return block_file
+
+def _item(rp_path: Path, bp_path: Path, name: str, textures: dict[str, bytes]) -> Path:
+    item_file = bp_path.joinpath('items', f'{name}.json')
+    _write_json(item_file, {
+        'format_version': '1.16.100',
+        'minecraft:item': {
+            'description': {'identifier': f'{NAMESPACE}:{name}', 'category': 'Items'},
+            'components': {'minecraft:icon': {'texture': name}, 'minecraft:max_stack_size': 64}
+        }
+    })
+    rp_path.joinpath('textures', 'items', f'{name}.png').write_bytes(textures['item'])
+    return item_file
+
+def _world(rng: random.Random, world: Path, bp_path: Path, rp_path: Path) -> None:
+    """A world folder holding the project's packs, like a world template is submitted with"""
+    world.joinpath('db').mkdir(parents=True)
+    world.joinpath('level.dat').write_bytes(rng.randbytes(4_096))
+    world.joinpath('level.dat_old').write_bytes(rng.randbytes(4_096))
+    world.joinpath('levelname.txt').write_text(PROJECT_NAME)
+    for index in range(8):
+        world.joinpath('db', f'{index:06d}.ldb').write_bytes(rng.randbytes(256_000))
+    for name in ['CURRENT', 'LOCK', 'MANIFEST-000001']:
+        world.joinpath('db', name).write_bytes(rng.randbytes(64))
+    shutil.copytree(bp_path, world.joinpath('behavior_packs', bp_path.name))
+    shutil.copytree(rp_path, world.joinpath('resource_packs', rp_path.name))
+
+def _art_zip(art_zip: Path, screenshots: int = 5) -> None:
+    with zipfile.ZipFile(art_zip, 'w') as archive:
+        for index in range(screenshots):
+            archive.writestr(f'art/screenshot_{index}.jpg', _jpeg(1920, 1080, index))
+        archive.writestr('art/keyart.jpg', _jpeg(1920, 1080, 100))
+        archive.writestr('art/panorama.jpg', _jpeg(2048, 450, 101))
+        archive.writestr('art/partnerart.jpg', _jpeg(1920, 1080, 102))
+
+def generate_project(root: Path, *, entities: int, blocks: int, items: int, sounds: int, seed: int = 0) -> SyntheticProject:
+    """
+    Writes a synthetic project, replacing anything already in root
+
+    :param entities: the number of entities
+    :param blocks: the number of blocks, each with an up, down and side texture
+    :param items: the number of items, each with an icon
+    :param sounds: the number of entities with a sound folder, the blocks get half as many
+    :param seed: the seed of everything random in the project
+    """
+    if str(SRC) not in sys.path:
+        sys.path.insert(0, str(SRC))
+    from addons import project # the layout comes from the command itself so the benchmarks follow it when it changes
+
+    root = Path(root).absolute()
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True)
+    project.projects_path = root
+    project.create(PROJECT_NAME, gt=False)
+    pack_name = PROJECT_NAME.lower().replace(' ', '_')
+    project_path = root.joinpath(PROJECT_NAME)
+    bp_path = project_path.joinpath(f'{pack_name}_BP')
+    rp_path = project_path.joinpath(f'{pack_name}_RP')
+    for folder in ['entity', 'render_controllers', 'texts']:
+        rp_path.joinpath(folder).mkdir(parents=True, exist_ok=True)
+    rp_path.joinpath('texts', 'en_US.lang').write_text('')
+
+    rng = random.Random(seed)
+    textures = {'entity': _png(64, 64, (200, 120, 80, 255)), 'block': _png(16, 16, (90, 90, 90, 255)), 'item': _png(16, 16, (40, 160, 220, 255))}
+    result = SyntheticProject(root, bp_path, rp_path, project_path.joinpath('answers.json'), root.joinpath('world'), root.joinpath('art.zip'))
+    answers: dict = {}
+    entity_names = [f'mob_{index}' for index in range(entities)]
+    for name in entity_names:
+        result.entities.append(_entity(rng, rp_path, bp_path, name, textures))
+    for name in entity_names[:sounds]:
+        for event in ENTITY_EVENTS:
+            path = rp_path.joinpath('sounds', 'entity', name, f'{event}.ogg')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(_ogg(rng))
+    for index in range(blocks):
+        result.blocks.append(_block(rng, rp_path, bp_path, f'block_{index}', textures, answers))
+        if index < sounds // 2:
+            for event in BLOCK_EVENTS:
+                path = rp_path.joinpath('sounds', 'block', f'block_{index}', f'{event}.ogg')
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(_ogg(rng))
+    for index in range(items):
+        result.items.append(_item(rp_path, bp_path, f'item_{index}', textures))
+    _write_json(result.answers, answers)
+    _world(rng, result.world, bp_path, rp_path)
+    _art_zip(result.art_zip)
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', type=Path, help='the folder the project is written to, replaced if it exists')
+    parser.add_argument('--entities', type=int, default=10)
+    parser.add_argument('--blocks', type=int, default=None, help='defaults to a quarter of the entities')
+    parser.add_argument('--items', type=int, default=None, help='defaults to a quarter of the entities')
+    parser.add_argument('--sounds', type=int, default=None, help='the entities with a sound folder, defaults to half of them')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    project = generate_project(
+        args.root, entities=args.entities, seed=args.seed,
+        blocks=args.blocks if args.blocks is not None else max(1, args.entities // 4),
+        items=args.items if args.items is not None else max(1, args.entities // 4),
+        sounds=args.sounds if args.sounds is not None else args.entities // 2
+    )
+    print(f'{len(project.entities)} entities, {len(project.blocks)} blocks and {len(project.items)} items in {project.bp_path.parent}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,12 @@
-from . import blocks
-from . import errors
-from . import items
-from . import sounds
-from . import project
-from . import helpers
-from .config import config
\ No newline at end of file
+__version__ = '0.2.0'
+
+from importlib import import_module
+from .config import config
+
+_submodules = {'blocks', 'errors', 'items', 'sounds', 'project', 'helpers'}
+
+def __getattr__(name: str):
+    """Imports the submodules on first use so importing addons for one command does not load all of them"""
+    if name in _submodules:
+        return import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""Answers to the questions the define commands would otherwise prompt the user for"""
+import sys
+from pathlib import Path
+from typing import Any, Callable
+from addons.errors import MissingAnswerError
+from addons.helpers import data_from_file
+
+_interactive: bool | None = None
+
+def set_interactive(interactive: bool | None) -> None:
+    """Sets whether unanswered questions fall back to prompting the user
+
+    :param interactive: None to prompt only when stdin is a terminal
+    """
+    global _interactive
+    _interactive = interactive
+
+def is_interactive() -> bool:
+    if _interactive is None:
+        return sys.stdin is not None and sys.stdin.isatty()
+    return _interactive
+
+def ask(question: str, answer: Any = None, *, cast: Callable[[str], Any] = str, choices: list[str] = None) -> Any:
+    """Returns the given answer or prompts the user for it when running interactively
+
+    :param question: the prompt shown to the user
+    :param answer: the answer given ahead of time, if any
+    :param cast: converts the answer to the type required
+    :param choices: the valid answers, the user is asked again until one is given
+    :raises MissingAnswerError: if there is no answer and the user cannot be prompted
+    """
+    if answer is not None:
+        answer = cast(answer)
+        if choices is not None and answer not in choices:
+            raise MissingAnswerError(f'{answer} is not a valid answer to "{question}", choose from {choices}')
+        return answer
+    if not is_interactive():
+        raise MissingAnswerError(f'No answer was given for "{question}"')
+    answer = cast(input(question))
+    while choices is not None and answer not in choices:
+        print(f'Invalid answer, please try again and choose from {choices}')
+        answer = cast(input(question))
+    return answer
+
+class Answers:
+    """The decisions for every define prompt, keyed by the identifier of the entity or block
+
+    An answers file is a JSON or YAML mapping like:
+
+        custom:cow:
+          materials: {entity_alphatest: default, entity_emissive: glow}  # material: short name
+          bones: {glow: [eyes, horns]}                                   # material short name: bones
+        custom:ore:
+          faces: {top: up, side: '*'}                                    # texture short name: face
+          weights: {ore_0: 10, ore_1: 1}                                 # texture file name: weight
+        templates:
+          car.json: custom:car                                           # entity file name: identifier
+    """
+    def __init__(self, data: dict[str, Any] = None):
+        self.__data: dict[str, Any] = data or {}
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'Answers':
+        """Loads an answers file, YAML files require PyYAML to be installed"""
+        path = Path(path)
+        if path.suffix in ['.yaml', '.yml']:
+            try:
+                import yaml
+            except ImportError as exc:
+                raise MissingAnswerError('PyYAML must be installed to read a YAML answers file') from exc
+            with path.open('r', encoding='UTF-8') as f:
+                return cls(yaml.safe_load(f))
+        return cls(data_from_file(path))
+
+    @property
+    def data(self) -> dict[str, Any]:
+        return self.__data
+
+    def get(self, identifier: str) -> dict[str, Any]:
+        """Returns the answers given for an entity or block"""
+        return self.__data.get(identifier) or {}
+
+    def template_identifier(self, entity_file: Path) -> str | None:
+        """Returns the identifier to give the template generated at an entity file"""
+        return (self.__data.get('templates') or {}).get(Path(entity_file).name)
@@ -0,0 +1,93 @@
+"""Writes .mcpack, .mcaddon and .mctemplate archives straight from pack folders"""
+import os
+import shutil
+import zipfile
+from pathlib import Path
+from addons import jsonformat
+from addons.assets import CACHE_DIR
+
+STORED_SUFFIXES = {'.png', '.jpg', '.jpeg', '.ogg', '.fsb', '.zip', '.mcpack'} # already compressed, deflating again only costs time
+EXCLUDED_NAMES = {CACHE_DIR, '__pycache__', '.git', '.DS_Store', 'Thumbs.db'}
+_FIXED_DATE = (1980, 1, 1, 0, 0, 0) # the earliest date a zip can store, so the archive does not depend on file mtimes
+
+class PackArchive:
+    """Collects files and writes them into a zip archive in a deterministic order
+
+    Entries are sorted by name and written with a fixed timestamp and permissions,
+    so the same inputs always produce a byte identical archive.
+    Already compressed files are stored as is and JSON is deflated at json_level.
+    JSON is also minified when minify_json is set, by default when the release mode of jsonformat is set.
+    """
+    def __init__(self, dest: Path, *, json_level: int = 9, minify_json: bool = None):
+        self.__dest: Path = Path(dest)
+        self.__json_level: int = json_level
+        self.__minify_json: bool = jsonformat.is_release() if minify_json is None else minify_json
+        self.__entries: dict[str, Path | bytes] = {}
+
+    @property
+    def dest(self) -> Path:
+        return self.__dest
+
+    def add_file(self, arcname: str, path: Path) -> None:
+        self.__entries[arcname] = Path(path)
+
+    def add_bytes(self, arcname: str, data: bytes) -> None:
+        self.__entries[arcname] = data
+
+    def add_tree(self, folder: Path, prefix: str = '', *, exclude: set[str] = frozenset()) -> None:
+        """Adds every file in a folder, skipping cache folders and any file or folder named in exclude
+
+        :param folder: the folder to add
+        :param prefix: the folder inside the archive the files are added to
+        :param exclude: names of files and folders to leave out
+        """
+        folder = Path(folder)
+        skip = EXCLUDED_NAMES | set(exclude)
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [d for d in dirs if d not in skip]
+            rel_root = Path(root).relative_to(folder).as_posix()
+            for name in files:
+                if name in skip:
+                    continue
+                rel_path = name if rel_root == '.' else f'{rel_root}/{name}'
+                self.__entries[f'{prefix}/{rel_path}' if prefix else rel_path] = Path(root, name)
+
+    def write(self) -> Path:
+        """Writes the archive, streaming files from disk one at a time
+
+        :returns: the path of the archive written
+        """
+        self.__dest.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(self.__dest, 'w') as archive:
+            for arcname in sorted(self.__entries):
+                source = self.__entries[arcname]
+                suffix = os.path.splitext(arcname)[1].lower()
+                info = zipfile.ZipInfo(arcname, date_time=_FIXED_DATE)
+                info.create_system = 3
+                info.external_attr = 0o644 << 16
+                info.compress_type = zipfile.ZIP_STORED if suffix in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+                if suffix == '.json':
+                    data = source if isinstance(source, bytes) else source.read_bytes()
+                    if self.__minify_json:
+                        data = jsonformat.minify(data)
+                    archive.writestr(info, data, compresslevel=self.__json_level)
+                elif isinstance(source, bytes):
+                    archive.writestr(info, source)
+                else:
+                    info.file_size = source.stat().st_size
+                    with source.open('rb') as src, archive.open(info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+        return self.__dest
+
+def write_pack(folder: Path, dest: Path, *, json_level: int = 9, exclude: set[str] = frozenset()) -> Path:
+    """Writes a single pack or world template folder to a .mcpack or .mctemplate archive"""
+    archive = PackArchive(dest, json_level=json_level)
+    archive.add_tree(folder, exclude=exclude)
+    return archive.write()
+
+def write_addon(packs: list[Path], dest: Path, *, json_level: int = 9) -> Path:
+    """Writes several pack folders into one .mcaddon archive, each under its folder name"""
+    archive = PackArchive(dest, json_level=json_level)
+    for pack in packs:
+        archive.add_tree(pack, Path(pack).name)
+    return archive.write()
@@ -0,0 +1,301 @@
+"""Persistent, incrementally updated index of the assets in a resource or behavior pack"""
+import fnmatch
+import hashlib
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+from addons import metrics
+from addons.transaction import write_atomic
+
+CACHE_DIR = '.mcbe_cache'
+INDEX_FILE = 'assets.json'
+INDEX_VERSION = 1
+
+ASSET_KINDS = {
+    '.png': 'texture',
+    '.tga': 'texture',
+    '.jpg': 'texture',
+    '.jpeg': 'texture',
+    '.ogg': 'sound',
+    '.wav': 'sound',
+    '.fsb': 'sound',
+    '.json': 'json',
+    '.lang': 'lang',
+    '.mcfunction': 'function',
+    '.js': 'script'
+}
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+@dataclass
+class Asset:
+    """A single file recorded in the asset index"""
+    path: str
+    kind: str
+    size: int
+    mtime: int
+    hash: str
+    width: int | None = None
+    height: int | None = None
+
+def read_png_size(path: Path) -> tuple[int, int] | None:
+    """Reads the dimensions of a png from its IHDR chunk without decoding the image
+
+    :param path: the path to the png file
+    :returns: the (width, height) of the image or None if the file is not a png
+    """
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    return _png_size(header)
+
+def _png_size(header: bytes) -> tuple[int, int] | None:
+    if len(header) < 24 or not header.startswith(_PNG_SIGNATURE) or header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+def _hash_file(path: str) -> tuple[str, tuple[int, int] | None]:
+    """Hashes the contents of a file and reads its image dimensions if it is a png"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        header = f.read(65536)
+        digest.update(header)
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest(), _png_size(header) if path.endswith('.png') else None
+
+class AssetIndex:
+    """Index of every file in a pack, stored in the pack's cache folder
+
+    Every directory is re-listed on refresh and files are only re-hashed when their size or mtime changes,
+    so refreshing an unchanged pack costs one scandir per directory and one stat per file.
+    Files edited in place are caught as well, since their own size or mtime changes even when their directory's does not.
+    """
+    def __init__(self, root: Path):
+        self.__root: Path = Path(root).absolute()
+        self.__index_path: Path = self.__root.joinpath(CACHE_DIR, INDEX_FILE)
+        self.__dirs: dict[str, dict] = {}
+        self.__dirty: bool = False
+        self.__load()
+
+    @property
+    def root(self) -> Path:
+        return self.__root
+
+    def __load(self) -> None:
+        if not self.__index_path.is_file():
+            return
+        try:
+            with self.__index_path.open('r', encoding='UTF-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.__dirs = data.get('dirs', {})
+
+    def save(self) -> None:
+        """Writes the index to the pack's cache folder if it has changed"""
+        if not self.__dirty:
+            return
+        self.__index_path.parent.mkdir(exist_ok=True)
+        write_atomic(self.__index_path, json.dumps({'version': INDEX_VERSION, 'dirs': self.__dirs}, separators=(',', ':')).encode('UTF-8'))
+        self.__dirty = False
+
+    def refresh(self, *, deep: bool = False) -> None:
+        """Brings the index up to date with the pack on disk
+
+        :param deep: re-hash every file, even those whose size and mtime are unchanged
+        """
+        seen: set[str] = set()
+        pending: list[tuple[dict, str, str]] = []
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                mtime = os.stat(self.__abs(rel_dir)).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            previous = self.__dirs.get(rel_dir)
+            entry = self.__scan_dir(rel_dir, mtime, None if deep else previous, pending)
+            if entry != previous:
+                self.__dirs[rel_dir] = entry
+                self.__dirty = True
+            seen.add(rel_dir)
+            stack.extend(self.__join(rel_dir, name) for name in entry['dirs'])
+
+        for rel_dir in set(self.__dirs) - seen:
+            del self.__dirs[rel_dir]
+            self.__dirty = True
+
+        if pending:
+            with ThreadPoolExecutor() as pool:
+                results = pool.map(_hash_file, [path for _, _, path in pending])
+                for (files, name, _), (digest, size) in zip(pending, results):
+                    files[name]['hash'] = digest
+                    if size is not None:
+                        files[name]['width'], files[name]['height'] = size
+
+    def __scan_dir(self, rel_dir: str, mtime: int, previous: dict | None, pending: list) -> dict:
+        """Lists a directory, reusing the hashes of files that have not changed since the last scan"""
+        old_files: dict[str, dict] = previous['files'] if previous else {}
+        dirs: list[str] = []
+        files: dict[str, dict] = {}
+        with os.scandir(self.__abs(rel_dir)) as it:
+            for item in it:
+                if item.is_dir():
+                    if item.name != CACHE_DIR:
+                        dirs.append(item.name)
+                    continue
+                stat = item.stat()
+                old = old_files.get(item.name)
+                if old is not None and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns:
+                    files[item.name] = old
+                    continue
+                files[item.name] = {
+                    'kind': ASSET_KINDS.get(os.path.splitext(item.name)[1].lower(), 'other'),
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime_ns,
+                    'hash': ''
+                }
+                pending.append((files, item.name, item.path))
+        return {'mtime': mtime, 'dirs': sorted(dirs), 'files': files}
+
+    def __abs(self, rel_path: str) -> str:
+        return os.path.join(str(self.__root), *rel_path.split('/')) if rel_path else str(self.__root)
+
+    @staticmethod
+    def __join(rel_dir: str, name: str) -> str:
+        return f'{rel_dir}/{name}' if rel_dir else name
+
+    def __rel(self, path: Path) -> str | None:
+        """Converts a path to its index key, None if the path is outside of the pack"""
+        try:
+            rel = Path(path).absolute().relative_to(self.__root)
+        except ValueError:
+            return None
+        return rel.as_posix() if rel.parts else ''
+
+    def contains(self, path: Path) -> bool:
+        """Whether a path is inside the pack this index covers"""
+        return self.__rel(path) is not None
+
+    def is_dir(self, path: Path) -> bool:
+        rel = self.__rel(path)
+        return rel is not None and rel in self.__dirs
+
+    def is_file(self, path: Path) -> bool:
+        rel = self.__rel(path)
+        if not rel:
+            return False
+        parent, _, name = rel.rpartition('/')
+        entry = self.__dirs.get(parent)
+        return entry is not None and name in entry['files']
+
+    def get(self, path: Path) -> Asset | None:
+        """Returns the indexed record of a single file"""
+        rel = self.__rel(path)
+        if not rel:
+            return None
+        parent, _, name = rel.rpartition('/')
+        entry = self.__dirs.get(parent)
+        if entry is None or name not in entry['files']:
+            return None
+        return Asset(rel, **entry['files'][name])
+
+    def assets(self, folder: Path = None, pattern: str = '*', *, recursive: bool = True, kind: str = None) -> list[Asset]:
+        """Returns the indexed records of the files in a folder, sorted by path
+
+        :param folder: the folder to search, defaults to the pack root
+        :param pattern: a glob pattern the file names must match
+        :param recursive: whether to include files in sub-folders
+        :param kind: only return assets of this kind, e.g. texture or sound
+        """
+        rel = '' if folder is None else self.__rel(folder)
+        if rel is None or rel not in self.__dirs:
+            return []
+        found = []
+        stack = [rel]
+        while stack:
+            rel_dir = stack.pop()
+            entry = self.__dirs.get(rel_dir)
+            if entry is None:
+                continue
+            for name, record in entry['files'].items():
+                if fnmatch.fnmatchcase(name, pattern) and (kind is None or record['kind'] == kind):
+                    found.append(Asset(self.__join(rel_dir, name), **record))
+            if recursive:
+                stack.extend(self.__join(rel_dir, name) for name in entry['dirs'])
+        return sorted(found, key=lambda asset: asset.path)
+
+    def glob(self, folder: Path, pattern: str = '*') -> list[Path]:
+        """Index backed equivalent of Path.glob that only returns files"""
+        if not self.contains(folder):
+            return sorted(f for f in Path(folder).glob(pattern) if f.is_file())
+        return [self.__root.joinpath(asset.path) for asset in self.assets(folder, pattern, recursive=False)]
+
+    def rglob(self, folder: Path, pattern: str = '*') -> list[Path]:
+        """Index backed equivalent of Path.rglob that only returns files"""
+        if not self.contains(folder):
+            return sorted(f for f in Path(folder).rglob(pattern) if f.is_file())
+        return [self.__root.joinpath(asset.path) for asset in self.assets(folder, pattern)]
+
+    def subdirs(self, folder: Path) -> list[Path]:
+        """Returns the sub-folders of a folder"""
+        if not self.contains(folder):
+            return sorted(d for d in Path(folder).glob('*') if d.is_dir())
+        entry = self.__dirs.get(self.__rel(folder))
+        return [Path(folder).joinpath(name) for name in entry['dirs']] if entry else []
+
+    def signature(self, folder: Path) -> str | None:
+        """Hashes the mtimes of a folder and every folder below it
+
+        The signature changes whenever a file or folder is added, removed or renamed anywhere in the tree,
+        but not when a file is edited in place. Returns None for folders outside of the pack or missing from it.
+        """
+        rel = self.__rel(folder)
+        if rel is None or rel not in self.__dirs:
+            return None
+        digest = hashlib.sha1()
+        stack = [rel]
+        while stack:
+            rel_dir = stack.pop()
+            entry = self.__dirs.get(rel_dir)
+            if entry is None:
+                continue
+            digest.update(f'{rel_dir}\0{entry["mtime"]}\0'.encode('UTF-8'))
+            stack.extend(self.__join(rel_dir, name) for name in entry['dirs'])
+        return digest.hexdigest()
+
+    def walk(self, folder: Path) -> Iterator[tuple[str, list[str], list[str]]]:
+        """Index backed equivalent of os.walk, top-down with sorted names"""
+        if not self.contains(folder):
+            yield from os.walk(str(folder))
+            return
+        stack = [self.__rel(folder)]
+        while stack:
+            rel_dir = stack.pop()
+            entry = self.__dirs.get(rel_dir)
+            if entry is None:
+                continue
+            yield self.__abs(rel_dir), list(entry['dirs']), sorted(entry['files'])
+            stack.extend(self.__join(rel_dir, name) for name in reversed(entry['dirs']))
+
+_indexes: dict[Path, AssetIndex] = {}
+
+def get_index(pack_path: Path) -> AssetIndex:
+    """Returns the asset index of a pack, refreshed and saved once per process
+
+    :param pack_path: the root folder of the resource or behavior pack
+    """
+    root = Path(pack_path).absolute()
+    index = _indexes.get(root)
+    if index is None:
+        index = AssetIndex(root)
+        with metrics.phase('index_refresh'):
+            index.refresh()
+            index.save()
+        _indexes[root] = index
+    return index
@@ -1,9 +1,17 @@
 import typer
 import os
+from colorama import Fore, Style
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import addons.helpers as helpers
+from addons import metrics
+from .answers import Answers, ask, set_interactive
+from .assets import get_index
+from .lang import LangFile
 from .sounds import define_block_sounds
+from .transaction import transaction
 
 app = typer.Typer()
 
@@ -36,6 +44,19 @@ class Block:
     def build(self, file_path: Path):
         helpers.write_to_file(file_path, self.__data)
 
+@dataclass
+class BlockDefinition:
+    """The resource pack entries of one block, kept apart from the shared files so many blocks can be merged into them at once"""
+    behavior_file: Path
+    block: Block
+    blocks_entry: dict = field(default_factory=dict)
+    texture_data: dict[str, dict] = field(default_factory=dict)
+
+    def apply(self, blocks_data: dict, terrain_texture_data: dict) -> None:
+        """Merges the block's entries into the data of blocks.json and terrain_texture.json"""
+        blocks_data[self.block.identifier] = self.blocks_entry
+        terrain_texture_data['texture_data'].update(self.texture_data)
+
 @app.command()
 def sounds(
     rp_path: Path = typer.Argument(None, help='Resource pack where block sounds are being defined'),
@@ -53,7 +74,8 @@ def define(
     rp_name: str = typer.Argument('Resource Pack', help='The name of the resource pack for this block'),
     flipbook: bool = typer.Option(False, help='Whether this block is a flipbook texture'),
     variation: bool = typer.Option(False, help='If the block has multiple textures that variate'),
-    sound: str = typer.Option('', 'Specify a specific sound for the block')
+    sound: str = typer.Option('', help='Specify a specific sound for the block'),
+    answers: Path = typer.Option(None, help='A JSON or YAML file answering the face and weight prompts')
 ):
     """
     Defines the resources of a custom block
@@ -64,9 +86,49 @@ def define(
     if not rp_path.exists():
         raise typer.BadParameter('The resource pack does not exist!')
 
+    answers_data = Answers.from_file(answers) if answers else Answers()
+    with transaction():
+        define_block(behavior_file, rp_path, rp_name, flipbook=flipbook, variation=variation, answers=answers_data)
+
+@app.command()
+def define_all(
+    bp_path: Path = typer.Argument(None, help='The behavior pack whose blocks folder is defined'),
+    rp_path: Path = typer.Argument(None, help='The path to the resource pack of these blocks'),
+    rp_name: str = typer.Argument('Resource Pack', help='The name of the resource pack for these blocks'),
+    flipbook: bool = typer.Option(False, help='Whether the blocks are flipbook textures'),
+    variation: bool = typer.Option(False, help='If the blocks have multiple textures that variate'),
+    workers: int = typer.Option(None, help='Number of worker processes, defaults to the cpu count, 1 defines the blocks in this process where unanswered questions are prompted for'),
+    answers: Path = typer.Option(None, help='A JSON or YAML file answering the face and weight prompts of each block')
+):
+    """
+    Defines every block in the behavior pack's blocks folder, writing blocks.json and terrain_texture.json once
+    """
+    blocks_folder = bp_path.joinpath('blocks')
+    if not blocks_folder.exists():
+        raise typer.BadParameter('The behavior pack provided has no blocks folder', param=bp_path)
+
+    if not rp_path.exists():
+        raise typer.BadParameter('The resource pack does not exist!')
+
+    answers_data = Answers.from_file(answers) if answers else Answers()
+    behavior_files = get_index(bp_path).rglob(blocks_folder, '*.json')
+    errors = define_blocks(behavior_files, rp_path, rp_name, flipbook=flipbook, variation=variation, answers=answers_data, workers=workers)
+
+    failures = 0
+    for behavior_file in behavior_files:
+        if errors[behavior_file] is not None:
+            failures += 1
+            print(f'{Fore.RED}Failed {behavior_file.stem}: {errors[behavior_file]}{Style.RESET_ALL}')
+        else:
+            print(f'{Fore.GREEN}Defined {behavior_file.stem}{Style.RESET_ALL}')
+    print(f'{len(behavior_files) - failures} of {len(behavior_files)} blocks defined successfully')
+    if failures:
+        raise typer.Exit(code=1)
+
+def _shared_files(rp_path: Path, rp_name: str) -> tuple[dict, dict]:
+    """Reads blocks.json and terrain_texture.json, or the data they start with when they do not exist yet"""
     terrain_textures = rp_path.joinpath('textures', 'terrain_texture.json')
     blocks_rp_file = rp_path.joinpath('blocks.json')
-    texts_file = rp_path.joinpath('texts', 'en_US.lang')
     terrain_texture_data: dict
     blocks_data: dict
     if terrain_textures.exists():
@@ -87,61 +149,191 @@ def define(
         blocks_data = {
             'format_version': "1.19.30"
         }
+    return blocks_data, terrain_texture_data
+
+def define_block(
+    behavior_file: Path,
+    rp_path: Path,
+    rp_name: str = 'Resource Pack',
+    *,
+    flipbook: bool = False,
+    variation: bool = False,
+    faces: dict[str, str] = None,
+    weights: dict[str, int] = None,
+    answers: Answers = None
+) -> None:
+    """
+    Writes the resource pack definitions and behavior file of a custom block
 
+    :param faces: the texture short_name: face answers, merged over those in answers
+    :param weights: the texture file name: variation weight answers, merged over those in answers
+    :param answers: the answers file, the decisions for this block are found under its identifier
+    """
+    terrain_textures = rp_path.joinpath('textures', 'terrain_texture.json')
+    blocks_rp_file = rp_path.joinpath('blocks.json')
+    texts_file = rp_path.joinpath('texts', 'en_US.lang')
+    blocks_data, terrain_texture_data = _shared_files(rp_path, rp_name)
+    definition = resolve_block(behavior_file, rp_path, flipbook=flipbook, variation=variation, faces=faces, weights=weights, answers=answers)
+    definition.apply(blocks_data, terrain_texture_data)
+    block = definition.block
+
+    helpers.write_to_file(blocks_rp_file, blocks_data) # blocks.json
+    helpers.write_to_file(terrain_textures, terrain_texture_data) # terrain_texture.json
+    block.build(behavior_file)
+
+    lang = LangFile(texts_file)
+    lang.set(f'tile.{block.identifier}.name', block.real_name)
+    lang.save()
+
+def resolve_block(
+    behavior_file: Path,
+    rp_path: Path,
+    *,
+    flipbook: bool = False,
+    variation: bool = False,
+    faces: dict[str, str] = None,
+    weights: dict[str, int] = None,
+    answers: Answers = None
+) -> BlockDefinition:
+    """
+    Works out the geometry, textures and sound of a block without writing anything
+
+    :param faces: the texture short_name: face answers, merged over those in answers
+    :param weights: the texture file name: variation weight answers, merged over those in answers
+    :param answers: the answers file, the decisions for this block are found under its identifier
+    :returns: the block with its geometry and material instances set and its blocks.json and terrain_texture.json entries
+    """
     block = Block(helpers.data_from_file(behavior_file))
-    terrain_texture_data['texture_data'][block.name] = {}
+    decisions = answers.get(block.identifier) if answers is not None else {}
+    faces = {**(decisions.get('faces') or {}), **(faces or {})}
+    weights = {**(decisions.get('weights') or {}), **(weights or {})}
+    definition = BlockDefinition(behavior_file, block)
+    texture_data = definition.texture_data
+    blocks_entry = definition.blocks_entry
+    texture_data[block.name] = {}
     block_textr_folder = rp_path.joinpath('textures', 'blocks', block.name)
     block_geo_file = rp_path.joinpath('models', 'block', f'{block.name}.geo.json')
-    blocks_data[block.identifier] = {}
     if block_geo_file.exists():
         geo_data = helpers.data_from_file(block_geo_file)
-        block.define_geometry(geo_data[0]['description']['identifier'])
+        block.define_geometry(geo_data['minecraft:geometry'][0]['description']['identifier'])
     # if the block has more than 1 texture
     if block_textr_folder.exists():
-        block_textures = [ str(textr)[textr.find('textures'):].replace(os.sep, '/').replace('.png', '') for textr in block_textr_folder.rglob('*.png') ]
+        block_textures = [ str(textr)[str(textr).find('textures'):].replace(os.sep, '/').replace('.png', '') for textr in get_index(rp_path).rglob(block_textr_folder, '*.png') ]
         if variation:
-            terrain_texture_data['texture_data'][block.name] = {}
-            terrain_texture_data['texture_data'][block.name]['textures'] = {}
-            terrain_texture_data['texture_data'][block.name]['textures']['variations']: list[dict] = []
+            texture_data[block.name] = {}
+            texture_data[block.name]['textures'] = {}
+            texture_data[block.name]['textures']['variations']: list[dict] = []
             for textr in block_textures:
-                weight = int(input(f'What is the weight for the texture {textr}?: '))
-                terrain_texture_data['texture_data'][block.name]['textures']['variations'].append({'path': textr, 'weight': weight})
+                weight = ask(f'What is the weight for the texture {textr}?: ', weights.get(textr.split('/')[-1]), cast=int)
+                texture_data[block.name]['textures']['variations'].append({'path': textr, 'weight': weight})
 
         else:
-            blocks_data[block.identifier]['textures'] = {}
+            blocks_entry['textures'] = {}
             valid_faces = ['*', 'up', 'down', 'north', 'south', 'east', 'west']
             material_instances = {}
             for textr in block_textures:
                 short_name = textr.split('_')[-1]
-                face = input(f'What face should the texture {short_name}, render on?: ').lower()
-                while face not in valid_faces:
-                    print(f'Invalid face, please try again and choose from {valid_faces}')
-                    face = input(f'What face should the texture {short_name}, render on?: ')
+                face = ask(f'What face should the texture {short_name}, render on?: ', faces.get(short_name), cast=str.lower, choices=valid_faces)
                 material_instances[face] = {
                     'ambient_occlusion': True,
                     'render_method': 'alpha_test',
                     'face_dimming': True,
                     'texture': short_name
                 }
-                terrain_texture_data['texture_data'][short_name] = {}
-                terrain_texture_data['texture_data'][textr]['textures'] = textr
-                blocks_data[block.identifier]['textures'][short_name] = textr
+                texture_data[short_name] = {}
+                texture_data[short_name]['textures'] = textr
+                blocks_entry['textures'][short_name] = textr
             block.add_material_instances(material_instances)
 
     else:
-        terrain_texture_data['texture_data'][block.name] = {}
-        terrain_texture_data['texture_data'][block.name]['textures'] = f'textures/custom/blocks/{block.name}'
-        blocks_data[block.identifier]['textures'] = block.name
+        texture_data[block.name] = {}
+        texture_data[block.name]['textures'] = f'textures/custom/blocks/{block.name}'
+        blocks_entry['textures'] = block.name
 
     if flipbook:
         pass
 
-    blocks_data[block.identifier]['sound'] = block.name
+    blocks_entry['sound'] = block.name
+    return definition
 
-    print(blocks_data, terrain_texture_data)
-    helpers.write_to_file(blocks_rp_file, blocks_data) # blocks.json
-    helpers.write_to_file(terrain_textures, terrain_texture_data) # terrain_texture.json
-    block.build(behavior_file)
+_worker_state: dict = {}
+
+def _init_worker(rp_path: Path, options: dict, recording: bool) -> None:
+    """Hands every worker process the options shared by the blocks once instead of once per block"""
+    set_interactive(False) # workers cannot share the terminal, unanswered questions fail the block instead
+    metrics.init_worker(recording)
+    _worker_state['rp_path'] = rp_path
+    _worker_state['options'] = options
+
+def _resolve_worker(behavior_file: Path) -> tuple[BlockDefinition | None, str | None, dict | None]:
+    try:
+        definition, error = resolve_block(behavior_file, _worker_state['rp_path'], **_worker_state['options']), None
+    except Exception as exc:
+        definition, error = None, f'{type(exc).__name__}: {exc}'
+    return definition, error, metrics.drain()
+
+def define_blocks(
+    behavior_files: list[Path],
+    rp_path: Path,
+    rp_name: str = 'Resource Pack',
+    *,
+    flipbook: bool = False,
+    variation: bool = False,
+    answers: Answers = None,
+    workers: int = None
+) -> dict[Path, str | None]:
+    """
+    Defines many blocks and merges them into blocks.json, terrain_texture.json and en_US.lang, which are each written once
+
+    The blocks are resolved across a process pool, where unanswered questions fail the block.
+    With one worker they are resolved in this process, where unanswered questions are prompted for.
+
+    :param answers: the answers file, the decisions for each block are found under its identifier
+    :param workers: the number of processes resolving blocks, defaults to the cpu count
+    :returns: the error each block failed with, None for the blocks that were defined
+    """
+    options = {'flipbook': flipbook, 'variation': variation, 'answers': answers}
+    errors: dict[Path, str | None] = {}
+    definitions: list[BlockDefinition] = []
+    get_index(rp_path) # indexed once here, so forked workers start with it
+    if workers == 1 or len(behavior_files) <= 1:
+        for behavior_file in behavior_files:
+            try:
+                definitions.append(resolve_block(behavior_file, rp_path, **options))
+                errors[behavior_file] = None
+            except Exception as exc:
+                errors[behavior_file] = f'{type(exc).__name__}: {exc}'
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(behavior_files) // (workers * 4)) # blocks are quick to resolve, so they are sent to workers in chunks
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rp_path, options, metrics.is_recording())) as pool:
+            for behavior_file, (definition, error, recorded) in zip(behavior_files, pool.map(_resolve_worker, behavior_files, chunksize=chunksize)):
+                metrics.merge(recorded)
+                errors[behavior_file] = error
+                if definition is not None:
+                    definitions.append(definition)
 
-    with open(texts_file, 'a+') as texts:
-        texts.write(f'tile.{block.identifier}.name={block.real_name}\n')
\ No newline at end of file
+    if not definitions:
+        return errors
+    written: list[BlockDefinition] = []
+    try:
+        with transaction():
+            blocks_data, terrain_texture_data = _shared_files(rp_path, rp_name)
+            lang = LangFile(rp_path.joinpath('texts', 'en_US.lang'))
+            for definition in definitions:
+                try:
+                    definition.block.build(definition.behavior_file) # first, so a block that fails leaves nothing in the shared files
+                except Exception as exc:
+                    errors[definition.behavior_file] = f'{type(exc).__name__}: {exc}'
+                    continue
+                definition.apply(blocks_data, terrain_texture_data)
+                lang.set(f'tile.{definition.block.identifier}.name', definition.block.real_name)
+                written.append(definition)
+            helpers.write_to_file(rp_path.joinpath('blocks.json'), blocks_data)
+            helpers.write_to_file(rp_path.joinpath('textures', 'terrain_texture.json'), terrain_texture_data)
+            lang.save()
+    except Exception as exc:
+        # nothing was committed, so none of the blocks were defined
+        for definition in written:
+            errors[definition.behavior_file] = f'{type(exc).__name__}: {exc}'
+    return errors
\ No newline at end of file
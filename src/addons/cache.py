@@ -0,0 +1,84 @@
+"""Build cache that records the inputs each generated file was built from"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+from addons import transaction
+from addons.transaction import write_atomic
+from addons.assets import CACHE_DIR
+
+BUILD_CACHE_FILE = 'build.json'
+
+class InputDigest:
+    """Accumulates the inputs of a build step into a single content hash"""
+    def __init__(self):
+        self.__digest = hashlib.sha1()
+
+    def add_file(self, path: Path | str | None) -> None:
+        """Adds the contents of a file, a missing file is recorded as missing"""
+        path = Path(path) if path else None
+        pending = transaction.pending_bytes(path) if path is not None else None
+        if pending is not None:
+            # the file was written in the active transaction, so its contents on disk are out of date
+            self.__digest.update(pending)
+            self.__digest.update(b'\0')
+            return
+        if path is None or not path.is_file():
+            self.__digest.update(b'\0missing\0')
+            return
+        with path.open('rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                self.__digest.update(chunk)
+        self.__digest.update(b'\0')
+
+    def add_value(self, value: Any) -> None:
+        """Adds any JSON serializable value such as options or a file listing"""
+        self.__digest.update(json.dumps(value, sort_keys=True, default=str).encode('UTF-8'))
+        self.__digest.update(b'\0')
+
+    def hexdigest(self) -> str:
+        return self.__digest.hexdigest()
+
+class BuildCache:
+    """The digest and outputs of every build step run on a pack, stored in the pack's cache folder"""
+    def __init__(self, pack_path: Path):
+        self.__root: Path = Path(pack_path).absolute()
+        self.__path: Path = self.__root.joinpath(CACHE_DIR, BUILD_CACHE_FILE)
+        self.__entries: dict[str, dict[str, Any]] = {}
+        self.__dirty: bool = False
+        if self.__path.is_file():
+            try:
+                with self.__path.open('r', encoding='UTF-8') as f:
+                    self.__entries = json.load(f)
+            except (OSError, ValueError):
+                self.__entries = {}
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self.__entries.get(key)
+
+    def is_fresh(self, key: str, digest: str) -> bool:
+        """Whether a build step already ran with these inputs and all of its outputs still exist"""
+        return is_fresh(self.__entries.get(key), digest, self.__root)
+
+    def record(self, key: str, entry: dict[str, Any]) -> None:
+        """Stores the digest and pack relative outputs of a build step"""
+        if self.__entries.get(key) != entry:
+            self.__entries[key] = entry
+            self.__dirty = True
+
+    def forget(self, key: str) -> None:
+        if self.__entries.pop(key, None) is not None:
+            self.__dirty = True
+
+    def save(self) -> None:
+        if not self.__dirty:
+            return
+        self.__path.parent.mkdir(exist_ok=True)
+        write_atomic(self.__path, json.dumps(self.__entries, indent=1, sort_keys=True).encode('UTF-8'))
+        self.__dirty = False
+
+def is_fresh(entry: dict[str, Any] | None, digest: str, root: Path) -> bool:
+    """Whether a cache entry matches a digest and all of the outputs it lists exist under root"""
+    if entry is None or entry.get('digest') != digest:
+        return False
+    return all(root.joinpath(output).is_file() for output in entry.get('outputs', []))
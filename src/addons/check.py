@@ -0,0 +1,349 @@
+"""Checks that every name a project's files refer to is defined, and that every name it defines is used
+
+Every JSON and lang file of the behavior and resource pack is read once, in parallel, into a table of the
+symbols each file defines and the symbols it refers to. References are then looked up in the table,
+so the whole check is linear in the size of the project.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Callable
+from addons.assets import get_index
+from addons.helpers import data_from_file
+from addons.jsonstream import load_selected
+from addons.textures import find_texture, texture_paths
+
+ENTITY = 'entity'
+CLIENT_ENTITY = 'client entity'
+BLOCK = 'block'
+ITEM = 'item'
+GEOMETRY = 'geometry'
+ANIMATION = 'animation'
+ANIMATION_CONTROLLER = 'animation controller'
+BEHAVIOR_ANIMATION = 'behavior animation'
+BEHAVIOR_ANIMATION_CONTROLLER = 'behavior animation controller'
+RENDER_CONTROLLER = 'render controller'
+TERRAIN_TEXTURE = 'terrain texture'
+ITEM_TEXTURE = 'item texture'
+SOUND = 'sound'
+LANG_KEY = 'lang key'
+TEXTURE_FILE = 'texture file'
+SOUND_FILE = 'sound file'
+
+FILE_KINDS = {TEXTURE_FILE, SOUND_FILE}
+# names the game defines itself, which no pack can be expected to hold
+DEFAULT_IGNORE = ['minecraft:*', 'controller.render.default', 'spawn_egg']
+SOUND_SUFFIXES = ['.ogg', '.fsb', '.wav']
+_LANG_NAME = re.compile(r'(?:entity|item|tile|item\.spawn_egg\.entity)\.([^.:]+:.+)\.name')
+
+@dataclass
+class FileSymbols:
+    """The symbols one file defines and refers to, as (kind, name) pairs"""
+    path: str
+    defines: list[tuple[str, str]] = field(default_factory=list)
+    references: list[tuple[str, str]] = field(default_factory=list)
+    error: str | None = None
+
+@dataclass
+class Problem:
+    kind: str
+    name: str
+    file: str
+
+    def to_dict(self) -> dict:
+        return {'kind': self.kind, 'name': self.name, 'file': self.file}
+
+@dataclass
+class CheckReport:
+    """The references that point at nothing and the definitions nothing points at"""
+    files: int = 0
+    symbols: int = 0
+    dangling: list[Problem] = field(default_factory=list)
+    unused: list[Problem] = field(default_factory=list)
+    unreadable: list[Problem] = field(default_factory=list)
+
+def _names(value: Any) -> list[str]:
+    """Returns the names in a single name, a name mapping or a list of either"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [name for name in value.values() if isinstance(name, str)]
+    if isinstance(value, list):
+        return [name for entry in value for name in _names(entry)]
+    return []
+
+def _render_controller_names(value: Any) -> list[str]:
+    """Returns the render controllers of a client entity, each is a name or a name: condition object"""
+    return [name for entry in value or [] for name in ([entry] if isinstance(entry, str) else entry if isinstance(entry, dict) else [])]
+
+def _animation_kind(name: str, behavior: bool = False) -> str:
+    if name.startswith('controller.'):
+        return BEHAVIOR_ANIMATION_CONTROLLER if behavior else ANIMATION_CONTROLLER
+    return BEHAVIOR_ANIMATION if behavior else ANIMATION
+
+def _scan_entity(path: Path, symbols: FileSymbols) -> None:
+    description = data_from_file(path)['minecraft:entity']['description']
+    identifier = description['identifier']
+    symbols.defines.append((ENTITY, identifier))
+    symbols.references.append((CLIENT_ENTITY, identifier))
+    symbols.references.append((LANG_KEY, f'entity.{identifier}.name'))
+    for name in _names(description.get('animations')):
+        symbols.references.append((_animation_kind(name, behavior=True), name))
+
+def _scan_client_entity(path: Path, symbols: FileSymbols) -> None:
+    data = data_from_file(path)
+    attachable = 'minecraft:attachable' in data
+    description = data['minecraft:attachable' if attachable else 'minecraft:client_entity']['description']
+    identifier = description['identifier']
+    if not attachable:
+        symbols.defines.append((CLIENT_ENTITY, identifier))
+        symbols.references.append((ENTITY, identifier))
+    for name in _names(description.get('geometry')):
+        symbols.references.append((GEOMETRY, name))
+    for name in _names(description.get('animations')) + _names(description.get('animation_controllers')):
+        if name.startswith(('animation.', 'controller.')): # molang scripts can stand in for an animation
+            symbols.references.append((_animation_kind(name), name))
+    for name in _render_controller_names(description.get('render_controllers')):
+        symbols.references.append((RENDER_CONTROLLER, name))
+    for path_name in _names(description.get('textures')):
+        symbols.references.append((TEXTURE_FILE, path_name))
+    for name in _names(description.get('sound_effects')):
+        symbols.references.append((SOUND, name))
+    spawn_egg = description.get('spawn_egg')
+    if isinstance(spawn_egg, dict):
+        symbols.references.append((LANG_KEY, f'item.spawn_egg.entity.{identifier}.name'))
+        if spawn_egg.get('texture'):
+            symbols.references.append((ITEM_TEXTURE, spawn_egg['texture']))
+
+def _scan_geometry(path: Path, symbols: FileSymbols) -> None:
+    # only identifiers are read, the bones of large models are skipped over without being built
+    data = load_selected(path, {'minecraft:geometry': [{'description': {'identifier': True}}], '*': {}})
+    for geometry in data.get('minecraft:geometry') or []:
+        symbols.defines.append((GEOMETRY, geometry['description']['identifier']))
+    for key in data:
+        if key.startswith('geometry.'): # the 1.8.0 format names each model by its key, with the model it inherits from after a colon
+            symbols.defines.append((GEOMETRY, key.split(':')[0]))
+
+def _scan_definitions(key: str, kind: str) -> Callable[[Path, FileSymbols], None]:
+    def scan(path: Path, symbols: FileSymbols) -> None:
+        data = load_selected(path, {key: {'*': {}}})
+        symbols.defines.extend((kind, name) for name in data.get(key) or {})
+    return scan
+
+def _scan_block(path: Path, symbols: FileSymbols) -> None:
+    block = data_from_file(path)['minecraft:block']
+    identifier = block['description']['identifier']
+    symbols.defines.append((BLOCK, identifier))
+    symbols.references.append((LANG_KEY, f'tile.{identifier}.name'))
+    components = block.get('components') or {}
+    geometry = components.get('minecraft:geometry')
+    if isinstance(geometry, dict):
+        geometry = geometry.get('identifier')
+    if geometry:
+        symbols.references.append((GEOMETRY, geometry))
+    instances = components.get('minecraft:material_instances') or components.get('material_instances') or {}
+    for instance in instances.values():
+        if isinstance(instance, dict) and instance.get('texture'):
+            symbols.references.append((TERRAIN_TEXTURE, instance['texture']))
+
+def _scan_item(path: Path, symbols: FileSymbols) -> None:
+    item = data_from_file(path)['minecraft:item']
+    identifier = item['description']['identifier']
+    symbols.defines.append((ITEM, identifier))
+    symbols.references.append((LANG_KEY, f'item.{identifier}.name'))
+    icon = (item.get('components') or {}).get('minecraft:icon')
+    if isinstance(icon, dict):
+        icon = icon.get('texture')
+    if icon:
+        symbols.references.append((ITEM_TEXTURE, icon))
+
+def _scan_client_item(path: Path, symbols: FileSymbols) -> None:
+    item = data_from_file(path)['minecraft:item']
+    symbols.references.append((ITEM, item['description']['identifier']))
+    icon = (item.get('components') or {}).get('minecraft:icon')
+    if isinstance(icon, str):
+        symbols.references.append((ITEM_TEXTURE, icon))
+
+def _scan_blocks_json(path: Path, symbols: FileSymbols) -> None:
+    for identifier, block in data_from_file(path).items():
+        if not isinstance(block, dict):
+            continue # format_version
+        symbols.references.append((BLOCK, identifier if ':' in identifier else f'minecraft:{identifier}'))
+        for name in _names(block.get('textures')):
+            symbols.references.append((TERRAIN_TEXTURE, name))
+        if block.get('carried_textures'):
+            for name in _names(block['carried_textures']):
+                symbols.references.append((TERRAIN_TEXTURE, name))
+
+def _scan_atlas(kind: str) -> Callable[[Path, FileSymbols], None]:
+    def scan(path: Path, symbols: FileSymbols) -> None:
+        for name, entry in (data_from_file(path).get('texture_data') or {}).items():
+            symbols.defines.append((kind, name))
+            for texture in texture_paths(entry.get('textures') if isinstance(entry, dict) else None):
+                symbols.references.append((TEXTURE_FILE, texture))
+    return scan
+
+def _scan_flipbooks(path: Path, symbols: FileSymbols) -> None:
+    for flipbook in data_from_file(path) or []:
+        if flipbook.get('atlas_tile'):
+            symbols.references.append((TERRAIN_TEXTURE, flipbook['atlas_tile']))
+        if flipbook.get('flipbook_texture'):
+            symbols.references.append((TEXTURE_FILE, flipbook['flipbook_texture']))
+
+def _scan_sound_definitions(path: Path, symbols: FileSymbols) -> None:
+    data = data_from_file(path)
+    definitions = data.get('sound_definitions', data) # the old format holds the definitions at the top level
+    for name, definition in definitions.items():
+        if not isinstance(definition, dict):
+            continue
+        symbols.defines.append((SOUND, name))
+        for sound in definition.get('sounds') or []:
+            sound_path = sound.get('name') if isinstance(sound, dict) else sound
+            if isinstance(sound_path, str) and sound_path:
+                symbols.references.append((SOUND_FILE, sound_path))
+
+def _sound_events(value: Any, symbols: FileSymbols) -> None:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key == 'sound' and isinstance(child, str):
+                if child:
+                    symbols.references.append((SOUND, child))
+            else:
+                _sound_events(child, symbols)
+    elif isinstance(value, list):
+        for child in value:
+            _sound_events(child, symbols)
+
+def _scan_sounds_json(path: Path, symbols: FileSymbols) -> None:
+    _sound_events(data_from_file(path), symbols)
+
+def _scan_lang(path: Path, symbols: FileSymbols) -> None:
+    for line in data_from_file(path) or []:
+        line = line.strip()
+        if line and not line.startswith('##') and '=' in line:
+            symbols.defines.append((LANG_KEY, line.split('=', 1)[0]))
+
+# scanners keyed by pack and the path of the file, or its first folder, in the pack
+_BP_SCANNERS = {
+    'entities': _scan_entity,
+    'blocks': _scan_block,
+    'items': _scan_item,
+    'animations': _scan_definitions('animations', BEHAVIOR_ANIMATION),
+    'animation_controllers': _scan_definitions('animation_controllers', BEHAVIOR_ANIMATION_CONTROLLER)
+}
+_RP_SCANNERS = {
+    'entity': _scan_client_entity,
+    'attachables': _scan_client_entity,
+    'items': _scan_client_item,
+    'models': _scan_geometry,
+    'animations': _scan_definitions('animations', ANIMATION),
+    'animation_controllers': _scan_definitions('animation_controllers', ANIMATION_CONTROLLER),
+    'render_controllers': _scan_definitions('render_controllers', RENDER_CONTROLLER),
+    'texts': _scan_lang,
+    'blocks.json': _scan_blocks_json,
+    'sounds.json': _scan_sounds_json,
+    'sounds/sound_definitions.json': _scan_sound_definitions,
+    'textures/terrain_texture.json': _scan_atlas(TERRAIN_TEXTURE),
+    'textures/item_texture.json': _scan_atlas(ITEM_TEXTURE),
+    'textures/flipbook_textures.json': _scan_flipbooks
+}
+
+def _scanner(behavior: bool, rel_path: str) -> Callable[[Path, FileSymbols], None] | None:
+    scanners = _BP_SCANNERS if behavior else _RP_SCANNERS
+    scanner = scanners.get(rel_path)
+    if scanner is None and '/' in rel_path:
+        scanner = scanners.get(rel_path.split('/', 1)[0])
+    if scanner is _scan_lang and not rel_path.endswith('.lang'):
+        return None
+    return scanner
+
+def scan_file(pack_path: str, rel_path: str, behavior: bool) -> FileSymbols:
+    """Reads the symbols one file of a pack defines and refers to
+
+    :param rel_path: the path of the file in the pack, with forward slashes
+    :param behavior: whether the file is part of the behavior pack
+    """
+    symbols = FileSymbols(f'{Path(pack_path).name}/{rel_path}')
+    scanner = _scanner(behavior, rel_path)
+    if scanner is None:
+        return symbols
+    try:
+        scanner(Path(pack_path, rel_path), symbols)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+        symbols.error = f'{type(exc).__name__}: {exc}'
+    return symbols
+
+def _scan_chunk(jobs: list[tuple[str, str, bool]]) -> list[FileSymbols]:
+    return [scan_file(*job) for job in jobs]
+
+def check_project(bp_path: Path, rp_path: Path, *, ignore: list[str] = None, workers: int = None) -> CheckReport:
+    """
+    Finds the dangling references and unused definitions of a behavior and resource pack
+
+    :param ignore: glob patterns of names that are never reported, by default the names the game defines itself
+    :param workers: the number of processes reading files, 1 reads them in this process
+    :returns: the problems found, each with the file it was found in
+    """
+    ignore = DEFAULT_IGNORE if ignore is None else ignore
+    rp_path = Path(rp_path).absolute()
+    rp_index = get_index(rp_path)
+    jobs: list[tuple[str, str, bool]] = []
+    for pack_path, behavior in [(Path(bp_path).absolute(), True), (rp_path, False)]:
+        index = get_index(pack_path)
+        for asset in index.assets(pack_path):
+            if asset.path.endswith(('.json', '.lang')) and _scanner(behavior, asset.path) is not None:
+                jobs.append((os.fspath(pack_path), asset.path, behavior))
+
+    if workers == 1:
+        scanned = [scan_file(*job) for job in jobs]
+    else:
+        # files are sent in chunks, one process per file would spend longer on pickling than on reading
+        size = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        chunks = [jobs[start:start + size] for start in range(0, len(jobs), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scanned = [symbols for chunk in pool.map(_scan_chunk, chunks) for symbols in chunk]
+
+    report = CheckReport(files=len(scanned))
+    defined: dict[tuple[str, str], str] = {}
+    for symbols in scanned:
+        if symbols.error is not None:
+            report.unreadable.append(Problem('file', symbols.error, symbols.path))
+        for symbol in symbols.defines:
+            defined.setdefault(symbol, symbols.path)
+    report.symbols = len(defined)
+
+    def ignored(name: str) -> bool:
+        return any(fnmatchcase(name, pattern) for pattern in ignore)
+
+    used: set[tuple[str, str]] = set()
+    files_found: dict[tuple[str, str], bool] = {}
+    for symbols in scanned:
+        for symbol in symbols.references:
+            kind, name = symbol
+            if kind in FILE_KINDS:
+                if symbol not in files_found:
+                    suffixes = SOUND_SUFFIXES if kind == SOUND_FILE else None
+                    files_found[symbol] = (
+                        any(rp_index.is_file(rp_path.joinpath(name + suffix)) for suffix in suffixes) if suffixes
+                        else find_texture(rp_index, rp_path, name) is not None
+                    )
+                found = files_found[symbol]
+            else:
+                found = symbol in defined
+                used.add(symbol)
+            if not found and not ignored(name):
+                report.dangling.append(Problem(kind, name, symbols.path))
+
+    for (kind, name), path in defined.items():
+        if (kind, name) in used or ignored(name) or kind in (ENTITY, BLOCK, ITEM):
+            continue # entities, blocks and items are used by the game itself
+        if kind == LANG_KEY:
+            # only names of entities, blocks and items that no longer exist are known to be unused
+            match = _LANG_NAME.fullmatch(name)
+            if match is None or ignored(match.group(1)):
+                continue
+        report.unused.append(Problem(kind, name, path))
+    return report
@@ -8,7 +8,15 @@ class MCBEConfig():
     """Encapsulates the configuration data for the project
     """
     def __init__(self, config_path: Path):
-        self.__data = data_from_file(config_path)
+        self.__path = config_path
+        self.__loaded = None
+
+    @property
+    def __data(self) -> dict[str, any]:
+        """The config file is read on first use rather than when addons is imported"""
+        if self.__loaded is None:
+            self.__loaded = data_from_file(self.__path)
+        return self.__loaded
         
     @property
     def projects_path(self) -> Path:
@@ -30,7 +30,8 @@ class CustomComponentRegistry:
     namespace: str = 'custom'
 
     def __register_component(self, component: CustomComponent) -> None:
-        """Adds a custom component object to the registry"""
+        """Adds a custom component object to the registry and compiles its property validator"""
+        compile_validator(component)
         self._data[component.get_name()] = component
 
     def register_components(self) -> None:
@@ -50,7 +51,9 @@ class CustomComponentRegistry:
                 raise
         
     def get_component(self, component_name: str) -> CustomComponent:
-        """Returns a custom component object from the registry"""
+        """Returns a custom component object from the registry, loading the components on first use"""
+        if not self._data:
+            self.register_components()
         component: CustomComponent = self._data.get(component_name)
         if component is None:
             print(self._data)
@@ -58,47 +61,89 @@ class CustomComponentRegistry:
 
         return component
 
-def verify_component_properties(builder: Callable[[dict[str, Any], dict[str, Any]], dict[str, Any]]):
-    def wrapper(ref: CustomComponent, *args, **kwargs):
-        passed_properties = kwargs['properties']
-        annotations = get_type_hints(ref, include_extras=True)
-        for prop, expected_t in annotations.items():
+_PropertyCheck = Callable[[str, Any], None]
+_validators: dict[type, Callable[[dict[str, Any]], None]] = {}
+
+def _check_instance(expected_t: type) -> _PropertyCheck:
+    def check(prop: str, passed_value: Any) -> None:
+        if not isinstance(passed_value, expected_t):
+            raise ComponentPropertyTypeError(prop, type(passed_value), expected_t)
+    return check
+
+def _check_range(r: Range) -> _PropertyCheck:
+    def check(prop: str, passed_value: Any) -> None:
+        assert isinstance(r, Range), 'A number can only be annotated as a Range'
+        if not isinstance(passed_value, int) and not isinstance(passed_value, float):
+            raise ComponentPropertyTypeError(prop, type(passed_value), f'number in range {r.min} to {r.max}')
+        if not passed_value >= r.min or not passed_value <= r.max:
+            raise ComponentPropertyTypeError(prop, type(passed_value), f'Is a number but must be in range {r.min} to {r.max}')
+    return check
+
+def _check_list(expected_t: Any, t_args: tuple) -> _PropertyCheck:
+    is_vector = True if len(t_args) == 3 else False
+    def check(prop: str, passed_value: Any) -> None:
+        assert len(t_args) == 1, 'A list in a custom component can only be of one type'
+        if not all([isinstance(el, t_args[0]) for el in passed_value]):
+            raise ComponentPropertyTypeError(prop, type(passed_value), expected_t)
+        if is_vector and len(passed_value) != 3:
+            raise ComponentPropertyTypeError(prop, type(passed_value), 'Was expecting a vector with a length of 3')
+    return check
+
+def _check_unsupported(t_origin: Any) -> _PropertyCheck:
+    def check(prop: str, passed_value: Any) -> None:
+        raise ValueError(f"{t_origin} cannot be an annotated type for a custom component property")
+    return check
+
+def compile_validator(component: type[CustomComponent]) -> Callable[[dict[str, Any]], None]:
+    """
+    Builds the property validator of a custom component class from its annotations, once per class
+
+    Bad annotations still only raise when a value is passed for that property, as they did before validators were compiled
+
+    :param component: the custom component class
+    :returns: a function that checks the properties passed to the component and fills in the defaults of missing ones
+    """
+    validator = _validators.get(component)
+    if validator is not None:
+        return validator
+
+    name = component.get_name()
+    checks: list[tuple[str, Any, _PropertyCheck | None]] = []
+    for prop, expected_t in get_type_hints(component, include_extras=True).items():
+        t_args = get_args(expected_t)
+        t_origin = get_origin(expected_t)
+        # vanilla types that are not annotated
+        if t_origin is None:
+            check = _check_instance(expected_t)
+        elif t_origin is Annotated:
+            main_t, *annotation_t = t_args
+            check = _check_range(annotation_t[0]) if main_t == int or main_t == float else None
+        elif t_origin is list or expected_t is list:
+            check = _check_list(expected_t, t_args)
+        else:
+            check = _check_unsupported(t_origin)
+        checks.append((prop, getattr(component, prop, None), check))
+
+    def validator(passed_properties: dict[str, Any]) -> None:
+        for prop, default_property_value, check in checks:
             passed_value = passed_properties.get(prop)
-            t_args = get_args(expected_t)
-            t_origin = get_origin(expected_t)
             # if there is not a default value for a property not passed into the custom component
-            default_property_value = getattr(ref, prop, None)
-            if passed_value is None and default_property_value is None:
-                raise ValueError(f'{prop} is a required property on the custom component: {ref.get_name()}')
             if passed_value is None:
+                if default_property_value is None:
+                    raise ValueError(f'{prop} is a required property on the custom component: {name}')
                 passed_properties[prop] = default_property_value
                 continue
-            # vanilla types that are not annotated
-            if t_origin is None:
-                if not isinstance(passed_value, expected_t):
-                    raise ComponentPropertyTypeError(prop, type(passed_value), expected_t)
-                continue
-            elif t_origin is Annotated:
-                main_t, *annotation_t = t_args
-                if main_t == int or main_t == float:
-                    r: Range = annotation_t[0]
-                    assert isinstance(r, Range), 'A number can only be annotated as a Range'
-                    if not isinstance(passed_value, int) and not isinstance(passed_value, float):
-                        raise ComponentPropertyTypeError(prop, type(passed_value), f'number in range {r.min} to {r.max}')
-                    if not passed_value >= r.min or not passed_value <= r.max:
-                        raise ComponentPropertyTypeError(prop, type(passed_value), f'Is a number but must be in range {r.min} to {r.max}')
-            elif t_origin is list or expected_t is list:
-                is_vector = True if len(t_args) == 3 else False
-                assert len(t_args) == 1, 'A list in a custom component can only be of one type'
-                if not all([isinstance(el, t_args[0]) for el in passed_value]):
-                    raise ComponentPropertyTypeError(prop, type(passed_value), expected_t)
-                if is_vector and len(passed_value) != 3:
-                    raise ComponentPropertyTypeError(prop, type(passed_value), 'Was expecting a vector with a length of 3')
-            else:
-                raise ValueError(f"{t_origin} cannot be an annotated type for a custom component property")
+            if check is not None:
+                check(prop, passed_value)
 
+    _validators[component] = validator
+    return validator
+
+def verify_component_properties(builder: Callable[[dict[str, Any], dict[str, Any]], dict[str, Any]]):
+    def wrapper(ref: CustomComponent, *args, **kwargs):
+        validator = _validators.get(type(ref)) or compile_validator(type(ref))
+        validator(kwargs['properties'])
         builder(ref, *args, **kwargs)
     return wrapper
         
-component_registry = CustomComponentRegistry()
-component_registry.register_components()
\ No newline at end of file
+component_registry = CustomComponentRegistry()
\ No newline at end of file
@@ -100,6 +100,7 @@ Template = CustomBlockTemplate | CustomItemTemplate | CustomEntityTemplate
 class CustomTemplateRegistry:
     def __init__(self):
         self._data: dict[str, Template] = {}
+        self._loaded: bool = False
 
     def register_templates(self) -> None:
         """
@@ -117,9 +118,12 @@ class CustomTemplateRegistry:
                     raise AttributeError('A template must be defined correctly')
             except AttributeError:
                 print(f'Template not found: {template}')
+        self._loaded = True
 
     def get_template_builder(self, name: str) -> CustomEntityTemplate:
+        """Returns a template from the registry, loading the templates on first use"""
+        if not self._loaded:
+            self.register_templates()
         return self._data.get(name)
 
-template_registry = CustomTemplateRegistry()
-template_registry.register_templates()
\ No newline at end of file
+template_registry = CustomTemplateRegistry()
\ No newline at end of file
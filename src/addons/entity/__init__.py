@@ -2,4 +2,5 @@ from . import cmds
 from . import behaviors
 from . import builder
 from . import properties
-from . import define
\ No newline at end of file
+from . import define
+from . import pipeline
\ No newline at end of file
@@ -65,27 +65,23 @@ class EntityBehaviors:
 
         write_to_file(build_path, self.__data)
 
-    def write_lang_defs(self, lang_file_path: str) -> list[str]:
+    def lang_defs(self) -> list[str]:
         """
         Creates a list of the required lang definitions from the behavior components on an entity
 
         :returns: a list of the lang definitions in "translation.key=Name Required" format
         """
-        with open(lang_file_path, 'a+') as lang_file:
-            lang_data = lang_file.readlines()
-            ride_hint = f'action.hint.exit.{self.identifier}=Tap Sneak To Exit {self.__real_name}\n'
-            components = self.__data.get('minecraft:entity').get('components')
-            component_groups = self.__data.get('minecraft:entity').get('component_groups')
+        ride_hint = f'action.hint.exit.{self.identifier}=Tap Sneak To Exit {self.__real_name}'
+        components = self.__data.get('minecraft:entity').get('components')
+        component_groups = self.__data.get('minecraft:entity').get('component_groups')
 
-            if component_groups:
-                for cg in component_groups.values():
-                    if 'minecraft:rideable' in cg and ride_hint not in lang_data:
-                        lang_file.write(ride_hint)
-                        return lang_file.readlines()
+        if component_groups:
+            for cg in component_groups.values():
+                if 'minecraft:rideable' in cg:
+                    return [ride_hint]
 
-            if components:
-                if components.get('minecraft:rideable') and ride_hint not in lang_data:
-                    lang_file.write(ride_hint)
-                    return lang_file.readlines()
+        if components:
+            if components.get('minecraft:rideable'):
+                return [ride_hint]
 
-            return lang_file.readlines()
\ No newline at end of file
+        return []
\ No newline at end of file
@@ -2,6 +2,8 @@ from addons.entity.client_entity.entity import Entity
 from addons.entity.behaviors import EntityBehaviors
 from addons.entity.client_entity.render_controller import RenderController
 from .properties import EntityProperties, PropertyFactory
+from addons.assets import get_index
+from addons import metrics
 
 from pathlib import Path
 import os
@@ -26,11 +28,13 @@ def build_arrays(entity: Entity, rp_path: Path) -> dict[str, dict[str, list[str]
     arrays = {}
     if entity_folder.exists():
         arrays['textures'] = {}
-        for root, subdirs, files in os.walk(str(entity_folder)):
-            if not files: continue
-            root = root.split(os.sep)[-1]
-            array_name = f'Array.{root}' if len(subdirs) > 0 and root == entity.name else 'skins'
-            arrays['textures'][array_name] = ['Texture.' + f.replace('.png', '').lower().split('_')[-1] for f in files if f.endswith('.png')]
+        with metrics.phase('scan_entity_textures'):
+            for root, subdirs, files in get_index(rp_path).walk(entity_folder):
+                metrics.count(metrics.FILES_SCANNED, len(files))
+                if not files: continue
+                root = root.split(os.sep)[-1]
+                array_name = f'Array.{root}' if len(subdirs) > 0 and root == entity.name else 'skins'
+                arrays['textures'][array_name] = ['Texture.' + f.replace('.png', '').lower().split('_')[-1] for f in files if f.endswith('.png')]
     if len(entity.geometries) > 1:
         arrays['geometries'] = {}
         arrays['geometries']['Array.models'] = entity.geo_names
@@ -36,7 +36,7 @@ class Entity:
         self.__acs: list[dict[str, str]] = acs
         self.__particles: dict[str, str] = particles
         self.__sounds: dict[str, str] = sounds
-        self.__locators = None
+        self.__locators = geometry.get_locators()
 
     @property
     def acs(self) -> list[dict[str, str]]:
@@ -112,24 +112,16 @@ class Entity:
     def spawn_egg(self) -> dict:
         return self.__spawn_egg
 
-    def write_lang(self, RP_PATH: Path) -> None:
+    def lang_defs(self) -> list[str]:
         """
-        Adds the required entity translation key definitions to the rp .lang file
+        Creates the translation key definitions the entity requires in the rp .lang file
 
-        :param RP_PATH: The path to the resource pack the entity belongs to
+        :returns: a list of the lang definitions in "translation.key=Name Required" format
         """
-        lang_path = RP_PATH.joinpath('texts', 'en_US.lang')
         title = self.name.replace('_', ' ').title()
-        translation = f'entity.{self.identifier}.name={title}\n'
-        spawn_translation = f'item.spawn_egg.entity.{self.identifier}.name=Spawn {title}\n'
-        with open(lang_path, 'a+') as lang_file:
-            written_data = lang_file.readlines()
-
-            if translation not in written_data:
-                lang_file.write(translation)
-                lang_file.write(spawn_translation)
-
-        self.__bp_data.write_lang_defs(lang_path)
+        translation = f'entity.{self.identifier}.name={title}'
+        spawn_translation = f'item.spawn_egg.entity.{self.identifier}.name=Spawn {title}'
+        return [translation, spawn_translation, *self.__bp_data.lang_defs()]
 
     def _define_spawn_egg(self, rp_path: Path, base_color: str = None, overlay_color: str = None) -> dict:
         """
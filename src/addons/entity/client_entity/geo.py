@@ -1,116 +1,182 @@
 from addons.errors import BadDataInputExcep
+from addons.jsonstream import load_selected
+from pathlib import Path
+
+class Bone:
+    """ A bone of a geometry, reduced to what the client entity, render controller and cost report need """
+    __slots__ = ('name', 'parent', 'cubes', 'faces', 'locators')
+
+    def __init__(self, name: str, parent: str | None, cubes: int, faces: int, locators: dict | None):
+        self.name: str = name
+        self.parent: str | None = parent
+        self.cubes: int = cubes
+        self.faces: int = faces
+        self.locators: dict | None = locators
+
+def _count_faces(bone: dict) -> int:
+    cubes = bone.get('cubes') or ()
+    faces = 6 * len(cubes)
+    for cube in cubes:
+        uv = cube.get('uv')
+        if uv.__class__ is dict:
+            # faces left out of a per-face uv are not drawn
+            faces += len(uv) - 6
+    if 'poly_mesh' in bone:
+        faces += len(bone['poly_mesh'].get('polys') or ())
+    return faces
+
+def _parse_locators(bone: dict) -> dict:
+    locators = {}
+    for name, location in bone['locators'].items():
+        # a locator is an offset or an object holding one
+        offset = location.get('offset') if isinstance(location, dict) else location
+        if not isinstance(offset, list) or len(offset) != 3:
+            raise BadDataInputExcep('There is a problem processing the locators of the geometry file!')
+        locators[name] = location
+    return locators
+
+def _parse_bone(bone: dict) -> Bone:
+    return Bone(bone['name'], bone.get('parent'), len(bone.get('cubes') or ()), _count_faces(bone), _parse_locators(bone) if 'locators' in bone else None)
+
+class GeometryModel:
+    """ One geometry of a geometry file
+
+    The identifier and bone names are read with the file, the bone records and cube counts are built the first time they are used
+    unless the file was streamed, which builds the records as each bone is read.
+    """
+    __slots__ = ('identifier', 'bone_names', '_bone_data', '_bones')
+
+    def __init__(self, identifier: str, bone_data: list[dict] | list[Bone]):
+        self.identifier: str = identifier
+        if bone_data and isinstance(bone_data[0], Bone):
+            self.bone_names: list[str] = [bone.name for bone in bone_data]
+            self._bone_data: list[dict] | None = None
+            self._bones: list[Bone] | None = bone_data
+            return
+        self.bone_names: list[str] = [bone['name'] for bone in bone_data]
+        self._bone_data: list[dict] | None = bone_data
+        self._bones: list[Bone] | None = None
+
+    @property
+    def bones(self) -> list[Bone]:
+        if self._bones is None:
+            self._bones = [_parse_bone(bone) for bone in self._bone_data]
+        return self._bones
+
+    @property
+    def cubes(self) -> int:
+        return sum(bone.cubes for bone in self.bones)
+
+    @property
+    def faces(self) -> int:
+        return sum(bone.faces for bone in self.bones)
 
 class Geometry:
 
     """ Geometry class which encapsulates client entity data related to the geometry of an entity
 
+    The geometry file is read once into an identifier: geometry map, the bone names and the locator table,
+    every accessor reads from those instead of walking the file again.
     """
     format_version = '1.12.0'
+    # reduces each bone to its record as it is read, so the cubes of a large file are never all held at once
+    selection = {'minecraft:geometry': [{'description': {'identifier': True}, 'bones': [_parse_bone]}]}
 
     def __init__(self, geo_data: dict, dummy: bool = False):
         """
         :param geo_data: The json data loaded from the geometry file
         """
-        self.__geo_data: dict = geo_data
-        self.__num_geos: int = len(self.__geo_data['minecraft:geometry']) if not dummy else 0
+        self.__has_data: bool = bool(geo_data)
         self.__is_dummy: bool = dummy
+        self.__models: dict[str, GeometryModel] = {}
+        self.__bones: list[str] = []
+        self.__locators: dict[str, dict] = {}
+        self.__num_geos: int = 0
+        if geo_data is None:
+            return
 
-    def get_geos(self) -> dict:
-        """ Returns the geometry map of short_name: geometry_identifer for each geometry in the geometry file, then this map should be used in the client entity function to set the geometries
+        try:
+            geometries = geo_data['minecraft:geometry']
+            for geo in geometries:
+                # minecraft:geometry key is a list of dictionaries
+                bone_data = geo.get('bones') or []
+                model = GeometryModel(geo['description']['identifier'], bone_data)
+                self.__models[model.identifier] = model
+                self.__bones.extend(model.bone_names)
+                for bone in bone_data:
+                    if isinstance(bone, Bone):
+                        bone_name, locators = bone.name, bone.locators
+                    else:
+                        bone_name, locators = bone['name'], _parse_locators(bone) if 'locators' in bone else None
+                    for name, location in (locators or {}).items():
+                        self.__locators[name] = {bone_name: location}
 
-        :returns: A dictionary mapping the geometry name to its identifier for the client entity file
-        """
-        geo_names: dict = {}
+        except (KeyError, TypeError, AttributeError):
+            raise BadDataInputExcep('There is a problem with the entity\'s geometry file!')
 
-        if self.__geo_data is None:
-            geo_names['default'] = 'geometry.dummy'
-            return geo_names
+        self.__num_geos = len(geometries) if not dummy else 0
 
+    @classmethod
+    def from_file(cls, geo_path: Path, dummy: bool = False) -> 'Geometry':
+        """ Streams a geometry file, keeping only the identifiers and a record of each bone instead of every cube and uv
+
+        :param geo_path: the path to the geometry file, a missing file gives the same geometry as no data
+        """
         try:
-            for geo in self.__geo_data['minecraft:geometry']:
-                # minecraft:geometry key is a list of dictionaries
-                geo_name = geo['description']['identifier']
-                # set the key value pair correctly in the textures property of the client entity json object
-                if self.__num_geos == 1:
-                    geo_names['default'] = geo['description']['identifier']
-
-                else:
-                    if not self.__is_dummy:
-                        geo_names[geo_name] = geo['description']['identifier']
-                    
-        except KeyError:
+            return cls(load_selected(geo_path, cls.selection), dummy)
+        except (ValueError, KeyError, TypeError, AttributeError):
             raise BadDataInputExcep('There is a problem with the entity\'s geometry file!')
 
-        return geo_names
+    @property
+    def has_data(self) -> bool:
+        return self.__has_data
+
+    @property
+    def models(self) -> dict[str, GeometryModel]:
+        """ The identifier: geometry map of every geometry in the file """
+        return self.__models
+
+    def get_geos(self) -> dict:
+        """ Returns the geometry map of short_name: geometry_identifer for each geometry in the geometry file, then this map should be used in the client entity function to set the geometries
+
+        :returns: A dictionary mapping the geometry name to its identifier for the client entity file
+        """
+        if not self.__has_data:
+            return {'default': 'geometry.dummy'}
+        if self.__num_geos == 1:
+            return {'default': next(iter(self.__models))}
+        if self.__is_dummy:
+            return {}
+        return {identifier: identifier for identifier in self.__models}
 
     def get_names(self) -> list[str]:
         """ Returns the list of geometry names for use in geometry arrays in the entity's render controller
 
         :return: list of geometry short-names defined in the client entity        
         """
-        return [ f'Geometry.{x}' for x in list(self.get_geos()) ]
+        return [ f'Geometry.{x}' for x in self.get_geos() ]
 
     def get_locators(self) -> dict:
         """ Returns the locator map for each locator in the geometry bones, then this map should be used in the client entity function to set the locators
 
-        :param geo_data: The geometry dictionary loaded from the json file
-        :return: dictionary of values
+        :return: dictionary of locator name: {bone name: location}, None if no bone has a locator
         """
-        if not self.__geo_data:
-            return None
+        return dict(self.__locators) or None
 
-        try:
-            ce_locators = {}
+    def get_cube_counts(self) -> dict[str, tuple[int, int]]:
+        """ Returns the number of cubes and faces of each geometry, faces left out of a cube's per-face uv are not counted and the polygons of poly meshes are
 
-            for geo in self.__geo_data['minecraft:geometry']:
-                # minecraft:geometry key is a list of dictionaries
-                bones = geo['bones']
-                # loop through all the bones in each geometry object
-                for bone in bones:
-                    bone_name = bone['name']
-                    # if the bone has a locator
-                    if 'locators' in bone:
-                        geo_locators = bone['locators']
-                        # get the name and location of the locators
-                        for name, location in geo_locators.items():
-                            locator = {}
-                            # location is a list of three values like [0,1,2]
-                            locator[bone_name] = location
-                            assert (len(location) == 3)
-                            ce_locators[name] = locator
-                    
-                    else:
-                        continue
-
-        except AssertionError:
-            raise BadDataInputExcep('There is a problem processing the locators of the geometry file!')
-
-        except BadDataInputExcep as err:
-            print(err)
-
-        return ce_locators if len(ce_locators) >= 1 else None
+        :return: dictionary of geometry identifier: (cubes, faces)
+        """
+        return {identifier: (model.cubes, model.faces) for identifier, model in self.__models.items()}
 
     def get_bones(self) -> list[str]:
+        """ Returns the names of the bones of every geometry in the file, None if there is no geometry file
 
-        bones = []
-        if not self.__geo_data:
+        :raises BadDataInputExcep: if the geometry file has no bones
+        """
+        if not self.__has_data:
             return None
-            
-        try:
-            for geo in self.__geo_data['minecraft:geometry']:
-                geo_bones = geo['bones']
-
-                for bone in geo_bones:
-                    bones.append(bone['name'])
-            
-            assert (len(bones) >= 1)
-            return bones
-
-        except AssertionError:
+        if not self.__bones:
             raise BadDataInputExcep('The entity does not have any bones!')
-
-        except KeyError:
-            raise BadDataInputExcep('There was an issue collecting the bones from the geometry file!')
-
-        except BadDataInputExcep as err:
-            print(err)
\ No newline at end of file
+        return list(self.__bones)
@@ -1,5 +1,6 @@
 from addons.errors import *
 from addons.helpers import *
+from addons.answers import ask
 
 class RenderController:
     """Respresents a render controller for a particular entity"""
@@ -17,15 +18,22 @@ class RenderController:
     def arrays(self) -> dict[str, dict[str, list[str]]]:
         return self.__arrays
 
-    def map_mats_to_bones(self) -> list[dict[str, str]]:
-        """Formats the bone to the material name in a list for the render controller"""
+    def map_mats_to_bones(self, bones: dict[str, list[str]] = None) -> list[dict[str, str]]:
+        """Formats the bone to the material name in a list for the render controller
+
+        :param bones: the material short_name: bones answers, the user is prompted for any material missing from it
+        """
+        bones = bones or {}
         mat_names = list(self.__materials)
         if len(mat_names) == 1:
             self.__mat_to_bone_map.append({ '*': 'Material.default' })
             return self.__mat_to_bone_map
 
         for name in mat_names:
-            mapped_bones = input('What bone(s) are the material {0} used on? (use spaces to separate): '.format(name)).split(' ')
+            answer = bones.get(name)
+            if isinstance(answer, list):
+                answer = ' '.join(answer)
+            mapped_bones = ask('What bone(s) are the material {0} used on? (use spaces to separate): '.format(name), answer).split(' ')
             for mapped_bone in mapped_bones:
                 self.__mat_to_bone_map.append({ mapped_bone: name })
 
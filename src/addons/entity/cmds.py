@@ -1,17 +1,16 @@
 import typer
-import addons.entity.client_entity as client_entity
 from addons.sounds import implement_sounds
 from addons.helpers import write_to_file, data_from_file
-from addons.entity.client_entity.factory import ClientEntityFactory
-from addons.entity.client_entity.versions import ClientEntityV1_8_0, ClientEntityV1_10_0
-from addons.entity.behaviors import EntityBehaviors
-from addons.entity.builder import build_entity, build_arrays
-from addons.entity.client_entity.render_controller import RenderController
-from addons.entity.client_entity.entity import Entity
 from addons.custom.template import template_registry
-from .define import *
+from addons.answers import Answers, ask
+from addons.entity import pipeline
+from addons.entity.pipeline import DefineOptions, SharedOutputs, VALID_FORMATS, define_cached, cache_key
+from addons.entity.cost import COLUMNS, entity_costs
+from addons.cache import BuildCache
+from addons.transaction import transaction
 from addons.errors import *
 
+import csv
 from pathlib import Path
 from colorama import Fore, Back, Style
 from typing import Optional
@@ -33,96 +32,47 @@ def define( rp_folder: Path = typer.Argument(None, help='ABS path to the resourc
             anim_req: bool = typer.Option(False, help='If an animation is required'),
             geo_req: bool = typer.Option(True, help="If the entity has a geometry"),
             sounds_req: bool = typer.Option(False, help='If the entity need sounds'),
-            texture_req: bool = typer.Option(True, help='If the entity requires a texture')
+            texture_req: bool = typer.Option(True, help='If the entity requires a texture'),
+            identifier: str = typer.Option(None, help='The identifier of the entity generated from a template'),
+            answers: Path = typer.Option(None, help='A JSON or YAML file answering the define prompts'),
+            force: bool = typer.Option(False, help='Define the entity even if its inputs are unchanged since the last build')
     ) -> None:
     """
     Writes the client entity and render controller files of an entity
     """
     try:
-        valid_formats = ['1.8.0', '1.10.0']
-        ce_builder = ClientEntityFactory()
-        ce_builder.register_builder('1.8.0', ClientEntityV1_8_0)
-        ce_builder.register_builder('1.10.0', ClientEntityV1_10_0)
-
         if not entity_file.exists() and not template:
             raise typer.BadParameter('The entity file provided DNE', param=entity_file)
         if not rp_folder.exists():
             raise typer.BadParameter('The resource pack provided DNE', param=rp_folder)
-        if fv not in valid_formats:
+        if fv not in VALID_FORMATS:
             print(f'{fv}, is not a valid client entity format version!')
             raise typer.Abort()
         
+        answers_data = Answers.from_file(answers) if answers else Answers()
         if template:
-            identifier = input('What is the identifier of the entity?: ')
+            identifier = ask('What is the identifier of the entity?: ', identifier or answers_data.template_identifier(entity_file))
             builder = template_registry.get_template_builder(template)
             if builder is None:
                 raise typer.Abort(f'The entity template: {template}, is not valid!')
             builder.build_self(entity_file, identifier) # builds out the template file to json
 
-        entity_data = data_from_file(entity_file)
-        behaviors = EntityBehaviors(entity_data)
-        name = behaviors.real_name
-        geo_path = rp_folder.joinpath('models', 'entity', f'{name}.geo.json') if not geo else rp_folder.joinpath('models', 'entity', f'{geo}.geo.json')
-        anim_file = anim if anim else rp_folder.joinpath('animations', f'{name}.animation.json')
-        ac_file = ac if ac else rp_folder.joinpath('animation_controllers', f'{name}.animation_controllers.json')
-        texture_path = texture
-        if not texture_path:
-            file = rp_folder.joinpath('textures', 'entity', f'{name}.png')
-            texture_path = file if file.exists() else rp_folder.joinpath('textures', 'entity', name)
-        
-        if dummy:
-            geo_object = client_entity.geo.Geometry(data_from_file(geo_path), dummy=True)
-            materials = { 'default': 'entity_alphatest' }
-            entity = Entity(materials, geo_object, behaviors)
-            name = entity.name.replace('_', ' ').title()
-            # client entityy
-            ce = ce_builder.create(fv, entity)
-            ce.write_file(rp_folder, dummy=True)
-            return None
-
-        geo_data = data_from_file(geo_path)
-        
-        if geo_data is None and geo_req:
-            raise MissingGeometryError('The entity is missing a required geometry definition!')
-        # define all the short_name: value dictionaries for the entity
-        materials = define_materials(material)
-        textures_dict = define_textures(texture_path, req=texture_req)
-        anim_dict = define_animations(anim_file, req=anim_req)
-        particles_dict = define_particles(anim_file)
-        ac_dict = define_acs(ac_file, req=ac_req)
-        geo_object = client_entity.geo.Geometry(geo_data, dummy=False)
-        sounds = implement_sounds(name, rp_folder)
-        spawn_egg = define_spawn_egg(name, rp_folder)
-        # create the entity object
-        entity = Entity(
-            materials,
-            geo_object,
-            behaviors,
-            textures=textures_dict,
-            anims=anim_dict,
-            acs=ac_dict,
-            spawn_egg=spawn_egg,
-            sounds=sounds,
-            particles=particles_dict
+        options = DefineOptions(
+            fv=fv, anim=anim, ac=ac, geo=geo, material=material, texture=texture, dummy=dummy,
+            ac_req=ac_req, anim_req=anim_req, geo_req=geo_req, sounds_req=sounds_req, texture_req=texture_req,
+            answers=answers_data
         )
-        # client entity
-        ce = ce_builder.create(fv, entity)
-        name = entity.name.replace('_', ' ').title()
-        # create render controller
-        if entity.has_default_rc:
-            ce.add_rc('controller.render.default')
-            build_entity(entity_file, None, behaviors)
-        else:
-            arrays = build_arrays(entity, rp_folder)
-            render_controller = RenderController(f'controller.render.{entity.name}', arrays, materials)
-            build_entity(entity_file, render_controller, behaviors)
-            render_controller.map_mats_to_bones()
-            # write render controller
-            render_controller.convert_to_file(rp_folder.joinpath('render_controllers'))
-            ce.add_rc(render_controller)
-        # write the client_entity file
-        ce.write_file(rp_folder, dummy=False)
-        entity.write_lang(rp_folder)
+        cache = BuildCache(rp_folder)
+        key = cache_key(rp_folder, entity_file)
+        with transaction(): # the entity's files and the shared files are written together once it is fully defined
+            result = define_cached(rp_folder, entity_file, options, SharedOutputs(), None if force else cache.get(key))
+            result.outputs.write(rp_folder)
+        name = result.name.replace('_', ' ').title()
+        if result.skipped:
+            print(f'{name} is unchanged since the last build, use --force to define it again')
+            return None
+        cache.record(key, result.cache_entry)
+        cache.save()
         # log to console
         print(f'{Fore.GREEN}Successfully Defined {name}!')
         print(Style.RESET_ALL)
@@ -152,6 +102,95 @@ def define( rp_folder: Path = typer.Argument(None, help='ABS path to the resourc
         print(f'{Style.DIM}{Fore.YELLOW}Troubleshooting:\n', '+Is the file named entity_name.png?\n', '+Is the the file saved in RP/textures/entity or RP/textures/entity/entity_name?', Style.RESET_ALL)
         raise typer.Abort() from exc
 
+    except MissingAnswerError as exc:
+        print(f'{Back.BLACK}{Style.BRIGHT}{Fore.RED}FATAL ERROR:\n', f'{Back.RESET}', f'The entity in {entity_file} could not be defined without prompting!', Style.RESET_ALL)
+        print(f'{Style.DIM}{Fore.YELLOW}Troubleshooting:\n', f'+{exc}\n', '+Is the answer in the --answers file under the entity identifier?', Style.RESET_ALL)
+        raise typer.Abort() from exc
+
+@app.command()
+def define_all(
+            rp_folder: Path = typer.Argument(None, help='ABS path to the resource pack'),
+            bp_folder: Path = typer.Argument(None, help='ABS path to the behavior pack'),
+            fv: str = typer.Option('1.8.0', help='The format version of the client entities'),
+            ac_req: bool = typer.Option(False, help='If an ac is required'),
+            anim_req: bool = typer.Option(False, help='If an animation is required'),
+            geo_req: bool = typer.Option(True, help="If the entities have a geometry"),
+            sounds_req: bool = typer.Option(False, help='If the entities need sounds'),
+            texture_req: bool = typer.Option(True, help='If the entities require a texture'),
+            workers: int = typer.Option(None, help='Number of worker processes, defaults to the cpu count, 1 defines the entities in this process'),
+            answers: Path = typer.Option(None, help='A JSON or YAML file answering the define prompts of each entity'),
+            force: bool = typer.Option(False, help='Define every entity even if its inputs are unchanged since the last build')
+    ) -> None:
+    """
+    Defines every entity in the behavior pack's entities folder in parallel
+    """
+    entities_folder = bp_folder.joinpath('entities')
+    if not rp_folder.exists():
+        raise typer.BadParameter('The resource pack provided DNE', param=rp_folder)
+    if not entities_folder.exists():
+        raise typer.BadParameter('The behavior pack provided has no entities folder', param=bp_folder)
+    if fv not in VALID_FORMATS:
+        print(f'{fv}, is not a valid client entity format version!')
+        raise typer.Abort()
+
+    options = DefineOptions(
+        fv=fv, ac_req=ac_req, anim_req=anim_req, geo_req=geo_req, sounds_req=sounds_req, texture_req=texture_req,
+        answers=Answers.from_file(answers) if answers else Answers()
+    )
+    entity_files = sorted(entities_folder.glob('*.json'))
+    results = pipeline.define_all(rp_folder, entity_files, options, workers=workers, force=force)
+
+    failures = 0
+    skipped = 0
+    for entity_file in entity_files:
+        result = results[entity_file]
+        if result.error is not None:
+            failures += 1
+            print(f'{Fore.RED}Failed {entity_file.stem}: {result.error}{Style.RESET_ALL}')
+        elif result.skipped:
+            skipped += 1
+            print(f'{Style.DIM}Unchanged {entity_file.stem}{Style.RESET_ALL}')
+        else:
+            print(f'{Fore.GREEN}Defined {entity_file.stem}{Style.RESET_ALL}')
+    print(f'{len(entity_files) - failures} of {len(entity_files)} entities defined successfully, {skipped} unchanged')
+    if failures:
+        raise typer.Exit(code=1)
+
+@app.command()
+def cost(
+            rp_folder: Path = typer.Argument(None, help='ABS path to the resource pack'),
+            sort: str = typer.Option('score', help=f'The column the entities are sorted by, one of {", ".join(COLUMNS)}'),
+            top: int = typer.Option(None, help='Only list this many of the most expensive entities'),
+            csv_file: Path = typer.Option(None, '--csv', help='Also write the table to this CSV file'),
+            json_file: Path = typer.Option(None, '--json', help='Also write the table to this JSON file')
+    ) -> None:
+    """
+    Scores the render cost of every client entity from its geometry, textures, materials and render controllers
+    """
+    if not rp_folder.exists():
+        raise typer.BadParameter('The resource pack provided DNE', param=rp_folder)
+    if sort not in COLUMNS:
+        raise typer.BadParameter(f'{sort} is not one of {", ".join(COLUMNS)}', param_hint='--sort')
+
+    rows = [entity.to_dict() for entity in entity_costs(rp_folder)]
+    rows.sort(key=lambda row: row[sort], reverse=sort != 'identifier')
+    if top is not None:
+        rows = rows[:top]
+
+    width = max([len('identifier')] + [len(row['identifier']) for row in rows])
+    headers = [column.replace('_', ' ') for column in COLUMNS[1:]]
+    print(f'{"identifier":<{width}}  ' + '  '.join(headers))
+    for row in rows:
+        print(f'{row["identifier"]:<{width}}  ' + '  '.join(f'{row[column]:>{len(header)}}' for column, header in zip(COLUMNS[1:], headers)))
+
+    if csv_file is not None:
+        with csv_file.open('w', newline='', encoding='UTF-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if json_file is not None:
+        write_to_file(json_file, rows)
+
 @app.command()
 def add_sounds(
     rp_path: Path = typer.Argument(default=None), 
@@ -0,0 +1,120 @@
+"""Scores how expensive each client entity of a resource pack is to render
+
+"""
+from addons.entity.client_entity.geo import Geometry
+from addons.helpers import data_from_file
+from addons.assets import get_index
+from addons.textures import BYTES_PER_PIXEL, find_texture, read_texture_size
+from addons.errors import BadDataInputExcep
+
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+BLEND_WEIGHT = 2 # blended materials are drawn after sorting, without early depth rejection
+TEXTURE_BYTES_PER_POINT = 1024 # a KiB of texture memory scores the same as drawing a face
+
+@dataclass
+class EntityCost:
+    """The render cost of one client entity, as it is defined in the resource pack"""
+    identifier: str
+    geometries: int = 0
+    cubes: int = 0
+    faces: int = 0
+    textures: int = 0
+    texture_pixels: int = 0
+    texture_bytes: int = 0
+    largest_array: int = 0
+    materials: int = 0
+    blended_materials: int = 0
+    render_controllers: int = 0
+
+    @property
+    def score(self) -> int:
+        """The faces drawn for one instance of the entity, doubled when a material is blended, plus its texture memory"""
+        draw = self.faces * max(1, self.render_controllers) * (BLEND_WEIGHT if self.blended_materials else 1)
+        return draw + self.texture_bytes // TEXTURE_BYTES_PER_POINT
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'score': self.score}
+
+COLUMNS = [f.name for f in fields(EntityCost)] + ['score']
+
+def is_blended(material: str) -> bool:
+    """Whether a material blends with what is behind it, judged by the vanilla naming of entity materials"""
+    return 'blend' in material.split(':')[0]
+
+def _geometry_counts(rp_path: Path) -> dict[str, tuple[int, int]]:
+    """Returns the cubes and faces of every geometry in the pack's models folder, keyed by identifier"""
+    counts = {}
+    for geo_file in get_index(rp_path).rglob(rp_path.joinpath('models'), '*.json'):
+        try:
+            counts.update(Geometry.from_file(geo_file).get_cube_counts())
+        except BadDataInputExcep:
+            continue # older geometry formats and broken files are left out
+    return counts
+
+def _render_controllers(rp_path: Path) -> dict[str, dict]:
+    """Returns every render controller in the pack's render_controllers folder, keyed by identifier"""
+    controllers = {}
+    for rc_file in get_index(rp_path).rglob(rp_path.joinpath('render_controllers'), '*.json'):
+        try:
+            controllers.update(data_from_file(rc_file).get('render_controllers') or {})
+        except (AttributeError, ValueError):
+            continue
+    return controllers
+
+def entity_costs(rp_path: Path) -> list[EntityCost]:
+    """
+    Scores every client entity in the resource pack's entity folder
+
+    Parameters
+    ----------
+    rp_path : Path
+        The resource pack whose entities have been defined
+
+    Returns
+    -------
+    list[EntityCost]
+        The cost of each entity, in the order of the entity files
+    """
+    index = get_index(rp_path)
+    geo_counts = _geometry_counts(rp_path)
+    controllers = _render_controllers(rp_path)
+    costs = []
+    for entity_file in index.rglob(rp_path.joinpath('entity'), '*.json'):
+        try:
+            description = data_from_file(entity_file)['minecraft:client_entity']['description']
+        except (KeyError, TypeError, ValueError):
+            continue
+        cost = EntityCost(description.get('identifier', entity_file.stem))
+        rc_names = [rc if isinstance(rc, str) else next(iter(rc), None) for rc in description.get('render_controllers') or []]
+        cost.render_controllers = len(rc_names)
+
+        geometries = description.get('geometry') or {}
+        models = []
+        arrays = {}
+        for rc_name in rc_names:
+            rc_arrays = (controllers.get(rc_name) or {}).get('arrays') or {}
+            models.extend((rc_arrays.get('geometries') or {}).get('Array.models') or [])
+            arrays.update(rc_arrays.get('textures') or {})
+        # only one geometry of Array.models is drawn at a time, so the largest is the one that counts
+        drawn = [geometries.get(model.split('.', 1)[-1], model.split('.', 1)[-1]) for model in models] or list(geometries.values())
+        cost.geometries = len(models) or len(geometries)
+        counts = [geo_counts[identifier] for identifier in drawn if identifier in geo_counts]
+        if counts:
+            cost.cubes, cost.faces = max(counts, key=lambda count: count[1])
+        cost.largest_array = max((len(array) for array in arrays.values()), default=0)
+
+        for path in (description.get('textures') or {}).values():
+            found = find_texture(index, rp_path, path)
+            size = read_texture_size(found) if found is not None else None
+            cost.textures += 1
+            if size is not None:
+                cost.texture_pixels += size[0] * size[1]
+        cost.texture_bytes = cost.texture_pixels * BYTES_PER_PIXEL
+
+        materials = list((description.get('materials') or {}).values())
+        cost.materials = len(materials)
+        cost.blended_materials = sum(1 for material in materials if is_blended(material))
+        costs.append(cost)
+    return costs
@@ -4,17 +4,27 @@
 from addons.entity.client_entity.entity import Entity
 from addons.errors import *
 from addons.helpers import data_from_file, write_to_file, get_short_name
+from addons.jsonstream import load_selected
+from addons.assets import get_index
+from addons import metrics
+from addons.answers import ask
 
 import os
 from pathlib import Path
 
-def define_materials(materials: list[str]) -> dict[str, str]:
+# only the names and particle effects are read from animation files, not their bones and keyframes
+ANIMATION_SELECTION = {'animations': {'*': {'particle_effects': True}}}
+ANIMATION_CONTROLLER_SELECTION = {'animation_controllers': {'*': {}}}
+
+def define_materials(materials: list[str], *, names: dict[str, str] = None) -> dict[str, str]:
     """Defines the shortname: value pairs for materials in the client entity file
 
     Parameters
     ----------
     materials : list[str]
         The list of materials entered by the user
+    names : dict[str, str], optional
+        The material: short_name answers, the user is prompted for any material missing from it
 
     Returns
     -------
@@ -24,13 +34,14 @@ def define_materials(materials: list[str]) -> dict[str, str]:
     if not materials:
         return {'default': 'entity_alphatest'}
 
+    names = names or {}
     material_names = []
     for material in materials:
-        name = input(f'what is the short-name of the material -> {material}: ')
+        name = ask(f'what is the short-name of the material -> {material}: ', names.get(material))
         material_names.append(name)
     return { name: value for name, value in zip(material_names, materials) }
 
-def define_textures(texture_path: Path, *, req: bool = False) -> dict[str, str] | None:
+def define_textures(texture_path: Path, *, req: bool = False, rp_path: Path = None) -> dict[str, str] | None:
     """Creates the short_name: texture dictionary for entity textures
 
     Parameters
@@ -39,6 +50,8 @@ def define_textures(texture_path: Path, *, req: bool = False) -> dict[str, str]
         The path to the texture or textures folder
     req : bool, optional
         If the texture is required for the entity, by default False
+    rp_path : Path, optional
+        The resource pack of the entity, when given the textures are looked up in its asset index
 
     Returns
     -------
@@ -56,7 +69,10 @@ def define_textures(texture_path: Path, *, req: bool = False) -> dict[str, str]
     if texture_path.is_file():
         return {'default': f'textures/entity/{texture_path.stem}'}
     
-    textures = [str(textr) for textr in texture_path.rglob('*.png')]
+    with metrics.phase('scan_textures'):
+        found = get_index(rp_path).rglob(texture_path, '*.png') if rp_path is not None else texture_path.rglob('*.png')
+        textures = [str(textr) for textr in found]
+    metrics.count(metrics.FILES_SCANNED, len(textures))
     for i, textr in enumerate(textures):
         pos = textr.find('textures')
         textr = textr[pos:].replace('.png', '').replace(os.sep, '/')
@@ -65,7 +81,7 @@ def define_textures(texture_path: Path, *, req: bool = False) -> dict[str, str]
 
 def define_particles(anim_file: Path) -> dict[str, str] | None:
     """Defines the particles by parising any listed in the animation file"""
-    anim_data = data_from_file(anim_file)
+    anim_data = load_selected(anim_file, ANIMATION_SELECTION)
     particles = {}
     if anim_data is None:
         return None
@@ -103,7 +119,7 @@ def define_animations(anim_file: Path, *, req: bool = False) -> dict[str, str] |
     if req and not anim_file.is_file():
         raise MissingAnimationError()
     
-    anim_data = data_from_file(anim_file)
+    anim_data = load_selected(anim_file, ANIMATION_SELECTION)
     return { animation.split('.')[-1]: animation for animation in list(anim_data['animations']) } if anim_data is not None else None
 
 
@@ -130,16 +146,17 @@ def define_acs(acs_file: Path, *, req: bool = False) -> dict[str, str] | None:
     if req and not acs_file.is_file():
         raise MissingAnimationControllerFile()
     
-    ac_data = data_from_file(acs_file)
+    ac_data = load_selected(acs_file, ANIMATION_CONTROLLER_SELECTION)
     return [{controller.split('.')[-1]: controller} for controller in list(ac_data['animation_controllers'])] if ac_data is not None else None
 
-def define_spawn_egg(name: str, rp_path: Path, base_color: str = None, overlay_color: str = None) -> dict:
+def define_spawn_egg(name: str, rp_path: Path, base_color: str = None, overlay_color: str = None, *, atlas: dict = None) -> dict:
     """
     Creates the spawn egg dictionary to be added to the client entity file of an entity
 
     :param base_color: A hex code of the color to be used for the base color of the egg
     :param overlay_color: A hex code of the color to be used as an overlay for the egg
     :param texture: The texture short name to be used as the spawn egg texture
+    :param atlas: collects the item_texture.json texture_data entry instead of writing the atlas
     """
     spawn_egg_texture = rp_path.joinpath('textures', 'items', f'{name}.png')
     spawn_egg = {}
@@ -147,6 +164,9 @@ def define_spawn_egg(name: str, rp_path: Path, base_color: str = None, overlay_c
     if spawn_egg_texture.exists():
         spawn_egg['texture'] = name
         spawn_egg['texture_index'] = 0
+        if atlas is not None:
+            atlas[name] = { 'textures': f'textures/items/{name}' }
+            return spawn_egg
         item_atlas_path = rp_path.joinpath('textures', 'item_texture.json')
 
         item_atlas = data_from_file(item_atlas_path)
@@ -0,0 +1,328 @@
+"""The entity define pipeline, shared by the single and batch define commands
+
+"""
+import addons
+import addons.entity.client_entity as client_entity
+from addons.sounds import entity_sound_definitions, map_entity_sounds
+from addons.helpers import data_from_file, write_to_file
+from addons.lang import LangFile
+from addons.entity.client_entity.factory import ClientEntityFactory
+from addons.entity.client_entity.versions import ClientEntityV1_8_0, ClientEntityV1_10_0
+from addons.entity.behaviors import EntityBehaviors
+from addons.entity.builder import build_entity, build_arrays
+from addons.entity.client_entity.render_controller import RenderController
+from addons.entity.client_entity.entity import Entity
+from addons.entity.define import *
+from addons.answers import Answers, set_interactive
+from addons import jsonformat, metrics
+from addons.assets import get_index
+from addons.cache import BuildCache, InputDigest, is_fresh
+from addons.errors import MissingGeometryError
+from addons.transaction import transaction
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+import os
+
+VALID_FORMATS = ['1.8.0', '1.10.0']
+
+@dataclass
+class DefineOptions:
+    """The options of the entity define command that shape the generated files"""
+    fv: str = '1.8.0'
+    anim: str = ''
+    ac: str = ''
+    geo: str = ''
+    material: list[str] | None = None
+    texture: str | None = None
+    dummy: bool = False
+    ac_req: bool = False
+    anim_req: bool = False
+    geo_req: bool = True
+    sounds_req: bool = False
+    texture_req: bool = True
+    answers: Answers = field(default_factory=Answers)
+
+@dataclass
+class SharedOutputs:
+    """Edits to the files shared by every entity of a resource pack
+
+    They are collected while entities are defined so that sounds.json, item_texture.json and en_US.lang
+    are merged and written once per command instead of once per entity.
+    """
+    sound_events: dict[str, dict] = field(default_factory=lambda: {'entity_sounds': {'entities': {}}})
+    item_textures: dict[str, dict] = field(default_factory=dict)
+    lang: list[str] = field(default_factory=list)
+
+    def merge(self, other: 'SharedOutputs') -> None:
+        """Adds the edits collected by another entity definition"""
+        self.sound_events['entity_sounds']['entities'].update(other.sound_events['entity_sounds']['entities'])
+        self.item_textures.update(other.item_textures)
+        self.lang.extend(other.lang)
+
+    def write(self, rp_path: Path) -> None:
+        """Merges the collected edits into the resource pack's shared files"""
+        entity_sounds: dict = self.sound_events['entity_sounds']['entities']
+        if entity_sounds:
+            sounds_file = rp_path.joinpath('sounds.json')
+            sound_events: dict = data_from_file(sounds_file) or {}
+            written: dict = sound_events.setdefault('entity_sounds', {}).setdefault('entities', {})
+            for name, entry in entity_sounds.items():
+                if name in written:
+                    written[name].setdefault('events', {}).update(entry['events'])
+                else:
+                    written[name] = entry
+            write_to_file(sounds_file, sound_events)
+
+        if self.item_textures:
+            item_atlas_path = rp_path.joinpath('textures', 'item_texture.json')
+            item_atlas = data_from_file(item_atlas_path)
+            if item_atlas is not None:
+                item_atlas['texture_data'].update(self.item_textures)
+                write_to_file(item_atlas_path, item_atlas)
+
+        if self.lang:
+            lang = LangFile(rp_path.joinpath('texts', 'en_US.lang'))
+            lang.update(self.lang)
+            lang.save()
+
+@dataclass
+class DefineResult:
+    """The outcome of defining a single entity"""
+    entity_file: Path
+    name: str = ''
+    skipped: bool = False
+    error: str | None = None
+    cache_entry: dict | None = None
+    outputs: SharedOutputs = field(default_factory=SharedOutputs)
+    metrics: dict | None = None # recorded by the worker process that defined the entity
+
+def client_entity_factory() -> ClientEntityFactory:
+    """Creates the factory with every supported client entity format version registered"""
+    ce_builder = ClientEntityFactory()
+    ce_builder.register_builder('1.8.0', ClientEntityV1_8_0)
+    ce_builder.register_builder('1.10.0', ClientEntityV1_10_0)
+    return ce_builder
+
+def entity_input_paths(rp_folder: Path, name: str, options: DefineOptions) -> tuple[Path, Path, Path, Path]:
+    """Returns the geometry, animation, animation controller and texture paths an entity is defined from"""
+    geo_path = rp_folder.joinpath('models', 'entity', f'{name}.geo.json') if not options.geo else rp_folder.joinpath('models', 'entity', f'{options.geo}.geo.json')
+    anim_file = Path(options.anim) if options.anim else rp_folder.joinpath('animations', f'{name}.animation.json')
+    ac_file = Path(options.ac) if options.ac else rp_folder.joinpath('animation_controllers', f'{name}.animation_controllers.json')
+    texture_path = Path(options.texture) if options.texture else None
+    if not texture_path:
+        file = rp_folder.joinpath('textures', 'entity', f'{name}.png')
+        texture_path = file if file.exists() else rp_folder.joinpath('textures', 'entity', name)
+    return geo_path, anim_file, ac_file, texture_path
+
+def entity_digest(rp_folder: Path, entity_file: Path, behaviors: EntityBehaviors, options: DefineOptions) -> str:
+    """Hashes every input an entity's generated files are built from
+
+    That is the behavior, geometry, animation and animation controller files, the texture and sound listings,
+    the define options and answers, the JSON output mode and the version of the tool.
+    """
+    name = behaviors.real_name
+    geo_path, anim_file, ac_file, texture_path = entity_input_paths(rp_folder, name, options)
+    index = get_index(rp_folder)
+    digest = InputDigest()
+    digest.add_value(addons.__version__)
+    digest.add_value(jsonformat.release_mode()) # switching to a release build rewrites every file
+    digest.add_value({key: value for key, value in vars(options).items() if key != 'answers'})
+    digest.add_value(options.answers.get(behaviors.identifier))
+    for path in [entity_file, geo_path, anim_file, ac_file]:
+        digest.add_file(path)
+    if texture_path.is_file():
+        digest.add_value(texture_path.name)
+    else:
+        digest.add_value([str(textr.relative_to(texture_path)) for textr in index.rglob(texture_path, '*.png')])
+    sounds_folder = rp_folder.joinpath('sounds', 'entity', name)
+    digest.add_value([str(sound.relative_to(sounds_folder)) for sound in index.rglob(sounds_folder)])
+    digest.add_value(index.is_file(rp_folder.joinpath('textures', 'items', f'{name}.png')))
+    return digest.hexdigest()
+
+def cache_key(rp_folder: Path, entity_file: Path) -> str:
+    """The key of an entity in the resource pack's build cache"""
+    return 'entity:' + Path(os.path.relpath(Path(entity_file).absolute(), Path(rp_folder).absolute())).as_posix()
+
+def define_entity(rp_folder: Path, entity_file: Path, options: DefineOptions, outputs: SharedOutputs, *, sound_defs: dict = None) -> Entity | None:
+    """Writes the client entity, render controller and behavior file of an entity
+
+    Parameters
+    ----------
+    rp_folder : Path
+        The resource pack of the entity
+    entity_file : Path
+        The behavior file of the entity
+    options : DefineOptions
+        The options passed to the define command
+    outputs : SharedOutputs
+        Collects the edits to the pack's shared files, the caller writes them
+    sound_defs : dict, optional
+        The pack's sound definitions, regenerated from the sounds folder when not given
+
+    Returns
+    -------
+    Entity | None
+        The defined entity, None for a dummy entity
+    """
+    ce_builder = client_entity_factory()
+    entity_data = data_from_file(entity_file)
+    behaviors = EntityBehaviors(entity_data)
+    name = behaviors.real_name
+    decisions = options.answers.get(behaviors.identifier)
+    geo_path, anim_file, ac_file, texture_path = entity_input_paths(rp_folder, name, options)
+
+    if options.dummy:
+        geo_object = client_entity.geo.Geometry.from_file(geo_path, dummy=True)
+        materials = { 'default': 'entity_alphatest' }
+        entity = Entity(materials, geo_object, behaviors)
+        # client entityy
+        ce = ce_builder.create(options.fv, entity)
+        ce.write_file(rp_folder, dummy=True)
+        return None
+
+    geo_object = client_entity.geo.Geometry.from_file(geo_path)
+
+    if not geo_object.has_data and options.geo_req:
+        raise MissingGeometryError('The entity is missing a required geometry definition!')
+    if sound_defs is None:
+        sound_defs = entity_sound_definitions(rp_folder)
+    # define all the short_name: value dictionaries for the entity
+    material_answers: dict[str, str] = decisions.get('materials') or {}
+    materials = define_materials(options.material or list(material_answers) or None, names=material_answers)
+    textures_dict = define_textures(texture_path, req=options.texture_req, rp_path=rp_folder)
+    anim_dict = define_animations(anim_file, req=options.anim_req)
+    particles_dict = define_particles(anim_file)
+    ac_dict = define_acs(ac_file, req=options.ac_req)
+    sounds = map_entity_sounds(name, sound_defs, outputs.sound_events)
+    spawn_egg = define_spawn_egg(name, rp_folder, atlas=outputs.item_textures)
+    # create the entity object
+    entity = Entity(
+        materials,
+        geo_object,
+        behaviors,
+        textures=textures_dict,
+        anims=anim_dict,
+        acs=ac_dict,
+        spawn_egg=spawn_egg,
+        sounds=sounds,
+        particles=particles_dict
+    )
+    # client entity
+    ce = ce_builder.create(options.fv, entity)
+    # create render controller
+    if entity.has_default_rc:
+        ce.add_rc('controller.render.default')
+        build_entity(entity_file, None, behaviors)
+    else:
+        arrays = build_arrays(entity, rp_folder)
+        render_controller = RenderController(f'controller.render.{entity.name}', arrays, materials)
+        build_entity(entity_file, render_controller, behaviors)
+        render_controller.map_mats_to_bones(decisions.get('bones'))
+        # write render controller
+        render_controller.convert_to_file(rp_folder.joinpath('render_controllers'))
+        ce.add_rc(render_controller)
+    # write the client_entity file
+    ce.write_file(rp_folder, dummy=False)
+    outputs.lang.extend(entity.lang_defs())
+    return entity
+
+def define_cached(rp_folder: Path, entity_file: Path, options: DefineOptions, outputs: SharedOutputs, cached: dict | None, *, sound_defs: dict = None) -> DefineResult:
+    """Defines an entity unless its inputs are unchanged since the build recorded in the cache
+
+    Parameters
+    ----------
+    cached : dict | None
+        The build cache entry of the entity, None to always define it
+
+    Returns
+    -------
+    DefineResult
+        Whether the entity was skipped and the cache entry to record for it
+    """
+    behaviors = EntityBehaviors(data_from_file(entity_file))
+    if cached is not None and is_fresh(cached, entity_digest(rp_folder, entity_file, behaviors, options), rp_folder):
+        return DefineResult(entity_file, behaviors.real_name, skipped=True, cache_entry=cached, outputs=outputs)
+
+    with transaction():
+        entity = define_entity(rp_folder, entity_file, options, outputs, sound_defs=sound_defs)
+        # the build rewrites the behavior file, so the digest recorded is the one of the built file
+        built = EntityBehaviors(data_from_file(entity_file))
+        output_files = [f'entity/{built.real_name}.entity.json']
+        if entity is not None and not entity.has_default_rc:
+            output_files.append(f'render_controllers/{entity.name}.render_controllers.json')
+        entry = {'digest': entity_digest(rp_folder, entity_file, built, options), 'outputs': output_files}
+    return DefineResult(entity_file, built.real_name, cache_entry=entry, outputs=outputs)
+
+_worker_state: dict = {}
+
+def _init_worker(rp_folder: Path, sound_defs: dict, release_mode: tuple[bool, int | None], recording: bool) -> None:
+    """Hands every worker process the pack's sound definitions once instead of once per entity"""
+    set_interactive(False) # workers cannot share the terminal, unanswered questions fail the entity instead
+    jsonformat.set_release(*release_mode) # spawned workers do not inherit the mode set by the command line
+    metrics.init_worker(recording)
+    _worker_state['rp_folder'] = rp_folder
+    _worker_state['sound_defs'] = sound_defs
+
+def _define_one(rp_folder: Path, entity_file: Path, options: DefineOptions, cached: dict | None, sound_defs: dict) -> DefineResult:
+    try:
+        return define_cached(rp_folder, entity_file, options, SharedOutputs(), cached, sound_defs=sound_defs)
+    except Exception as exc:
+        return DefineResult(entity_file, entity_file.stem, error=f'{type(exc).__name__}: {exc}')
+
+def _define_worker(entity_file: Path, options: DefineOptions, cached: dict | None) -> DefineResult:
+    result = _define_one(_worker_state['rp_folder'], entity_file, options, cached, _worker_state['sound_defs'])
+    result.metrics = metrics.drain()
+    return result
+
+def define_all(rp_folder: Path, entity_files: list[Path], options: DefineOptions, *, workers: int = None, force: bool = False) -> dict[Path, DefineResult]:
+    """Defines many entities across a process pool and writes the shared files once at the end
+
+    With one worker the entities are defined in this process, where unanswered questions are prompted for.
+    The edits to the shared files are merged in the order of entity_files, so the files written do not depend
+    on which worker finishes first.
+
+    Parameters
+    ----------
+    rp_folder : Path
+        The resource pack of the entities
+    entity_files : list[Path]
+        The behavior files of the entities to define
+    options : DefineOptions
+        The options used for every entity
+    workers : int, optional
+        The number of worker processes, by default the cpu count, 1 defines the entities in this process
+    force : bool, optional
+        Define every entity even if its inputs are unchanged since the last build, by default False
+
+    Returns
+    -------
+    dict[Path, DefineResult]
+        The result of each entity file
+    """
+    cache = BuildCache(rp_folder)
+    sound_defs = entity_sound_definitions(rp_folder)
+    outputs = SharedOutputs()
+    results: dict[Path, DefineResult] = {}
+    cached = [None if force else cache.get(cache_key(rp_folder, entity_file)) for entity_file in entity_files]
+
+    def collect(result: DefineResult) -> None:
+        results[result.entity_file] = result
+        metrics.merge(result.metrics)
+        if result.error is None:
+            outputs.merge(result.outputs)
+            cache.record(cache_key(rp_folder, result.entity_file), result.cache_entry)
+
+    if workers == 1 or len(entity_files) <= 1:
+        for entity_file, entry in zip(entity_files, cached):
+            collect(_define_one(rp_folder, entity_file, options, entry, sound_defs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rp_folder, sound_defs, jsonformat.release_mode(), metrics.is_recording())) as pool:
+            futures = [pool.submit(_define_worker, entity_file, options, entry) for entity_file, entry in zip(entity_files, cached)]
+            for future in futures: # in submission order, so the shared files are merged the same way on every run
+                collect(future.result())
+    with transaction():
+        outputs.write(rp_folder)
+    cache.save()
+    return results
@@ -52,4 +52,9 @@ class ComponentPropertyTypeError(Exception):
     """Exception raised when a add-on component (custom or minecraft) has a property passed with an incorrect value type"""
     def __init__(self, property, passed_type, expected_type):
         self.msg = f'The property: {property} was passed as type: {passed_type}. Expected: {expected_type}'
-        super().__init__(self.msg)
\ No newline at end of file
+        super().__init__(self.msg)
+
+class MissingAnswerError(Exception):
+    """Exception raised when a define command needs a decision that was not answered and the user cannot be prompted"""
+    def __init__(self, msg=''):
+        super().__init__(msg)
\ No newline at end of file
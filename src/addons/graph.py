@@ -0,0 +1,225 @@
+"""The dependency graph between a project's source files and the steps that build its resource pack
+
+The graph follows the naming conventions of the define commands: an entity named <name> is built from
+models/entity/<name>.geo.json, animations/<name>.animation.json, animation_controllers/<name>.animation_controllers.json,
+textures/entity/<name> and sounds/entity/<name>, and writes entity/<name>.entity.json and
+render_controllers/<name>.render_controllers.json. Blocks and items are found the same way.
+"""
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from pathlib import Path
+from addons.assets import get_index
+from addons.entity.pipeline import DefineOptions, define_all, entity_input_paths
+from addons.jsonstream import load_selected
+
+ENTITY_SOUNDS = 'sounds:entity'
+BLOCK_SOUNDS = 'sounds:block'
+REBUILT = 'rebuilt'
+UNCHANGED = 'unchanged'
+
+@dataclass
+class BuildStep:
+    """A define command for one entity, block, item or sound folder and the files it reads and writes
+
+    An input that is a folder stands for every file under it.
+    """
+    kind: str
+    name: str
+    source: Path | None = None
+    inputs: list[Path] = field(default_factory=list)
+    outputs: list[Path] = field(default_factory=list)
+    requires: list[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f'{self.kind}:{self.name}'
+
+_SELECTIONS = {
+    'entity': ('minecraft:entity', {'minecraft:entity': {'description': {'identifier': True}}}),
+    'block': ('minecraft:block', {'minecraft:block': {'description': {'identifier': True}}}),
+    'item': ('minecraft:item', {'minecraft:item': {'description': {'identifier': True}}})
+}
+
+def read_short_name(path: Path, kind: str) -> str | None:
+    """Reads the short name of the identifier of an entity, block or item behavior file, None if it is missing or broken"""
+    key, selection = _SELECTIONS[kind]
+    try:
+        return load_selected(path, selection)[key]['description']['identifier'].split(':')[-1]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def read_behavior_names(bp_path: Path) -> dict[str, dict[Path, str]]:
+    """Reads the short name of every entity, block and item of a behavior pack, keyed by kind and then file"""
+    index = get_index(bp_path)
+    folders = {'entity': 'entities', 'block': 'blocks', 'item': 'items'}
+    names: dict[str, dict[Path, str]] = {}
+    for kind, folder in folders.items():
+        files = index.rglob(bp_path.joinpath(folder), '*.json')
+        names[kind] = {path: name for path in files if (name := read_short_name(path, kind)) is not None}
+    return names
+
+def entity_step(rp_path: Path, entity_file: Path, name: str, options: DefineOptions) -> BuildStep:
+    geo_path, anim_file, ac_file, _ = entity_input_paths(rp_path, name, options)
+    textures = rp_path.joinpath('textures')
+    return BuildStep('entity', name, entity_file,
+        inputs=[
+            entity_file, geo_path, anim_file, ac_file,
+            textures.joinpath('entity', f'{name}.png'), textures.joinpath('entity', name),
+            textures.joinpath('items', f'{name}.png'), rp_path.joinpath('sounds', 'entity', name)
+        ],
+        outputs=[
+            rp_path.joinpath('entity', f'{name}.entity.json'), rp_path.joinpath('render_controllers', f'{name}.render_controllers.json'),
+            rp_path.joinpath('sounds.json'), textures.joinpath('item_texture.json'), rp_path.joinpath('texts', 'en_US.lang')
+        ],
+        requires=[ENTITY_SOUNDS] # the sound events of an entity are mapped from the regenerated sound definitions
+    )
+
+def block_step(rp_path: Path, block_file: Path, name: str) -> BuildStep:
+    return BuildStep('block', name, block_file,
+        inputs=[block_file, rp_path.joinpath('textures', 'blocks', name), rp_path.joinpath('models', 'block', f'{name}.geo.json')],
+        outputs=[block_file, rp_path.joinpath('blocks.json'), rp_path.joinpath('textures', 'terrain_texture.json'), rp_path.joinpath('texts', 'en_US.lang')]
+    )
+
+def item_step(rp_path: Path, item_file: Path, name: str) -> BuildStep:
+    return BuildStep('item', name, item_file,
+        inputs=[item_file, rp_path.joinpath('textures', 'items', f'{name}.png')],
+        outputs=[rp_path.joinpath('items', f'{name}.item.json'), rp_path.joinpath('textures', 'item_texture.json'), rp_path.joinpath('texts', 'en_US.lang')]
+    )
+
+def sound_steps(rp_path: Path) -> list[BuildStep]:
+    sounds = rp_path.joinpath('sounds')
+    return [
+        BuildStep('sounds', 'entity', inputs=[sounds.joinpath('entity')], outputs=[sounds.joinpath('sound_definitions.json')]),
+        BuildStep('sounds', 'block', inputs=[sounds.joinpath('block')], outputs=[sounds.joinpath('sound_definitions.json'), rp_path.joinpath('sounds.json')])
+    ]
+
+class DependencyGraph:
+    """The build steps of a project and the order they have to run in
+
+    A step runs after the steps it requires and after any step that writes one of its inputs.
+    """
+    def __init__(self, steps: list[BuildStep]):
+        self.__steps: dict[str, BuildStep] = {step.key: step for step in steps}
+        writers: dict[Path, set[str]] = {}
+        self.__readers: dict[Path, set[str]] = {}
+        for step in steps:
+            for output in step.outputs:
+                writers.setdefault(output, set()).add(step.key)
+            for input_path in step.inputs:
+                self.__readers.setdefault(input_path, set()).add(step.key)
+        self.__predecessors: dict[str, set[str]] = {}
+        for step in steps:
+            predecessors = {key for key in step.requires if key in self.__steps}
+            for input_path in step.inputs:
+                predecessors |= writers.get(input_path, set())
+            predecessors.discard(step.key) # a block rewrites its own behavior file
+            self.__predecessors[step.key] = predecessors
+
+    @classmethod
+    def from_names(cls, rp_path: Path, names: dict[str, dict[Path, str]], options: DefineOptions = None) -> 'DependencyGraph':
+        """Builds the graph of a resource pack from the short names of the behavior pack's files
+
+        :param names: the short name of each behavior file, keyed by kind as read by read_behavior_names
+        :param options: the entity define options, which can point an entity at other geometry and animation files
+        """
+        rp_path = Path(rp_path).absolute()
+        options = options or DefineOptions()
+        steps = sound_steps(rp_path)
+        steps.extend(entity_step(rp_path, path, name, options) for path, name in names.get('entity', {}).items())
+        steps.extend(block_step(rp_path, path, name) for path, name in names.get('block', {}).items())
+        steps.extend(item_step(rp_path, path, name) for path, name in names.get('item', {}).items())
+        return cls(steps)
+
+    @classmethod
+    def from_project(cls, bp_path: Path, rp_path: Path, options: DefineOptions = None) -> 'DependencyGraph':
+        return cls.from_names(rp_path, read_behavior_names(Path(bp_path).absolute()), options)
+
+    @property
+    def steps(self) -> dict[str, BuildStep]:
+        return self.__steps
+
+    def predecessors(self, key: str) -> set[str]:
+        return set(self.__predecessors.get(key, ()))
+
+    def affected(self, paths: list[Path]) -> set[str]:
+        """The steps that read a changed file, and the steps that read what those steps write"""
+        affected: set[str] = set()
+        for path in paths:
+            path = Path(path).absolute()
+            for candidate in [path, *path.parents]: # a step reading a folder reads every file under it
+                affected |= self.__readers.get(candidate, set())
+        pending = list(affected)
+        while pending:
+            for output in self.__steps[pending.pop()].outputs:
+                for key in self.__readers.get(output, set()) - affected:
+                    affected.add(key)
+                    pending.append(key)
+        return affected
+
+    def plan(self, paths: list[Path] = None) -> list[list[BuildStep]]:
+        """
+        Orders the steps to rebuild for a set of changed files
+
+        :param paths: the files that changed, every step is planned when None
+        :returns: batches of steps, each batch only needs the batches before it so its steps can run in parallel
+        """
+        keys = set(self.__steps) if paths is None else self.affected(paths)
+        sorter = TopologicalSorter({key: self.__predecessors[key] & keys for key in keys})
+        sorter.prepare()
+        batches = []
+        while sorter.is_active():
+            ready = sorted(sorter.get_ready())
+            batches.append([self.__steps[key] for key in ready])
+            sorter.done(*ready)
+        return batches
+
+def run_step(step: BuildStep, rp_path: Path, options: DefineOptions, *, rp_name: str = 'Resource Pack', namespace: str = 'custom') -> None:
+    """Runs a block, item or sound step, entities are defined through the entity pipeline instead"""
+    from addons.blocks import define_block
+    from addons.items import create_item_defs
+    from addons.sounds import define_block_sounds, entity_sound_definitions
+    if step.key == ENTITY_SOUNDS:
+        entity_sound_definitions(rp_path)
+    elif step.key == BLOCK_SOUNDS:
+        define_block_sounds(rp_path, namespace)
+    elif step.kind == 'block':
+        define_block(step.source, rp_path, rp_name, answers=options.answers)
+    elif step.kind == 'item':
+        create_item_defs(step.source, rp_path, 'Items', None)
+    else:
+        raise ValueError(f'{step.key} is not a step that runs on its own')
+
+def run_plan(batches: list[list[BuildStep]], rp_path: Path, options: DefineOptions, *, workers: int = None, force: bool = False, rp_name: str = 'Resource Pack', namespace: str = 'custom') -> dict[str, str]:
+    """
+    Runs the batches of a plan in order
+
+    The entities of a batch are defined in parallel by the entity pipeline, which merges their edits to the shared files.
+    The blocks of a batch are merged into blocks.json and terrain_texture.json, which are written once.
+    Items and sound folders rewrite the shared files directly, so they run one at a time.
+
+    :param workers: the number of processes defining entities
+    :param force: define entities even if their inputs are unchanged since the last build
+    :returns: the outcome of each step, REBUILT, UNCHANGED or the error it failed with
+    """
+    from addons.blocks import define_blocks
+    results: dict[str, str] = {}
+    for batch in batches:
+        entities = [step for step in batch if step.kind == 'entity']
+        if entities:
+            steps = {step.source: step for step in entities}
+            for entity_file, result in define_all(rp_path, list(steps), options, workers=workers, force=force).items():
+                results[steps[entity_file].key] = result.error or (UNCHANGED if result.skipped else REBUILT)
+        blocks = {step.source: step for step in batch if step.kind == 'block'}
+        if blocks:
+            # resolved in this process so unanswered questions can still be prompted for
+            for block_file, error in define_blocks(list(blocks), rp_path, rp_name, answers=options.answers, workers=1).items():
+                results[blocks[block_file].key] = error or REBUILT
+        for step in batch:
+            if step.kind in ('entity', 'block'):
+                continue
+            try:
+                run_step(step, rp_path, options, rp_name=rp_name, namespace=namespace)
+                results[step.key] = REBUILT
+            except Exception as exc:
+                results[step.key] = f'{type(exc).__name__}: {exc}'
+    return results
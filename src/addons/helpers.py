@@ -1,6 +1,9 @@
 """Helpers for the project"""
 
+import io
 import json
+import os
+from addons import jsonformat, metrics, transaction
 from addons.errors import InvalidArgError
 from pathlib import Path
 from typing import Union
@@ -14,6 +17,14 @@ def id_to_title(identifier: str) -> str:
     """Converts an id to a title for writing to lang files"""
     return get_short_name(identifier).replace('_', ' ').title()
 
+def format_size(size: int) -> str:
+    """Formats a number of bytes in B, KiB, MiB or GiB, whichever keeps the number below 1024"""
+    for unit in ['B', 'KiB', 'MiB']:
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
+
 def data_from_file(path: Path) -> Union[dict[str, str], list[str]]:
     """ opens a json or txt file and loads the data from it
 
@@ -23,19 +34,35 @@ def data_from_file(path: Path) -> Union[dict[str, str], list[str]]:
     """
     if not isinstance(path, Path):
         path = Path(path)
+    pending = transaction.pending_bytes(path)
+    if pending is not None:
+        # the file was written in the active transaction and is not on disk yet
+        if path.suffix == '.json':
+            with metrics.phase(metrics.JSON_PARSE):
+                return json.loads(pending)
+        if path.suffix in ['.lang', '.txt']:
+            return io.StringIO(pending.decode('UTF-8'), newline=None).readlines()
     if not path.is_file() and path.exists():
         raise InvalidArgError(path, data_from_file)
     if not path.exists():
         return None
     with path.open('r', encoding='UTF-8') as f:
+        metrics.count(metrics.FILES_READ)
+        metrics.count(metrics.BYTES_READ, os.fstat(f.fileno()).st_size)
         if path.suffix == '.json':
-            return json.load(f)
+            text = f.read()
+            with metrics.phase(metrics.JSON_PARSE):
+                return json.loads(text)
         if path.suffix in ['.lang', '.txt']:
             return f.readlines()
 
 def write_to_file(path: Path, data: Union[dict[str, str], list[str]], writing: bool = True):
     """ Writes a python dictionary to a JSON file
 
+    Inside a transaction the file is buffered until the transaction commits, outside of one it is written
+    straight away. Either way it is written through a temporary file and left untouched if its contents are unchanged.
+    JSON is indented, or minified when the release mode of jsonformat is set.
+
     :param path: the path and file name where the file should be written
     :param data: a python dictionary or list of striings to convert to json format or to loop through and add to a text file
     :type data: dict or list of strings
@@ -49,20 +76,11 @@ def write_to_file(path: Path, data: Union[dict[str, str], list[str]], writing: b
         raise InvalidArgError(path, write_to_file)
 
     if path.suffix == '.json':
-        if writing:
-            with path.open('w', encoding='UTF-8') as f:
-                json.dump(data, f, indent = 4, sort_keys=True)
-        else:
-            with path.open('r+', encoding='UTF-8') as f:
-                f.seek(0)
-                json.dump(data, f, indent=4, sort_keys=True)
-                f.truncate()
-    else:
-        if writing:
-            with path.open('w', encoding='UTF-8') as f:
-                for line in data:
-                    f.write(line+"\n")
-        else:
-            with path.open('a', encoding='UTF-8') as f:
-                for line in data:
-                    f.write(line+"\n")
\ No newline at end of file
+        # the 'r+' edit mode rewrote the whole file as well, so both modes serialize the same way
+        transaction.write_bytes(path, metrics.timed(metrics.JSON_SERIALIZE, jsonformat.iter_json(data)))
+        return None
+    text = ''.join(line + '\n' for line in data)
+    encoded = text.replace('\n', os.linesep).encode('UTF-8') # the newlines the file used to be written with in text mode
+    if not writing:
+        encoded = (transaction.read_bytes(path) or b'') + encoded
+    transaction.write_bytes(path, encoded)
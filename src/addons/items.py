@@ -1,5 +1,7 @@
 import os, typer, glob
 from addons.helpers import data_from_file, write_to_file
+from addons.lang import LangFile
+from addons.transaction import transaction
 from pathlib import Path
 from typing import Union
 
@@ -42,16 +44,17 @@ def create_item_defs(
     ):
     """Defines an item"""
     try:
-        item_data: dict = data_from_file(item_path)
-        item = Item(item_data)
+        with transaction():
+            item_data: dict = data_from_file(item_path)
+            item = Item(item_data)
 
-        item_rp_folder: Path = rp_path.joinpath('items')
-        attachables_folder: Path = rp_path.joinpath('attachables')
-        item_textures_folder: Path = rp_path.joinpath('textures', 'items')
-        item_textures_file: Path = rp_path.joinpath('textures', 'item_texture.json')
-        texts_file: Path = rp_path.joinpath('texts', 'en_US.lang')
+            item_rp_folder: Path = rp_path.joinpath('items')
+            attachables_folder: Path = rp_path.joinpath('attachables')
+            item_textures_folder: Path = rp_path.joinpath('textures', 'items')
+            item_textures_file: Path = rp_path.joinpath('textures', 'item_texture.json')
+            texts_file: Path = rp_path.joinpath('texts', 'en_US.lang')
 
-        with open(texts_file, 'a+') as lang_data:
+            lang = LangFile(texts_file)
             # basic items atlas
             atlas: dict
             if not item_textures_file.exists():
@@ -69,7 +72,6 @@ def create_item_defs(
                 item_texture = item_textures_folder.joinpath(f'{item.name}.png')
                 txtr_atlas[item.name] = {}
                 txtr_atlas[item.name]['textures'] = str(item_texture)[str(item_texture).find('textures'):].replace(os.sep, '/').replace('.png', '')
-                lang_def = f'item.{item.identifier}.name={item.real_name}\n'
                 item_rp_data = {
                         'format_version': '1.10.0',
                         'minecraft:item': {
@@ -87,7 +89,8 @@ def create_item_defs(
                     item_rp_data['minecraft:item']['components']['minecraft:use_animation'] = animation
 
                 write_to_file(item_rp_folder.joinpath(f'{item.name}.item.json'), item_rp_data)
-                if lang_def not in lang_data: lang_data.write(lang_def)
+                lang.set(f'item.{item.identifier}.name', item.real_name)
+                lang.save()
                 print(atlas)
                 write_to_file(item_textures_file, atlas)
             # if the item is an attachable
@@ -0,0 +1,115 @@
+"""How JSON files are serialized, indented while developing a pack or minified for release"""
+import json
+import math
+import os
+from typing import Any, Iterator
+
+DEFAULT_PRECISION = 5 # enough decimals for 1/32 steps, which are the finest geometry and uv steps in use
+_CHUNK_SIZE = 1 << 16
+
+_release: bool = False
+_precision: int | None = DEFAULT_PRECISION
+
+def set_release(release: bool, precision: int | None = DEFAULT_PRECISION) -> None:
+    """Sets whether JSON files are written minified with their floats rounded
+
+    :param release: write compact JSON instead of the indented development format
+    :param precision: the decimal places floats are rounded to in release mode, None to leave them as they are
+    """
+    global _release, _precision
+    _release = release
+    _precision = precision
+
+def release_mode() -> tuple[bool, int | None]:
+    """Returns the release flag and float precision, so worker processes can be given the same mode"""
+    return _release, _precision
+
+def is_release() -> bool:
+    return _release
+
+def _quantize(value: Any, precision: int) -> Any:
+    if isinstance(value, float):
+        value = round(value, precision)
+        return 0.0 if value == 0 else value # no -0.0 from tiny negative values
+    if isinstance(value, dict):
+        return {k: _quantize(v, precision) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_quantize(v, precision) for v in value]
+    return value
+
+def _orjson_compatible(value: Any) -> bool:
+    """Whether orjson writes a value with the same bytes as the json module
+
+    orjson writes floats below 1e-4 or from 1e16 without the exponent form of repr (0.00001 for 1e-05, 1e20 for 1e+20),
+    writes NaN and infinities as null and cannot write integers beyond 64 bits, so documents holding those go through json.
+    """
+    if isinstance(value, float):
+        return math.isfinite(value) and (value == 0 or 1e-4 <= abs(value) < 1e16)
+    if isinstance(value, int):
+        return -(1 << 63) <= value < (1 << 64)
+    if isinstance(value, str) or value is None:
+        return True
+    if isinstance(value, dict):
+        return all(type(k) is str and _orjson_compatible(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(_orjson_compatible(v) for v in value)
+    return False
+
+def _orjson():
+    """Returns the orjson module if it is installed, it is not a requirement"""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+def _encode_release(data: Any) -> bytes:
+    orjson = _orjson()
+    if orjson is not None and _orjson_compatible(data):
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        except TypeError: # subclasses of the builtin types, which the json module writes as their base type
+            pass
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False).encode('UTF-8')
+
+def iter_json(data: Any, *, release: bool = None, precision: int | None = ...) -> Iterator[bytes]:
+    """Serializes data to UTF-8 JSON in chunks so large documents can be streamed to a file
+
+    The development format is indented by 4 with sorted keys, with the platform's newlines as text mode wrote them.
+    The release format is compact with sorted keys and rounded floats, encoded in one pass by the C encoder of the json module,
+    or by orjson when it is installed and writes the document with the same bytes.
+
+    :param release: overrides the release mode set for the process
+    :param precision: overrides the float precision set for the process
+    """
+    release = _release if release is None else release
+    precision = _precision if precision is ... else precision
+    if release:
+        if precision is not None:
+            data = _quantize(data, precision)
+        yield _encode_release(data)
+        return
+
+    buffer: list[str] = []
+    size = 0
+    for chunk in json.JSONEncoder(indent=4, sort_keys=True).iterencode(data):
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= _CHUNK_SIZE:
+            yield ''.join(buffer).replace('\n', os.linesep).encode('UTF-8')
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield ''.join(buffer).replace('\n', os.linesep).encode('UTF-8')
+
+def dumps(data: Any, *, release: bool = None, precision: int | None = ...) -> bytes:
+    """Serializes data to UTF-8 JSON in one piece, see iter_json"""
+    return b''.join(iter_json(data, release=release, precision=precision))
+
+def minify(raw: bytes, *, precision: int | None = ...) -> bytes:
+    """Re-encodes a JSON file in the release format, files the json module cannot parse such as ones with comments are returned as they are"""
+    try:
+        data = json.loads(raw.decode('utf-8-sig'))
+    except ValueError:
+        return raw
+    return dumps(data, release=True, precision=precision)
@@ -0,0 +1,210 @@
+"""Reads selected parts of a JSON file in chunks, skipping over the rest without building it
+
+A selection describes the parts to keep with the shape of the document:
+
+- True keeps the whole value
+- a callable is given the whole value and its result is kept, so a value can be reduced as soon as it is read
+- a dict keeps the listed keys of an object, '*' matches any other key, and is applied to every item of an array
+- a list holding one selection applies it to every item of an array
+- keys an object selection does not list are left out, scalars are always kept
+
+For example ``{'animations': {'*': {'particle_effects': True}}}`` keeps the name of every animation
+and its particle effects, but none of its bones or keyframes.
+"""
+import io
+import json
+import re
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Any, TextIO
+from addons import metrics, transaction
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# everything up to the next bracket, strings included, so the end of a skipped value is found one bracket at a time
+_SKIP = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(r'[^,\]}\s]*')
+_decoder = json.JSONDecoder()
+
+class _Reader:
+    """A window over a text stream, only the part of the document that has not been consumed is held"""
+    def __init__(self, stream: TextIO):
+        self.stream: TextIO = stream
+        self.buffer: str = ''
+        self.pos: int = 0
+        self.eof: bool = False
+
+    def fill(self, size: int = None) -> bool:
+        """Drops the consumed text and reads more, returns False at the end of the stream"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(size or _CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character, an empty string at the end of the document"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f'Expecting {char!r}')
+        self.pos += 1
+
+    def string(self) -> str:
+        while True:
+            try:
+                value, end = scanstring(self.buffer, self.pos + 1)
+            except json.JSONDecodeError:
+                # the string may continue in the next chunk
+                if not self.fill():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def value(self) -> Any:
+        """Decodes the whole value at the current position"""
+        if self.peek() not in '"[{':
+            # a number cut off by the end of a chunk still decodes, so read until the whole scalar is held
+            while _SCALAR.match(self.buffer, self.pos).end() == len(self.buffer) and self.fill():
+                pass
+        size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill(size):
+                    raise
+                size = max(size, len(self.buffer)) # grow geometrically so a large value is not decoded again for every chunk
+                continue
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """Moves past the value at the current position without decoding it"""
+        char = self.peek()
+        if not char:
+            raise self.error('Expecting value')
+        if char == '"':
+            self.__skip_string()
+            return
+        if char not in '[{':
+            while True:
+                self.pos = _SCALAR.match(self.buffer, self.pos).end()
+                if self.pos < len(self.buffer) or not self.fill():
+                    return
+        depth = 0
+        while True:
+            self.pos = _SKIP.match(self.buffer, self.pos).end()
+            if self.pos == len(self.buffer) or self.buffer[self.pos] == '"':
+                # a string that goes on past the end of the chunk stops the match at its quote
+                if not self.fill():
+                    raise self.error('Unterminated value')
+                continue
+            char = self.buffer[self.pos]
+            if char in '[{':
+                try:
+                    # containers that end within the chunk are passed over by the C decoder, which is much faster than matching brackets
+                    self.pos = _decoder.raw_decode(self.buffer, self.pos)[1]
+                    if depth == 0:
+                        return
+                    continue
+                except json.JSONDecodeError:
+                    pass
+            self.pos += 1
+            depth += 1 if char in '[{' else -1
+            if depth == 0:
+                return
+
+    def __skip_string(self) -> None:
+        while True:
+            match = _STRING.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return
+            if not self.fill():
+                raise self.error('Unterminated string')
+
+    def select(self, selection: Any) -> Any:
+        """Decodes the parts of the value at the current position that the selection keeps"""
+        if selection is True:
+            return self.value()
+        if callable(selection):
+            return selection(self.value())
+        char = self.peek()
+        if char == '{':
+            self.pos += 1
+            result = {}
+            while True:
+                char = self.peek()
+                if char == '}':
+                    self.pos += 1
+                    return result
+                if char == ',':
+                    self.pos += 1
+                    continue
+                if char != '"':
+                    raise self.error('Expecting property name enclosed in double quotes')
+                key = self.string()
+                self.expect(':')
+                selected = selection.get(key, selection.get('*')) if isinstance(selection, dict) else None
+                if selected is None:
+                    self.skip()
+                else:
+                    result[key] = self.select(selected)
+        if char == '[':
+            self.pos += 1
+            result = []
+            item_selection = selection[0] if isinstance(selection, list) else selection
+            while True:
+                char = self.peek()
+                if char == ']':
+                    self.pos += 1
+                    return result
+                if char == ',':
+                    self.pos += 1
+                    continue
+                result.append(self.select(item_selection))
+        return self.value()
+
+def loads_selected(stream: TextIO, selection: dict) -> Any:
+    """Reads the selected parts of the JSON document in a text stream, see the module for the form of a selection"""
+    reader = _Reader(stream)
+    return reader.select(selection)
+
+def load_selected(path: Path, selection: dict) -> Any | None:
+    """Reads the selected parts of a JSON file, holding at most one chunk of the parts that are skipped in memory
+
+    Like data_from_file, a file written in the active transaction is read as written and a missing file returns None.
+    Parts that are skipped are not checked for errors.
+
+    :param path: the JSON file to read
+    :param selection: the parts of the document to keep
+    :returns: the document with only the selected parts
+    """
+    path = Path(path)
+    pending = transaction.pending_bytes(path)
+    if pending is not None:
+        return loads_selected(io.StringIO(pending.decode('UTF-8')), selection)
+    if not path.is_file():
+        return None
+    with path.open('r', encoding='UTF-8') as f:
+        with metrics.phase(metrics.JSON_PARSE):
+            selected = loads_selected(f, selection)
+        metrics.count(metrics.FILES_READ)
+        metrics.count(metrics.BYTES_READ, f.buffer.tell()) # only the bytes read before the selection was complete
+    return selected
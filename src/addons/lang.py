@@ -0,0 +1,113 @@
+"""Reads and edits the .lang translation files of a resource pack"""
+import codecs
+from pathlib import Path
+from typing import Iterable
+from addons import transaction
+
+def _split(line: str) -> tuple[str, str, str] | None:
+    """Splits a definition into its key, value and inline comment, returns None for comments and blank lines"""
+    if '=' not in line or line.lstrip().startswith('#'):
+        return None
+    key, value = line.split('=', 1)
+    comment_start = value.find('\t#')
+    if comment_start == -1:
+        return key.strip(), value, ''
+    return key.strip(), value[:comment_start], value[comment_start:]
+
+class LangFile:
+    """A .lang file parsed once into its lines and an index of the line each key is defined on
+
+    Comments, blank lines and the order of definitions are kept. Setting a key that is already defined
+    replaces its line instead of adding another one, and the file is only written when save is called.
+    """
+    def __init__(self, path: Path):
+        self.__path: Path = Path(path)
+        self.__lines: list[str] = []
+        self.__index: dict[str, int] = {}
+        self.__newline: str = '\n'
+        self.__bom: bool = False
+        self.__dirty: bool = False
+        raw = transaction.read_bytes(self.__path)
+        if raw is not None:
+            self.__parse(raw)
+
+    def __parse(self, raw: bytes) -> None:
+        if raw.startswith(codecs.BOM_UTF8):
+            self.__bom = True
+            raw = raw[len(codecs.BOM_UTF8):]
+        text = raw.decode('UTF-8')
+        first_break = text.find('\n')
+        if first_break > 0 and text[first_break - 1] == '\r':
+            self.__newline = '\r\n'
+        for line in text.splitlines():
+            parts = _split(line)
+            if parts is not None and parts[0] in self.__index:
+                # repeated keys were appended by older versions on every define, so the last one is the newest
+                self.__lines[self.__index[parts[0]]] = line
+                self.__dirty = True
+                continue
+            if parts is not None:
+                self.__index[parts[0]] = len(self.__lines)
+            self.__lines.append(line)
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__index
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def keys(self) -> list[str]:
+        return list(self.__index)
+
+    def get(self, key: str) -> str | None:
+        """Returns the translation of a key without its inline comment"""
+        line = self.__index.get(key)
+        return None if line is None else _split(self.__lines[line])[1]
+
+    def set(self, key: str, value: str) -> bool:
+        """Defines a key or replaces its translation, keeping any inline comment on its line
+
+        :returns: whether the file changed
+        """
+        line = self.__index.get(key)
+        if line is None:
+            self.__index[key] = len(self.__lines)
+            self.__lines.append(f'{key}={value}')
+            self.__dirty = True
+            return True
+        new_line = f'{key}={value}{_split(self.__lines[line])[2]}'
+        if new_line == self.__lines[line]:
+            return False
+        self.__lines[line] = new_line
+        self.__dirty = True
+        return True
+
+    def update(self, definitions: Iterable[str]) -> bool:
+        """Sets every definition in a list of "translation.key=Translation" lines
+
+        :returns: whether the file changed
+        """
+        changed = False
+        for definition in definitions:
+            parts = _split(definition.rstrip('\r\n'))
+            if parts is None:
+                raise ValueError(f'{definition} is not a translation.key=Translation definition')
+            changed = self.set(parts[0], parts[1]) or changed
+        return changed
+
+    def save(self) -> bool:
+        """Writes the file if anything changed, or buffers it in the active transaction
+
+        :returns: whether the file was written
+        """
+        if not self.__dirty:
+            return False
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        data = ''.join(line + self.__newline for line in self.__lines).encode('UTF-8')
+        transaction.write_bytes(self.__path, codecs.BOM_UTF8 + data if self.__bom else data)
+        self.__dirty = False
+        return True
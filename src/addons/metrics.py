@@ -0,0 +1,175 @@
+"""Wall time, file and byte counts of a command, written as JSON or OpenMetrics text for build farms to scrape
+
+Nothing is recorded unless a command runs with --metrics, and every function here returns straight away while
+recording is off. Phases can nest, so their times overlap and do not add up to the command's time.
+Worker processes record their own metrics, hand them back with drain and the parent adds them with merge.
+"""
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterable, Iterator, TypeVar
+
+FILES_READ = 'files_read'
+FILES_WRITTEN = 'files_written'
+FILES_UNCHANGED = 'files_unchanged'
+FILES_SCANNED = 'files_scanned'
+BYTES_READ = 'bytes_read'
+BYTES_WRITTEN = 'bytes_written'
+JSON_PARSE = 'json_parse'
+JSON_SERIALIZE = 'json_serialize'
+PREFIX = 'mcbe'
+
+_T = TypeVar('_T')
+
+class Metrics:
+    """The counters and phase timers recorded by one process"""
+    def __init__(self):
+        self.counters: dict[str, float] = {}
+        self.phases: dict[str, list[float]] = {} # name to [seconds, calls]
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        timer = self.phases.setdefault(name, [0.0, 0])
+        timer[0] += seconds
+        timer[1] += calls
+
+    def to_dict(self) -> dict:
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'phases': {name: {'seconds': round(seconds, 6), 'calls': calls} for name, (seconds, calls) in sorted(self.phases.items())}
+        }
+
+    def merge(self, snapshot: dict) -> None:
+        """Adds the metrics of another process, as returned by to_dict"""
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+        for name, timer in snapshot['phases'].items():
+            self.add_time(name, timer['seconds'], timer['calls'])
+
+_active: Metrics | None = None
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        if _active is not None:
+            _active.add_time(self.name, time.perf_counter() - self.start)
+
+_NOT_RECORDING = nullcontext()
+
+def is_recording() -> bool:
+    return _active is not None
+
+def count(name: str, value: float = 1) -> None:
+    if _active is not None:
+        _active.count(name, value)
+
+def phase(name: str):
+    """Times the block as a phase of the command"""
+    return _NOT_RECORDING if _active is None else _Phase(name)
+
+def timed(name: str, chunks: Iterable[_T]) -> Iterable[_T]:
+    """Times a phase that produces chunks lazily, such as serializing JSON, without collecting the chunks first"""
+    if _active is None:
+        return chunks
+    return _timed(name, iter(chunks))
+
+def _timed(name: str, chunks: Iterator[_T]) -> Iterator[_T]:
+    seconds = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                seconds += time.perf_counter() - start
+            yield chunk
+    finally:
+        if _active is not None:
+            _active.add_time(name, seconds)
+
+def init_worker(recording: bool) -> None:
+    """Starts a worker process with empty metrics, forked workers would otherwise count the parent's metrics again
+
+    :param recording: whether the parent process is recording, see is_recording
+    """
+    global _active
+    _active = Metrics() if recording else None
+
+def drain() -> dict | None:
+    """Returns the metrics recorded so far and starts over, None if nothing is being recorded"""
+    global _active
+    if _active is None:
+        return None
+    snapshot = _active.to_dict()
+    _active = Metrics()
+    return snapshot
+
+def merge(snapshot: dict | None) -> None:
+    """Adds metrics drained from a worker process"""
+    if _active is not None and snapshot is not None:
+        _active.merge(snapshot)
+
+def to_json(metrics: Metrics, *, command: str, seconds: float, version: str) -> str:
+    return json.dumps({'command': command, 'version': version, 'seconds': round(seconds, 6), **metrics.to_dict()}, indent=4)
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def to_openmetrics(metrics: Metrics, *, command: str, seconds: float, version: str) -> str:
+    """Formats the metrics in the OpenMetrics text format, with the command and tool version as labels of every sample"""
+    labels = f'command="{_label(command)}",version="{_label(version)}"'
+    lines = [
+        f'# TYPE {PREFIX}_command_seconds gauge',
+        f'# UNIT {PREFIX}_command_seconds seconds',
+        f'# HELP {PREFIX}_command_seconds Wall time of the command.',
+        f'{PREFIX}_command_seconds{{{labels}}} {seconds:.6f}'
+    ]
+    if metrics.phases:
+        lines += [
+            f'# TYPE {PREFIX}_phase_seconds counter',
+            f'# UNIT {PREFIX}_phase_seconds seconds',
+            f'# HELP {PREFIX}_phase_seconds Wall time spent in each phase of the command.'
+        ]
+        lines += [f'{PREFIX}_phase_seconds_total{{{labels},phase="{_label(name)}"}} {timer[0]:.6f}' for name, timer in sorted(metrics.phases.items())]
+        lines += [
+            f'# TYPE {PREFIX}_phase_calls counter',
+            f'# HELP {PREFIX}_phase_calls Times each phase of the command ran.'
+        ]
+        lines += [f'{PREFIX}_phase_calls_total{{{labels},phase="{_label(name)}"}} {timer[1]}' for name, timer in sorted(metrics.phases.items())]
+    for name, value in sorted(metrics.counters.items()):
+        lines += [f'# TYPE {PREFIX}_{name} counter', f'{PREFIX}_{name}_total{{{labels}}} {value}']
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+@contextmanager
+def recording(path: Path, *, command: str) -> Iterator[Metrics]:
+    """
+    Records the metrics of the block, even if it raises, and writes them to a file
+
+    :param path: written as JSON when it ends in .json and as OpenMetrics text otherwise
+    :param command: the command being measured, it labels the metrics
+    """
+    global _active
+    from addons import __version__
+    path = Path(path)
+    _active = current = Metrics()
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        seconds = time.perf_counter() - start
+        _active = None
+        write = to_json if path.suffix == '.json' else to_openmetrics
+        path.write_text(write(current, command=command, seconds=seconds, version=__version__), encoding='UTF-8')
@@ -0,0 +1,89 @@
+"""Reads the format and length of Ogg Vorbis and Opus files from their headers without decoding them"""
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+_CAPTURE = b'OggS'
+_HEAD_SIZE = 8192 # the identification header is always alone on the first page
+_TAIL_SIZE = 65536 # the largest an ogg page can be, so the last page always starts within it
+_OPUS_RATE = 48000 # opus granule positions always count samples at 48kHz
+
+@dataclass
+class OggInfo:
+    """The format and length of an Ogg file"""
+    codec: str
+    channels: int
+    sample_rate: int
+    duration: float
+    size: int
+    bitrate: int | None = None
+
+    @property
+    def decoded_bytes(self) -> int:
+        """The size of the sound once decoded to 16 bit PCM, which is how the game holds sounds that are not streamed"""
+        return round(self.duration * self.sample_rate) * self.channels * 2
+
+def _first_packet(page: bytes) -> tuple[int, bytes] | None:
+    """Returns the serial number and first packet of the page at the start of data"""
+    if len(page) < 27 or not page.startswith(_CAPTURE) or page[4] != 0:
+        return None
+    serial = struct.unpack_from('<I', page, 14)[0]
+    segments = page[26]
+    table = page[27:27 + segments]
+    length = 0
+    for lacing in table:
+        length += lacing
+        if lacing < 255:
+            break
+    start = 27 + segments
+    return serial, page[start:start + length]
+
+def _last_granule(tail: bytes, serial: int) -> int | None:
+    """Returns the granule position of the last complete page of a stream in the end of a file"""
+    pos = len(tail)
+    while True:
+        pos = tail.rfind(_CAPTURE, 0, pos)
+        if pos == -1:
+            return None
+        if len(tail) - pos >= 27 and tail[pos + 4] == 0:
+            granule, page_serial = struct.unpack_from('<qI', tail, pos + 6)
+            if page_serial == serial and granule != -1: # -1 marks a page where no packet finishes
+                return granule
+
+def read_ogg_info(path: Path) -> OggInfo | None:
+    """Reads the codec, channels, sample rate and duration of an Ogg Vorbis or Opus file
+
+    Only the first page and the last 64KiB of the file are read.
+
+    :param path: the path to the .ogg file
+    :returns: the information of the file or None if it is not a Vorbis or Opus Ogg file
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(_HEAD_SIZE)
+        first = _first_packet(head)
+        if first is None:
+            return None
+        serial, packet = first
+        if len(packet) >= 30 and packet[0] == 1 and packet[1:7] == b'vorbis':
+            channels = packet[11]
+            sample_rate, _, bitrate = struct.unpack_from('<Iii', packet, 12) # the nominal bitrate is 0 or -1 when unset
+            codec, pre_skip, granule_rate = 'vorbis', 0, sample_rate
+        elif len(packet) >= 19 and packet.startswith(b'OpusHead'):
+            channels = packet[9]
+            pre_skip = struct.unpack_from('<H', packet, 10)[0]
+            sample_rate = _OPUS_RATE # opus always decodes at 48kHz, whatever the rate of the original recording
+            codec, bitrate, granule_rate = 'opus', None, _OPUS_RATE
+        else:
+            return None
+        if size > len(head):
+            f.seek(max(0, size - _TAIL_SIZE))
+            tail = f.read()
+        else:
+            tail = head
+    if granule_rate == 0:
+        return None
+    granule = _last_granule(tail, serial) or 0
+    duration = max(0, granule - pre_skip) / granule_rate
+    return OggInfo(codec, channels, sample_rate, duration, size, bitrate if bitrate and bitrate > 0 else None)
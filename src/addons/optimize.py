@@ -0,0 +1,218 @@
+"""Losslessly shrinks the assets of a resource pack"""
+import hashlib
+import io
+import json
+import os
+import typer
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from addons.assets import CACHE_DIR, get_index
+from addons.helpers import format_size
+from addons.transaction import write_atomic
+
+app = typer.Typer()
+OPTIMIZE_INDEX_FILE = 'optimize.json'
+OPTIMIZE_INDEX_VERSION = 2
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_LOSSLESS_MODES = {'1', 'L', 'LA', 'P', 'RGB', 'RGBA'} # modes whose pixels convert to RGBA exactly, so they are compared as RGBA
+_ENCODING_CHUNKS = {b'tRNS', b'bKGD', b'hIST', b'sBIT'} # ancillary chunks that describe the color type or palette
+_AFTER_PALETTE = {b'tRNS', b'bKGD', b'hIST'}
+
+class OptimizeIndex:
+    """The size, mtime and hash of the files that have already been optimized, stored in the pack's cache folder
+
+    A file whose record matches it is as small as the optimizer can make it, so it is skipped until it changes.
+    """
+    def __init__(self, rp_path: Path):
+        self.__path: Path = Path(rp_path).absolute().joinpath(CACHE_DIR, OPTIMIZE_INDEX_FILE)
+        self.__files: dict[str, dict] = {}
+        self.__dirty: bool = False
+        if self.__path.is_file():
+            try:
+                with self.__path.open('r', encoding='UTF-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get('version') == OPTIMIZE_INDEX_VERSION:
+                self.__files = data.get('files', {})
+
+    def is_optimized(self, path: str, stat: os.stat_result, file_hash: str) -> bool:
+        """Whether a file is unchanged since it was optimized
+
+        :param stat: the file's stat, taken now
+        :param file_hash: the hash of the file's current contents
+        """
+        return self.__files.get(path) == {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': file_hash}
+
+    def put(self, path: str, stat: os.stat_result, file_hash: str) -> None:
+        record = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': file_hash}
+        if self.__files.get(path) != record:
+            self.__files[path] = record
+            self.__dirty = True
+
+    def save(self) -> None:
+        if not self.__dirty:
+            return
+        self.__path.parent.mkdir(exist_ok=True)
+        write_atomic(self.__path, json.dumps({'version': OPTIMIZE_INDEX_VERSION, 'files': self.__files}, separators=(',', ':')).encode('UTF-8'))
+        self.__dirty = False
+
+def _encode(image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+def _pixels(image) -> bytes:
+    return image.convert('RGBA').tobytes()
+
+def _chunks(data: bytes) -> list[tuple[bytes, bytes]]:
+    """Splits a png into the type and the whole bytes of each chunk"""
+    chunks = []
+    pos = len(_PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        kind = data[pos + 4:pos + 8]
+        end = pos + 12 + int.from_bytes(data[pos:pos + 4], 'big')
+        chunks.append((kind, data[pos:end]))
+        pos = end
+        if kind == b'IEND':
+            break
+    return chunks
+
+def _can_round_trip(chunks: list[tuple[bytes, bytes]], mode: str) -> bool:
+    """Whether Pillow decodes the png without losing precision and re-encodes all of it
+
+    16 bit pngs are read as 8 bit and only the first frame of an animated png is read, so those are left as they are.
+    """
+    if not chunks or chunks[0][0] != b'IHDR' or any(kind == b'acTL' for kind, _ in chunks):
+        return False
+    bit_depth = chunks[0][1][16]
+    return bit_depth <= 8 and mode in _LOSSLESS_MODES
+
+def _with_metadata(original: list[tuple[bytes, bytes]], encoded: bytes) -> bytes:
+    """Replaces the ancillary chunks Pillow wrote with those of the original png, such as text, color profiles and dpi
+
+    Chunks tied to the color type or palette are only copied when the header and palette are unchanged,
+    otherwise the transparency Pillow wrote for the new encoding is kept.
+    """
+    new = _chunks(encoded)
+    header = lambda chunks: [chunk for kind, chunk in chunks if kind in (b'IHDR', b'PLTE')]
+    same_encoding = header(original) == header(new)
+    kept = [(kind, chunk) for kind, chunk in original if kind[0] & 0x20 and (same_encoding or kind not in _ENCODING_CHUNKS)]
+    if not same_encoding:
+        kept += [(kind, chunk) for kind, chunk in new if kind == b'tRNS']
+    parts = [_PNG_SIGNATURE]
+    parts += [chunk for kind, chunk in new if kind == b'IHDR']
+    parts += [chunk for kind, chunk in kept if kind not in _AFTER_PALETTE]
+    parts += [chunk for kind, chunk in new if kind == b'PLTE']
+    parts += [chunk for kind, chunk in kept if kind in _AFTER_PALETTE]
+    parts += [chunk for kind, chunk in new if kind in (b'IDAT', b'IEND')]
+    return b''.join(parts)
+
+def _candidates(image) -> list:
+    """Returns the image re-encoded as it is, without its alpha channel if it is fully opaque and as a palette if it has 256 colors or fewer"""
+    from PIL import Image
+    candidates = [image]
+    if image.mode in ('RGBA', 'LA') and image.getchannel('A').getextrema() == (255, 255):
+        image = image.convert(image.mode[:-1])
+        candidates.append(image)
+    if image.mode in ('RGB', 'RGBA'):
+        colors = image.getcolors(256)
+        if colors is not None:
+            # fast octree is the only quantizer that keeps alpha, it is exact when there are no more colors than it may use
+            candidates.append(image.quantize(len(colors), method=Image.Quantize.FASTOCTREE if image.mode == 'RGBA' else Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE))
+    return candidates
+
+def optimize_png(path: str, dry_run: bool = False) -> tuple[int, int, str]:
+    """Rewrites a png in the smallest lossless form found, only keeping a form that decodes to exactly the same pixels
+
+    The ancillary chunks of the original, such as text, color profiles and dpi, are copied to the new form.
+
+    :param path: the png to optimize
+    :param dry_run: find the smallest form without writing it
+    :returns: the size before and after and the hash of the resulting file
+    """
+    from PIL import Image
+    original = Path(path).read_bytes()
+    best = original
+    chunks = _chunks(original)
+    try:
+        with Image.open(io.BytesIO(original)) as image:
+            if not _can_round_trip(chunks, image.mode):
+                return len(original), len(original), hashlib.sha1(original).hexdigest()
+            image.load()
+            pixels = _pixels(image)
+            for candidate in _candidates(image):
+                encoded = _with_metadata(chunks, _encode(candidate))
+                if len(encoded) >= len(best):
+                    continue
+                with Image.open(io.BytesIO(encoded)) as decoded:
+                    if _pixels(decoded) == pixels:
+                        best = encoded
+    except (OSError, ValueError):
+        pass # not an image Pillow can read, it is left as it is
+    if best is not original and not dry_run:
+        write_atomic(Path(path), best)
+    return len(original), len(best), hashlib.sha1(best).hexdigest()
+
+def optimize_textures(rp_path: Path, *, workers: int = None, force: bool = False, dry_run: bool = False) -> dict[str, tuple[int, int]]:
+    """
+    Losslessly optimizes every png in the textures folder of a resource pack across a process pool
+
+    Files recorded in the pack's optimize cache with their current size, mtime and hash are skipped.
+
+    :param workers: the number of processes optimizing textures
+    :param force: optimize files that are recorded as already optimized
+    :param dry_run: measure the savings without writing any texture
+    :returns: the size before and after of each file that was optimized, keyed by its path in the pack
+    """
+    index = get_index(rp_path)
+    cache = OptimizeIndex(rp_path)
+    pending = []
+    for asset in index.assets(rp_path.joinpath('textures'), '*.png'):
+        try:
+            stat = os.stat(index.root.joinpath(asset.path))
+        except FileNotFoundError:
+            continue
+        # the hash of the index only describes the file while its size and mtime are the ones indexed
+        indexed = asset.size == stat.st_size and asset.mtime == stat.st_mtime_ns
+        if force or not indexed or not cache.is_optimized(asset.path, stat, asset.hash):
+            pending.append(asset)
+    results: dict[str, tuple[int, int]] = {}
+    if not pending:
+        return results
+    paths = [os.fspath(index.root.joinpath(asset.path)) for asset in pending]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        for asset, (before, after, file_hash) in zip(pending, pool.map(optimize_png, paths, [dry_run] * len(paths), chunksize=chunksize)):
+            results[asset.path] = (before, after)
+            if not dry_run:
+                cache.put(asset.path, os.stat(index.root.joinpath(asset.path)), file_hash)
+    cache.save()
+    return results
+
+@app.command()
+def textures(
+    rp_path: Path = typer.Argument(None, help='The resource pack whose textures are optimized'),
+    workers: int = typer.Option(None, help='Number of processes optimizing textures'),
+    force: bool = typer.Option(False, help='Optimize textures that were already optimized'),
+    dry_run: bool = typer.Option(False, help='Report the savings without changing any texture')
+):
+    """
+    Losslessly recompresses the pngs of a resource pack, dropping alpha channels that are fully opaque
+    and converting images with 256 colors or fewer to a palette
+    """
+    if not rp_path.exists():
+        raise typer.BadParameter('The resource pack provided DNE', param=rp_path)
+
+    results = optimize_textures(rp_path, workers=workers, force=force, dry_run=dry_run)
+    if not results:
+        print('Every texture is already optimized')
+        return
+    shrunk = {path: sizes for path, sizes in results.items() if sizes[1] < sizes[0]}
+    before = sum(sizes[0] for sizes in results.values())
+    saved = sum(sizes[0] - sizes[1] for sizes in shrunk.values())
+    verb = 'would shrink' if dry_run else 'shrunk'
+    print(f'Checked {len(results)} textures, {verb} {len(shrunk)} of them by {format_size(saved)} of {format_size(before)}')
+    for path, (old, new) in sorted(shrunk.items(), key=lambda item: item[1][0] - item[1][1], reverse=True)[:20]:
+        print(f'  {path:<60} {format_size(old):>12} -> {format_size(new)}')
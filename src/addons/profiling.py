@@ -0,0 +1,84 @@
+"""Profiles a command with cProfile and writes the results in the formats profiling tools read"""
+import cProfile
+import pstats
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+COLLAPSED_SUFFIX = '.collapsed'
+_PRUNE_FRACTION = 1e-5 # paths taking less than this share of the run are left out, keeping the stacks of large runs small
+
+def _frame(func: tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == '~': # built in functions have no file
+        return name.replace(';', ',')
+    return f'{Path(filename).name}:{name}:{line}'.replace(';', ',')
+
+def collapsed_stacks(stats: pstats.Stats) -> dict[str, int]:
+    """
+    Rebuilds the call stacks of a profile, with the microseconds spent in each
+
+    cProfile only records which function called which, not whole stacks, so the time of a function
+    called from several places is split across them in proportion to the time each caller spent in it.
+
+    :returns: the time of each stack, the frames of a stack are joined by semicolons from the outermost
+    """
+    entries = stats.stats
+    callees: dict[tuple, list[tuple[tuple, float]]] = {}
+    roots = []
+    for func, (_, _, _, _, callers) in entries.items():
+        known = [caller for caller in callers if caller in entries and caller != func]
+        if not known: # the outermost call, a function calling itself still starts a stack
+            roots.append(func)
+        for caller in known:
+            callees.setdefault(caller, []).append((func, callers[caller][3]))
+
+    total = sum(entries[root][3] for root in roots)
+    threshold = total * _PRUNE_FRACTION
+    stacks: dict[str, int] = {}
+    # each item is a function, the stack above it, the functions on that stack and the share of the function's time it stands for
+    pending = [(root, '', frozenset(), 1.0) for root in roots]
+    while pending:
+        func, parent, on_stack, share = pending.pop()
+        stack = f'{parent};{_frame(func)}' if parent else _frame(func)
+        own = int(entries[func][2] * share * 1e6)
+        if own > 0:
+            stacks[stack] = stacks.get(stack, 0) + own
+        on_stack = on_stack | {func}
+        for callee, edge_time in callees.get(func, []):
+            callee_time = entries[callee][3]
+            # recursive calls are already part of the time of the call above them
+            if callee in on_stack or callee_time <= 0 or edge_time * share < threshold:
+                continue
+            pending.append((callee, stack, on_stack, share * edge_time / callee_time))
+    return stacks
+
+def write_collapsed(stats: pstats.Stats, path: Path) -> None:
+    """Writes the stacks of a profile in the collapsed format of flamegraph.pl, speedscope and inferno"""
+    with open(path, 'w', encoding='UTF-8') as f:
+        for stack, micros in sorted(collapsed_stacks(stats).items()):
+            f.write(f'{stack} {micros}\n')
+
+@contextmanager
+def profiled(path: Path, *, top: int = 20) -> Iterator[cProfile.Profile]:
+    """
+    Profiles the block, even if it raises, and writes what was recorded
+
+    :param path: the file the pstats are written to, the collapsed stacks are written next to it
+    :param top: the number of functions with the most cumulative time printed to stderr
+    """
+    path = Path(path)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        stats = pstats.Stats(profile, stream=sys.stderr).strip_dirs()
+        collapsed_path = path.with_suffix(COLLAPSED_SUFFIX)
+        write_collapsed(stats, collapsed_path)
+        if top:
+            stats.sort_stats('cumulative').print_stats(top)
+        print(f'Profile written to {path} and {collapsed_path}', file=sys.stderr)
@@ -1,8 +1,13 @@
 from pathlib import Path
 import uuid, os, shutil, typer
+from colorama import Fore, Style
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from zipfile import ZipFile
-from PIL import Image
+from addons import metrics
 from addons.helpers import write_to_file
+from .archive import PackArchive, write_addon, write_pack
 from .config import config
 
 projects_path = config.projects_path
@@ -14,6 +19,52 @@ app = typer.Typer()
 def package_skinpack():
     ...
 
+_art_zip: dict[str, ZipFile] = {}
+
+def _open_art_zip(assets_zip: Path, recording: bool) -> None:
+    """Opens the assets zip once per worker process"""
+    _art_zip['assets'] = ZipFile(assets_zip, 'r')
+    metrics.init_worker(recording)
+
+def _write_art(member: str, targets: list[tuple[Path, tuple[int, int] | None]]) -> dict | None:
+    """Reads one image from the assets zip and writes all of its variants
+
+    The image is decoded at most once and each thumbnail size is only produced once, however many files use it.
+
+    :param member: the name of the image in the assets zip
+    :param targets: pairs of output path and thumbnail size, a size of None writes the original file
+    :returns: the metrics recorded by the worker process
+    """
+    from PIL import Image # only packaging needs Pillow, importing it slows down every other command
+    data = _art_zip['assets'].read(member)
+    metrics.count(metrics.FILES_READ)
+    metrics.count(metrics.BYTES_READ, len(data))
+    image: Image.Image = None
+    thumbnails: dict[tuple[int, int], Image.Image] = {}
+    for output, size in targets:
+        if size is None:
+            Path(output).write_bytes(data)
+            metrics.count(metrics.FILES_WRITTEN)
+            metrics.count(metrics.BYTES_WRITTEN, len(data))
+            continue
+        if image is None:
+            with metrics.phase('image_decode'):
+                image = Image.open(BytesIO(data))
+                image.load()
+        if size not in thumbnails:
+            with metrics.phase('image_resize'):
+                thumbnail = image.copy()
+                thumbnail.thumbnail(size)
+            thumbnails[size] = thumbnail
+        with metrics.phase('image_encode'):
+            thumbnails[size].save(output)
+        if metrics.is_recording():
+            metrics.count(metrics.FILES_WRITTEN)
+            metrics.count(metrics.BYTES_WRITTEN, Path(output).stat().st_size)
+    if image is not None:
+        image.close()
+    return metrics.drain()
+
 @app.command()
 def create(
     project_name: str,
@@ -77,7 +128,9 @@ def package(
     project_description: str,
     assets_zip_folder: Path,
     world_folder_path: Path,
-    skinpack: bool=typer.Option(default=False, help='Whether this package has a skinpack')
+    skinpack: bool=typer.Option(default=False, help='Whether this package has a skinpack'),
+    archive: bool=typer.Option(default=False, help='Write the world template as a .mctemplate archive instead of a folder'),
+    json_level: int=typer.Option(default=9, min=0, max=9, help='The compression level of JSON files in the archive')
 ) -> None:
     """
     Packages a world for marketplace submission
@@ -85,6 +138,7 @@ def package(
     :param project_name: the name of the project being packaged
     :param project_description: the description to be used in game for the world template
     :param assets_zip_folder: the path to the zip folder 
+    :param archive: whether the world is streamed straight into a .mctemplate instead of being copied
     """
     if not world_folder_path.exists() or not assets_zip_folder.exists():
         raise FileNotFoundError('A folder for the world being packaged does not exist or the assets folder provided is invalid!')
@@ -102,7 +156,7 @@ def package(
         os.makedirs(str(template_texts), exist_ok=True)
         bad_files = ['level.dat_old', 'world_behavior_pack_history.json', 'world_resource_pack_history.json']
 
-        for el in os.listdir(world_folder_path):
+        for el in os.listdir(world_folder_path) if not archive else []:
             path = world_folder_path.joinpath(el)
             if not path.is_file():
                 shutil.copytree(path, world_template.joinpath(el))
@@ -152,45 +206,185 @@ def package(
         
         marketing_art = package_path.joinpath('Marketing Art')
         store_art = package_path.joinpath('Store Art')
-        temp_path = package_path.joinpath('temp')
 
         with ZipFile(assets_zip_folder, 'r') as assets:
-            temp_path.mkdir()
-            assets.extractall(str(temp_path))
+            members = sorted(info.filename for info in assets.infolist() if not info.is_dir())
 
         project_file_name = project_name.replace(' ', '').lower()
-        for i, file_name in enumerate(os.listdir(str(temp_path))):
+        store_size = (800, 450)
+        art_jobs: dict[str, list[tuple[Path, tuple[int, int] | None]]] = {}
+        screenshots = 0
+        for member in members:
+            file_name = os.path.basename(member)
+            targets = art_jobs.setdefault(member, [])
             if 'panorama' not in file_name and 'keyart' not in file_name and 'partnerart' not in file_name:
-                # marketing art
-                marketing_name = temp_path.joinpath(f'{project_file_name}_MarketingScreenshot_{i}.jpg')
-                curr_file_path = temp_path.joinpath(file_name)
-                curr_file_path.rename(marketing_name)
-                shutil.copy(marketing_name, marketing_art)
-                # store art
-                store_name = store_art.joinpath(f'{project_file_name}_screenshot_{i}.jpg')
-                store_img = Image.open(marketing_name)
-                store_img.thumbnail((800, 450))
-                store_img.save(store_name) # save the resized image to the store art folder with its correct name
-                store_img.close()
-            else:
-                curr_file_path = temp_path.joinpath(file_name)
-                if 'panorama' in file_name:
-                    panorama_file = os.path.join(temp_path, file_name)
-                    new_panorama_name = f'{project_file_name}_panorama_0.jpg'
-                    new_panorama_file = store_art.joinpath(new_panorama_name)
-                    shutil.move(panorama_file, new_panorama_file) # format the file with the projectname_panorama.jpg format
-                if 'keyart' in file_name:
-                    thumbnail = Image.open(curr_file_path)
-                    icon = Image.open(curr_file_path)
-                    icon.thumbnail((800, 450))
-                    thumbnail.thumbnail((800, 450))
-                    thumbnail.save(store_art.joinpath(f'{project_file_name}_Thumbnail_0.jpg'))
-                    icon.save(world_template.joinpath('world_icon.jpeg'))
-                    thumbnail.close()
-                    icon.close()
-                    marketing_keyart = f'{project_file_name}_MarketingKeyArt.jpg'
-                    shutil.move(curr_file_path, marketing_art.joinpath(marketing_keyart))
-                if 'partnerart' in file_name:
-                    shutil.move(curr_file_path, marketing_art.joinpath(f'{project_file_name}_PartnerArt.jpg'))
-
-        shutil.rmtree(str(temp_path))
\ No newline at end of file
+                # marketing art and the resized store art
+                targets.append((marketing_art.joinpath(f'{project_file_name}_MarketingScreenshot_{screenshots}.jpg'), None))
+                targets.append((store_art.joinpath(f'{project_file_name}_screenshot_{screenshots}.jpg'), store_size))
+                screenshots += 1
+                continue
+            if 'panorama' in file_name:
+                targets.append((store_art.joinpath(f'{project_file_name}_panorama_0.jpg'), None)) # format the file with the projectname_panorama.jpg format
+            if 'keyart' in file_name:
+                targets.append((store_art.joinpath(f'{project_file_name}_Thumbnail_0.jpg'), store_size))
+                targets.append((world_template.joinpath('world_icon.jpeg'), store_size))
+                targets.append((marketing_art.joinpath(f'{project_file_name}_MarketingKeyArt.jpg'), None))
+            if 'partnerart' in file_name:
+                targets.append((marketing_art.joinpath(f'{project_file_name}_PartnerArt.jpg'), None))
+
+        # images are read straight from the zip and processed in parallel, nothing is extracted to disk
+        with ProcessPoolExecutor(initializer=_open_art_zip, initargs=(assets_zip_folder, metrics.is_recording())) as pool:
+            for job in [pool.submit(_write_art, member, targets) for member, targets in art_jobs.items()]:
+                metrics.merge(job.result())
+
+        if archive:
+            # the world is read from its own folder, only the generated files come from the world_template folder
+            template_archive = PackArchive(package_path.joinpath('Content', f'{project_file_name}.mctemplate'), json_level=json_level)
+            template_archive.add_tree(world_folder_path, exclude=set(bad_files))
+            template_archive.add_tree(world_template)
+            template_archive.write()
+            shutil.rmtree(str(world_template))
+
+@app.command()
+def export(
+    project_name: str,
+    output: Path=typer.Option(default=None, help='The folder the archives are written to, defaults to the project folder'),
+    mcpack: bool=typer.Option(default=False, help='Write a .mcpack for each pack instead of a single .mcaddon'),
+    json_level: int=typer.Option(default=9, min=0, max=9, help='The compression level of JSON files in the archives')
+) -> None:
+    """
+    Exports a project's behavior and resource packs to archives that can be imported into the game
+
+    :param project_name: the name of the project in the projects folder
+    """
+    project_path = projects_path.joinpath(project_name)
+    pack_name = project_name.lower().replace(' ', '_')
+    packs = [project_path.joinpath(f'{pack_name}_BP'), project_path.joinpath(f'{pack_name}_RP')]
+    packs = [pack for pack in packs if pack.exists()]
+    if not packs:
+        raise typer.BadParameter(f'The project {project_name} has no behavior or resource pack in {project_path}')
+    output = output if output is not None else project_path
+
+    if mcpack:
+        for pack in packs:
+            print(write_pack(pack, output.joinpath(f'{pack.name}.mcpack'), json_level=json_level))
+    else:
+        print(write_addon(packs, output.joinpath(f'{pack_name}.mcaddon'), json_level=json_level))
+
+def _project_packs(project_name: str) -> tuple[Path, Path]:
+    """Returns the behavior and resource pack of a project, both of which have to exist"""
+    project_path = projects_path.joinpath(project_name)
+    pack_name = project_name.lower().replace(' ', '_')
+    bp_path = project_path.joinpath(f'{pack_name}_BP')
+    rp_path = project_path.joinpath(f'{pack_name}_RP')
+    if not bp_path.exists() or not rp_path.exists():
+        raise typer.BadParameter(f'The project {project_name} needs a behavior and a resource pack in {project_path}')
+    return bp_path, rp_path
+
+@app.command()
+def watch(
+    project_name: str,
+    debounce: float=typer.Option(default=0.3, min=0, help='Seconds without a save before the changes are rebuilt'),
+    polling: bool=typer.Option(default=False, help='Poll for changes instead of using inotify'),
+    fv: str=typer.Option(default='1.8.0', help='The format version of the client entities'),
+    answers: Path=typer.Option(default=None, help='A JSON or YAML file answering the define prompts'),
+    namespace: str=typer.Option(default='custom', help='The namespace of the blocks whose sounds are defined')
+) -> None:
+    """
+    Watches a project's behavior and resource packs and redefines only what each change affects
+
+    A changed geometry, animation, animation controller, texture or behavior file redefines its entity,
+    a changed block file, block texture or block model redefines its block
+    and a changed sound folder regenerates the sound definitions.
+
+    :param project_name: the name of the project in the projects folder
+    """
+    # the define pipeline is only needed while watching, importing it slows down every other project command
+    from .answers import Answers
+    from .entity.pipeline import DefineOptions
+    from .watch import ProjectBuilder, watch_project
+
+    bp_path, rp_path = _project_packs(project_name)
+    options = DefineOptions(fv=fv, answers=Answers.from_file(answers) if answers else Answers())
+    builder = ProjectBuilder(bp_path, rp_path, options, rp_name=project_name, namespace=namespace)
+    watch_project(builder, debounce=debounce, polling=polling)
+
+@app.command()
+def graph(
+    project_name: str,
+    changed: Optional[list[Path]]=typer.Argument(default=None, help='The files that changed, relative to the project folder or absolute, every step is planned when none are given'),
+    run: bool=typer.Option(default=False, help='Run the planned steps instead of only printing them'),
+    workers: int=typer.Option(default=None, help='Number of processes defining entities'),
+    force: bool=typer.Option(default=False, help='Define entities even if their inputs are unchanged since the last build'),
+    fv: str=typer.Option(default='1.8.0', help='The format version of the client entities'),
+    answers: Path=typer.Option(default=None, help='A JSON or YAML file answering the define prompts'),
+    namespace: str=typer.Option(default='custom', help='The namespace of the blocks whose sounds are defined')
+) -> None:
+    """
+    Plans the smallest set of define steps that brings a project up to date with a set of changed files
+
+    The steps are found from the files each entity, block, item and sound folder is built from
+    and printed in the order they run, steps in the same batch are independent of each other.
+
+    :param project_name: the name of the project in the projects folder
+    """
+    from .answers import Answers
+    from .entity.pipeline import DefineOptions
+    from .graph import REBUILT, UNCHANGED, DependencyGraph, run_plan
+
+    bp_path, rp_path = _project_packs(project_name)
+    project_path = projects_path.joinpath(project_name)
+    options = DefineOptions(fv=fv, answers=Answers.from_file(answers) if answers else Answers())
+    paths = None if not changed else [path if path.is_absolute() else project_path.joinpath(path) for path in changed]
+    batches = DependencyGraph.from_project(bp_path, rp_path, options).plan(paths)
+    if not batches:
+        print('Nothing depends on the changed files')
+        return
+    for number, batch in enumerate(batches, start=1):
+        print(f'{number}. {", ".join(step.key for step in batch)}')
+    if not run:
+        return
+
+    results = run_plan(batches, rp_path, options, workers=workers, force=force, rp_name=project_name, namespace=namespace)
+    for key, status in results.items():
+        color = Fore.GREEN if status == REBUILT else Fore.YELLOW if status == UNCHANGED else Fore.RED
+        print(f'{color}{key}: {status}{Style.RESET_ALL}')
+
+@app.command()
+def check(
+    project_name: str,
+    unused: bool=typer.Option(default=True, help='Also list definitions that nothing refers to'),
+    ignore: Optional[list[str]]=typer.Option(default=None, help='A glob pattern of names never reported, replaces the names the game defines'),
+    workers: int=typer.Option(default=None, help='Number of processes reading files'),
+    json_file: Path=typer.Option(None, '--json', help='Also write every problem found to this JSON file')
+) -> None:
+    """
+    Checks that every geometry, animation, render controller, texture, sound and lang key a project refers to is defined
+
+    Exits with an error when a reference is dangling, so broken references are found before the packs are loaded in game.
+
+    :param project_name: the name of the project in the projects folder
+    """
+    from .check import check_project
+
+    bp_path, rp_path = _project_packs(project_name)
+    report = check_project(bp_path, rp_path, ignore=ignore or None, workers=workers)
+    print(f'Checked {report.files} files defining {report.symbols} names')
+    sections = [('unreadable files', Fore.RED, report.unreadable), ('dangling references', Fore.RED, report.dangling)]
+    if unused:
+        sections.append(('unused definitions', Fore.YELLOW, report.unused))
+    for title, color, problems in sections:
+        if not problems:
+            continue
+        print(f'{color}{len(problems)} {title}:{Style.RESET_ALL}')
+        for problem in sorted(problems, key=lambda problem: (problem.file, problem.kind, problem.name)):
+            print(f'  {problem.file}: {problem.kind} {problem.name}')
+
+    if json_file is not None:
+        write_to_file(json_file, {
+            'unreadable': [problem.to_dict() for problem in report.unreadable],
+            'dangling': [problem.to_dict() for problem in report.dangling],
+            'unused': [problem.to_dict() for problem in report.unused]
+        })
+    if report.dangling or report.unreadable:
+        raise typer.Exit(code=1)
\ No newline at end of file
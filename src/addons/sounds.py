@@ -1,155 +1,389 @@
-import os
-from pathlib import Path
-from addons.helpers import data_from_file, write_to_file
-
-def createDefs(RP_PATH: Path, category_path: Path, definition_data: dict, category: str = 'neutral') -> dict:
-    """
-    Creates the sound definitions for a given category path
-    """
-    if not category_path.exists():
-        print('There are not sounds available')
-        return None
-
-    def_file = RP_PATH.joinpath('sounds', 'sound_definitions.json')
-    sounds: list[str] = [str(sound) for sound in category_path.glob('*') if sound.is_file()] # free floating sounds in the sounds folder
-    subcategories: list[Path] = [subcat for subcat in category_path.glob('*') if subcat.is_dir()] # sub-folders in the sounds folder (entity folders)
-    definitions = definition_data['sound_definitions']
-
-    for sound in sounds: # if there are sounds just floating in the sounds folder without a sub folder
-        sound_path = sound[sound.find('sounds'):].replace(os.sep, '/').replace('.ogg', '')
-        sound_name = sound_path.split('/')[1:].join('.')
-        definitions[sound_name] = {}
-        definitions[sound_name]['category'] = category
-        definitions[sound_name]['sounds'] = []
-        definitions[sound_name]['sounds'].append(sound_path)
-
-    for subcategory in subcategories:
-        sound_paths: list[str] = [
-            str(sound)[str(sound).find('sounds'):].replace(os.sep, '/').replace('.ogg', '') for sound in subcategory.glob('*') if sound.is_file()
-        ] # sounds that only have 1 sound path and are not randomized when played
-        for sound_path in sound_paths:
-            sound_category = sound_path.split('/')[-3]
-            subcategory = sound_path.split('/')[-2]
-            name = sound_path.split('/')[-1]
-            sound_name = '{0}.{1}.{2}'.format(sound_category,subcategory,name)
-            definitions[sound_name] = {}
-            definitions[sound_name]['category'] = category
-            definitions[sound_name]['sounds'] = []
-            definitions[sound_name]['sounds'].append(sound_path)
-
-        sub_subcategories: list[Path] = [subcat for subcat in category_path.joinpath(subcategory).glob('*') if subcat.is_dir()]
-        for sub_subcat in sub_subcategories:
-            sound_paths = [str(sound)[str(sound).find('sounds'):].replace(os.sep, '/').replace('.ogg', '') for sound in sub_subcat.rglob('*.ogg')]
-            sub_subcat = str(sub_subcat).split(os.sep)[-1]
-            sound_name = '{0}.{1}.{2}'.format(sound_category, subcategory, sub_subcat)
-            definitions[sound_name] = {}
-            definitions[sound_name]['category'] = category
-            definitions[sound_name]['sounds'] = sound_paths
-    # create the sound_definitions.json
-    write_to_file(def_file, definition_data)
-    return definition_data
-
-def define_block_sounds(rp_path: Path, namespace: str):
-    """
-    Defines all block sounds
-    """
-    sounds_file = rp_path.joinpath('sounds.json')
-    sound_definitions = rp_path.joinpath('sounds', 'sound_definitions.json')
-    block_sounds = rp_path.joinpath('sounds', 'block')
-    if not block_sounds.exists(): rp_path.joinpath('sounds').mkdir('block')
-    definitions: dict
-    sound_data: dict = data_from_file(sounds_file) if sounds_file.exists() else {'block_sounds': {}}
-    if sound_definitions.exists():
-        definitions = data_from_file(sound_definitions)
-    
-    else:
-        definitions = {
-            'format_version': '1.14.0',
-            'sound_definitions': {}
-        }
-    
-    definitions = createDefs(rp_path, block_sounds, definitions, category='block')
-    block_sound_defs = [sound for sound in list(definitions) if sound.startswith('block')]
-    for sound in block_sound_defs:
-        block_id = '{0}:{1}'.format(namespace, sound.split('.')[1])
-        # check if the block has already been added as a key
-        if block_id not in sound_data['block_sounds']: sound_data['block_sounds'][block_id] = {}
-        sound_data['block_sounds'][block_id]['volume'] = 1.0
-        sound_data['block_sounds'][block_id]['pitch'] = 1.0
-        # add the sound event to the sounds
-        sound_event = sound.split('.')[-1] if sound_event.split('.')[-1] != 'use' else 'item.use.on'
-        assert (sound_event in ['break', 'hit', 'item.use.on', 'power.off', 'power.on']), 'The sound event for the block is not valid!'
-        # add the properties to the sound
-        sound_data['block_sounds'][block_id][sound_event] = {}
-        sound_data['block_sounds'][block_id][sound_event]['sound'] = sound
-        sound_data['block_sounds'][block_id][sound_event]['pitch'] = 1.0
-        sound_data['block_sounds'][block_id][sound_event]['volume'] = 1.0
-
-    write_to_file(sounds_file, sound_data)
-
-def implement_sounds(entity: str, rp_path: Path) -> dict:
-    """
-    Implements entity sounds for an entity
-    """
-    sounds_path = rp_path.joinpath('sounds', 'sound_definitions.json')
-    sounds_file = rp_path.joinpath('sounds.json')
-    sound_events: dict = {}
-    sound_defs: dict = {}
-
-    if sounds_file.exists():
-        sound_events = data_from_file(sounds_file)
-
-    else:
-        sound_events['entity_sounds'] = {}
-        sound_events['entity_sounds']['entities'] = {}
-
-    if sounds_path.exists():
-        sound_defs = data_from_file(sounds_path)
-        sound_defs = createDefs(rp_path, rp_path.joinpath('sounds', 'entity'), sound_defs)
-
-    else:
-        sound_defs = {
-            'format_version': '1.14.0',
-            'sound_definitions': {}
-        }
-        sound_defs = createDefs(rp_path, rp_path.joinpath('sounds', 'entity'), sound_defs)
-
-    ce_sound_map = {}
-    for sound in sound_defs['sound_definitions'].keys():
-        sound_split = sound.split('.')
-        # see if the sound is in the entity category
-        if sound_split[0] == 'entity' and sound_split[1] == entity:
-            # check if the sound should be an automatic event for the entity, requires the sound file to be named correctly
-            if sound_split[-1] in ['ambient', 'hurt', 'death', 'step', 'fall', 'splash', 'attack', 'shoot']:
-                # the name of the entity will be second in the sound split
-                entity_name = sound_split[1]
-                if entity_name not in sound_events['entity_sounds']['entities']:
-                    sound_events['entity_sounds']['entities'][entity_name] = {}
-                    sound_events['entity_sounds']['entities'][entity_name]['volume'] = 1.0
-                    sound_events['entity_sounds']['entities'][entity_name]['pitch'] = 1.0
-                    sound_events['entity_sounds']['entities'][entity_name]['events'] = {}
-
-                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]] = {}
-                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]]['sound'] = sound
-                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]]['volume'] = 0.25
-                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]]['pitch'] = 1.0
-
-            else:
-                ce_sound_map[sound_split[-1]] = sound
-        # for sounds that do not to be added into the sounds.json file
-        else:
-           continue
-
-    write_to_file(sounds_file, sound_events)
-    return ce_sound_map if len(ce_sound_map) > 0 else None
-
-def implement_sound_effects(rp_path: Path):
-    """
-    Implements generic sound effects that are not block or entity related
-    """
-    pass
-
-def implement_player_sounds(rp_path: Path):
-    """
-    Implements all sounds relating to the player
-    """
\ No newline at end of file
+import json
+import os
+import typer
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from addons import metrics
+from addons.helpers import data_from_file, format_size, write_to_file
+from addons.assets import CACHE_DIR, AssetIndex, get_index
+from addons.ogg import OggInfo, read_ogg_info
+from addons.transaction import write_atomic
+
+app = typer.Typer()
+LONG_SOUND_SECONDS = 10.0
+
+SOUND_INDEX_FILE = 'sounds.json'
+SOUND_INDEX_VERSION = 1
+
+class SoundDefinitionIndex:
+    """The sound definitions generated from each sound folder, stored in the pack's cache folder
+
+    Each entry is stored with the signature of the folder it was generated from,
+    so only folders where sounds were added, removed or renamed are rediscovered.
+    """
+    def __init__(self, rp_path: Path):
+        self.__path: Path = Path(rp_path).absolute().joinpath(CACHE_DIR, SOUND_INDEX_FILE)
+        self.__folders: dict[str, dict] = {}
+        self.__dirty: bool = False
+        if self.__path.is_file():
+            try:
+                with self.__path.open('r', encoding='UTF-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get('version') == SOUND_INDEX_VERSION:
+                self.__folders = data.get('folders', {})
+
+    def get(self, key: str, signature: str | None) -> dict | None:
+        """Returns the definitions of a folder if it is unchanged since they were generated"""
+        entry = self.__folders.get(key)
+        if signature is None or entry is None or entry['signature'] != signature:
+            return None
+        return entry['definitions']
+
+    def put(self, key: str, signature: str | None, definitions: dict) -> None:
+        if signature is None:
+            return
+        self.__folders[key] = {'signature': signature, 'definitions': definitions}
+        self.__dirty = True
+
+    def save(self) -> None:
+        if not self.__dirty:
+            return
+        self.__path.parent.mkdir(exist_ok=True)
+        write_atomic(self.__path, json.dumps({'version': SOUND_INDEX_VERSION, 'folders': self.__folders}, separators=(',', ':')).encode('UTF-8'))
+        self.__dirty = False
+
+def _sound_path(sound: Path) -> str:
+    return str(sound)[str(sound).find('sounds'):].replace(os.sep, '/').replace('.ogg', '')
+
+def _subcategory_definitions(index: AssetIndex, subcategory_path: Path, sound_category: str, category: str) -> dict:
+    """Creates the sound definitions of one sub-folder (an entity or block folder) of a category"""
+    definitions = {}
+    subcategory = subcategory_path.name
+    sound_paths: list[str] = [_sound_path(sound) for sound in index.glob(subcategory_path)] # sounds that only have 1 sound path and are not randomized when played
+    for sound_path in sound_paths:
+        name = sound_path.split('/')[-1]
+        sound_name = '{0}.{1}.{2}'.format(sound_category,subcategory,name)
+        definitions[sound_name] = {}
+        definitions[sound_name]['category'] = category
+        definitions[sound_name]['sounds'] = []
+        definitions[sound_name]['sounds'].append(sound_path)
+
+    sub_subcategories: list[Path] = index.subdirs(subcategory_path)
+    for sub_subcat in sub_subcategories:
+        sound_paths = [_sound_path(sound) for sound in index.rglob(sub_subcat, '*.ogg')]
+        sub_subcat = str(sub_subcat).split(os.sep)[-1]
+        sound_name = '{0}.{1}.{2}'.format(sound_category, subcategory, sub_subcat)
+        definitions[sound_name] = {}
+        definitions[sound_name]['category'] = category
+        definitions[sound_name]['sounds'] = sound_paths
+    return definitions
+
+def createDefs(RP_PATH: Path, category_path: Path, definition_data: dict, category: str = 'neutral') -> dict:
+    """
+    Creates the sound definitions for a given category path
+
+    Only the sub-folders that changed since the last run are rediscovered, the definitions of the others come from the sound definition index
+    """
+    if not category_path.exists():
+        print('There are not sounds available')
+        return None
+
+    def_file = RP_PATH.joinpath('sounds', 'sound_definitions.json')
+    index = get_index(RP_PATH)
+    sound_index = SoundDefinitionIndex(RP_PATH)
+    with metrics.phase('scan_sounds'):
+        sounds: list[str] = [str(sound) for sound in index.glob(category_path)] # free floating sounds in the sounds folder
+        subcategories: list[Path] = index.subdirs(category_path) # sub-folders in the sounds folder (entity folders)
+    metrics.count(metrics.FILES_SCANNED, len(sounds))
+    definitions = definition_data['sound_definitions']
+    sound_category = category_path.name
+
+    found: dict = {}
+    for sound in sounds: # if there are sounds just floating in the sounds folder without a sub folder
+        sound_path = _sound_path(sound)
+        sound_name = '.'.join(sound_path.split('/')[1:])
+        found[sound_name] = {}
+        found[sound_name]['category'] = category
+        found[sound_name]['sounds'] = []
+        found[sound_name]['sounds'].append(sound_path)
+
+    for subcategory_path in subcategories:
+        key = f'{category}:{Path(os.path.relpath(subcategory_path, RP_PATH)).as_posix()}'
+        signature = index.signature(subcategory_path)
+        subcategory_definitions = sound_index.get(key, signature)
+        if subcategory_definitions is None:
+            with metrics.phase('scan_sounds'):
+                subcategory_definitions = _subcategory_definitions(index, subcategory_path, sound_category, category)
+            metrics.count(metrics.FILES_SCANNED, sum(len(definition['sounds']) for definition in subcategory_definitions.values()))
+            sound_index.put(key, signature, subcategory_definitions)
+        found.update(subcategory_definitions)
+    sound_index.save()
+
+    changed = False
+    for sound_name, definition in found.items():
+        if definitions.get(sound_name) != definition:
+            definitions[sound_name] = definition
+            changed = True
+    # create the sound_definitions.json, unless it already holds every definition
+    if changed or not def_file.exists():
+        write_to_file(def_file, definition_data)
+    return definition_data
+
+def define_block_sounds(rp_path: Path, namespace: str):
+    """
+    Defines all block sounds
+    """
+    sounds_file = rp_path.joinpath('sounds.json')
+    sound_definitions = rp_path.joinpath('sounds', 'sound_definitions.json')
+    block_sounds = rp_path.joinpath('sounds', 'block')
+    if not block_sounds.exists(): block_sounds.mkdir(parents=True)
+    definitions: dict
+    sound_data: dict = data_from_file(sounds_file) if sounds_file.exists() else {'block_sounds': {}}
+    if sound_definitions.exists():
+        definitions = data_from_file(sound_definitions)
+    
+    else:
+        definitions = {
+            'format_version': '1.14.0',
+            'sound_definitions': {}
+        }
+    
+    definitions = createDefs(rp_path, block_sounds, definitions, category='block')
+    block_sound_defs = [sound for sound in list(definitions['sound_definitions']) if sound.startswith('block')]
+    for sound in block_sound_defs:
+        block_id = '{0}:{1}'.format(namespace, sound.split('.')[1])
+        # check if the block has already been added as a key
+        if block_id not in sound_data['block_sounds']: sound_data['block_sounds'][block_id] = {}
+        sound_data['block_sounds'][block_id]['volume'] = 1.0
+        sound_data['block_sounds'][block_id]['pitch'] = 1.0
+        # add the sound event to the sounds
+        sound_event = sound.split('.')[-1] if sound.split('.')[-1] != 'use' else 'item.use.on'
+        assert (sound_event in ['break', 'hit', 'item.use.on', 'power.off', 'power.on']), 'The sound event for the block is not valid!'
+        # add the properties to the sound
+        sound_data['block_sounds'][block_id][sound_event] = {}
+        sound_data['block_sounds'][block_id][sound_event]['sound'] = sound
+        sound_data['block_sounds'][block_id][sound_event]['pitch'] = 1.0
+        sound_data['block_sounds'][block_id][sound_event]['volume'] = 1.0
+
+    write_to_file(sounds_file, sound_data)
+
+def entity_sound_definitions(rp_path: Path) -> dict:
+    """
+    Regenerates the entity sound definitions of a resource pack and returns the sound_definitions.json data
+    """
+    sounds_path = rp_path.joinpath('sounds', 'sound_definitions.json')
+    sound_defs: dict
+
+    if sounds_path.exists():
+        sound_defs = data_from_file(sounds_path)
+
+    else:
+        sound_defs = {
+            'format_version': '1.14.0',
+            'sound_definitions': {}
+        }
+
+    return createDefs(rp_path, rp_path.joinpath('sounds', 'entity'), sound_defs) or sound_defs
+
+def map_entity_sounds(entity: str, sound_defs: dict, sound_events: dict) -> dict | None:
+    """
+    Adds the automatic sound events of an entity to the sounds.json data
+
+    :param entity: the short name of the entity
+    :param sound_defs: the sound_definitions.json data
+    :param sound_events: the sounds.json data, edited in place
+    :returns: the short_name: sound map of the remaining sounds for the client entity
+    """
+    ce_sound_map = {}
+    for sound in sound_defs['sound_definitions'].keys():
+        sound_split = sound.split('.')
+        # see if the sound is in the entity category
+        if sound_split[0] == 'entity' and sound_split[1] == entity:
+            # check if the sound should be an automatic event for the entity, requires the sound file to be named correctly
+            if sound_split[-1] in ['ambient', 'hurt', 'death', 'step', 'fall', 'splash', 'attack', 'shoot']:
+                # the name of the entity will be second in the sound split
+                entity_name = sound_split[1]
+                if entity_name not in sound_events['entity_sounds']['entities']:
+                    sound_events['entity_sounds']['entities'][entity_name] = {}
+                    sound_events['entity_sounds']['entities'][entity_name]['volume'] = 1.0
+                    sound_events['entity_sounds']['entities'][entity_name]['pitch'] = 1.0
+                    sound_events['entity_sounds']['entities'][entity_name]['events'] = {}
+
+                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]] = {}
+                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]]['sound'] = sound
+                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]]['volume'] = 0.25
+                sound_events['entity_sounds']['entities'][entity_name]['events'][sound_split[-1]]['pitch'] = 1.0
+
+            else:
+                ce_sound_map[sound_split[-1]] = sound
+        # for sounds that do not to be added into the sounds.json file
+        else:
+           continue
+
+    return ce_sound_map if len(ce_sound_map) > 0 else None
+
+def implement_sounds(entity: str, rp_path: Path) -> dict:
+    """
+    Implements entity sounds for an entity
+    """
+    sounds_file = rp_path.joinpath('sounds.json')
+    sound_events: dict = {}
+
+    if sounds_file.exists():
+        sound_events = data_from_file(sounds_file)
+
+    else:
+        sound_events['entity_sounds'] = {}
+        sound_events['entity_sounds']['entities'] = {}
+
+    ce_sound_map = map_entity_sounds(entity, entity_sound_definitions(rp_path), sound_events)
+    write_to_file(sounds_file, sound_events)
+    return ce_sound_map
+
+def implement_sound_effects(rp_path: Path):
+    """
+    Implements generic sound effects that are not block or entity related
+    """
+    pass
+
+def implement_player_sounds(rp_path: Path):
+    """
+    Implements all sounds relating to the player
+    """
+
+@dataclass
+class SoundCost:
+    """The estimated memory cost of one sound file"""
+    path: str
+    category: str
+    entity: str | None
+    streamed: bool
+    info: OggInfo | None
+    flags: list[str] = field(default_factory=list)
+
+    @property
+    def resident_bytes(self) -> int:
+        """The memory the decoded sound takes up while loaded, streamed sounds are decoded a little at a time instead"""
+        return 0 if self.streamed or self.info is None else self.info.decoded_bytes
+
+def _streamed_sounds(rp_path: Path) -> set[str]:
+    """Returns the paths of the sounds marked as streamed in sound_definitions.json"""
+    data = data_from_file(rp_path.joinpath('sounds', 'sound_definitions.json')) or {}
+    definitions = data.get('sound_definitions', data)
+    streamed = set()
+    for definition in definitions.values():
+        if not isinstance(definition, dict):
+            continue
+        for sound in definition.get('sounds', []):
+            if isinstance(sound, dict) and sound.get('stream'):
+                streamed.add(sound.get('name'))
+    return streamed
+
+def _probe(path: Path) -> OggInfo | None:
+    try:
+        return read_ogg_info(path)
+    except (OSError, ValueError, IndexError):
+        return None
+
+def sound_costs(rp_path: Path, *, workers: int = None, long_seconds: float = LONG_SOUND_SECONDS) -> list[SoundCost]:
+    """
+    Reads the header of every .ogg file in a resource pack's sounds folder and estimates its memory cost
+
+    :param rp_path: the resource pack
+    :param workers: the number of threads reading headers, only the start and end of each file are read
+    :param long_seconds: sounds longer than this that are not streamed are flagged
+    :returns: the cost of every sound, sorted by path
+    """
+    index = get_index(rp_path)
+    assets = index.assets(rp_path.joinpath('sounds'), '*.ogg')
+    streamed = _streamed_sounds(rp_path)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        infos = list(pool.map(_probe, [index.root.joinpath(asset.path) for asset in assets]))
+
+    costs = []
+    for asset, info in zip(assets, infos):
+        parts = asset.path.split('/')
+        category = parts[1] if len(parts) > 2 else 'sounds'
+        entity = parts[2] if category == 'entity' and len(parts) > 3 else None
+        cost = SoundCost(asset.path, category, entity, asset.path[:-len('.ogg')] in streamed, info)
+        if info is None:
+            cost.flags.append('unreadable')
+        else:
+            if category == 'entity' and info.channels > 1:
+                cost.flags.append('stereo positional sound, mono would halve its memory')
+            if info.duration > long_seconds and not cost.streamed:
+                cost.flags.append(f'{info.duration:.1f}s long and not streamed')
+        costs.append(cost)
+    return costs
+
+def _totals(costs: list[SoundCost], key) -> list[tuple[str, int, int]]:
+    """Sums the resident memory of the sounds in each group, largest group first"""
+    groups: dict[str, list[int]] = {}
+    for cost in costs:
+        name = key(cost)
+        if name is None:
+            continue
+        group = groups.setdefault(name, [0, 0])
+        group[0] += 1
+        group[1] += cost.resident_bytes
+    return sorted(((name, count, size) for name, (count, size) in groups.items()), key=lambda group: group[2], reverse=True)
+
+@app.command()
+def report(
+    rp_path: Path = typer.Argument(None, help='The resource pack whose sounds are reported'),
+    top: int = typer.Option(20, help='The number of entities and sounds using the most memory to list'),
+    long_seconds: float = typer.Option(LONG_SOUND_SECONDS, help='Sounds longer than this should be streamed'),
+    workers: int = typer.Option(None, help='Number of threads reading sound headers'),
+    json_file: Path = typer.Option(None, '--json', help='Also write every sound of the report to this JSON file')
+):
+    """
+    Estimates the memory the sounds of a resource pack take up once decoded
+    """
+    if not rp_path.joinpath('sounds').exists():
+        raise typer.BadParameter('The resource pack provided has no sounds folder', param=rp_path)
+
+    costs = sound_costs(rp_path, workers=workers, long_seconds=long_seconds)
+    total = sum(cost.resident_bytes for cost in costs)
+    print(f'{len(costs)} sounds, {format_size(total)} decoded')
+
+    print('\nBy category:')
+    for name, count, size in _totals(costs, lambda cost: cost.category):
+        print(f'  {name:<30} {count:>6} sounds {format_size(size):>12}')
+    print(f'\nLargest {top} entities:')
+    for name, count, size in _totals(costs, lambda cost: cost.entity)[:top]:
+        print(f'  {name:<30} {count:>6} sounds {format_size(size):>12}')
+    print(f'\nLargest {top} sounds:')
+    for cost in sorted(costs, key=lambda cost: cost.resident_bytes, reverse=True)[:top]:
+        info = cost.info
+        details = f'{info.channels}ch {info.sample_rate}Hz {info.duration:6.1f}s' if info else 'unreadable'
+        print(f'  {cost.path:<60} {details} {"streamed" if cost.streamed else format_size(cost.resident_bytes):>12}')
+
+    flagged = [cost for cost in costs if cost.flags]
+    if flagged:
+        print(f'\n{len(flagged)} sounds flagged:')
+        for cost in flagged:
+            print(f'  {cost.path}: {", ".join(cost.flags)}')
+
+    if json_file is not None:
+        write_to_file(json_file, {
+            'total_bytes': total,
+            'sounds': [
+                {
+                    'path': cost.path,
+                    'category': cost.category,
+                    'entity': cost.entity,
+                    'streamed': cost.streamed,
+                    'codec': cost.info.codec if cost.info else None,
+                    'channels': cost.info.channels if cost.info else None,
+                    'sample_rate': cost.info.sample_rate if cost.info else None,
+                    'duration': cost.info.duration if cost.info else None,
+                    'size': cost.info.size if cost.info else None,
+                    'decoded_bytes': cost.resident_bytes,
+                    'flags': cost.flags
+                }
+                for cost in costs
+            ]
+        })
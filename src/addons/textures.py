@@ -0,0 +1,201 @@
+"""Estimates the GPU memory taken up by the textures a resource pack uses"""
+import struct
+import typer
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from addons.assets import AssetIndex, get_index, read_png_size
+from addons.helpers import data_from_file, format_size, write_to_file
+
+app = typer.Typer()
+BYTES_PER_PIXEL = 4 # textures are uploaded as uncompressed RGBA8
+TEXTURE_SUFFIXES = ['.png', '.tga']
+
+@dataclass
+class TextureCost:
+    """The estimated memory of one texture file and what uses it"""
+    path: str
+    width: int | None
+    height: int | None
+    mip_levels: int = 0
+    users: set[str] = field(default_factory=set)
+
+    @property
+    def vram(self) -> int:
+        if self.width is None:
+            return 0
+        return mip_chain_bytes(self.width, self.height, self.mip_levels)
+
+def mip_chain_bytes(width: int, height: int, mip_levels: int) -> int:
+    """The bytes of a texture and mip_levels halved copies of it, each side stops halving at 1 pixel"""
+    total = 0
+    for level in range(mip_levels + 1):
+        total += max(1, width >> level) * max(1, height >> level) * BYTES_PER_PIXEL
+    return total
+
+def read_tga_size(path: Path) -> tuple[int, int] | None:
+    """Reads the dimensions of a tga from its header"""
+    with open(path, 'rb') as f:
+        header = f.read(18)
+    if len(header) < 18:
+        return None
+    return struct.unpack_from('<HH', header, 12)
+
+def read_texture_size(path: Path) -> tuple[int, int] | None:
+    """Reads the dimensions of a png or tga from its header, None if it is unreadable"""
+    try:
+        return read_tga_size(path) if path.suffix == '.tga' else read_png_size(path)
+    except OSError:
+        return None
+
+def find_texture(index: AssetIndex, rp_path: Path, path: str) -> Path | None:
+    """Finds the file of a texture path, which is relative to the pack and has no extension"""
+    return next((rp_path.joinpath(path + suffix) for suffix in TEXTURE_SUFFIXES if index.is_file(rp_path.joinpath(path + suffix))), None)
+
+def texture_paths(textures: Any) -> list[str]:
+    """Returns the paths in any of the forms a texture reference takes: a path, a list of them or variations with weights"""
+    if isinstance(textures, str):
+        return [textures]
+    if isinstance(textures, dict):
+        return texture_paths(textures.get('path'))
+    if isinstance(textures, list):
+        return [path for texture in textures for path in texture_paths(texture)]
+    return []
+
+def texture_references(rp_path: Path) -> tuple[dict[str, set[str]], set[str]]:
+    """
+    Collects the textures used by the client entities, blocks, items and flipbooks of a resource pack
+
+    :returns: the users of each texture path, which is relative to the pack and has no extension,
+        and the paths of the textures that are part of the terrain atlas
+    """
+    references: dict[str, set[str]] = {}
+    terrain_paths: set[str] = set()
+
+    def use(path: str, user: str) -> None:
+        references.setdefault(path.replace('\\', '/'), set()).add(user)
+
+    index = get_index(rp_path)
+    for entity_file in index.rglob(rp_path.joinpath('entity'), '*.json'):
+        try:
+            description = data_from_file(entity_file)['minecraft:client_entity']['description']
+        except (KeyError, TypeError, ValueError):
+            continue
+        for path in (description.get('textures') or {}).values():
+            use(path, f'entity {description.get("identifier", entity_file.stem)}')
+
+    terrain = data_from_file(rp_path.joinpath('textures', 'terrain_texture.json')) or {}
+    blocks = data_from_file(rp_path.joinpath('blocks.json')) or {}
+    block_users: dict[str, set[str]] = {}
+    for identifier, block in blocks.items():
+        if not isinstance(block, dict):
+            continue
+        textures = block.get('textures')
+        for name in ([textures] if isinstance(textures, str) else list((textures or {}).values())):
+            block_users.setdefault(name, set()).add(f'block {identifier}')
+    for name, entry in (terrain.get('texture_data') or {}).items():
+        for path in texture_paths(entry.get('textures')):
+            terrain_paths.add(path)
+            for user in block_users.get(name) or {f'terrain {name}'}:
+                use(path, user)
+
+    for flipbook in data_from_file(rp_path.joinpath('textures', 'flipbook_textures.json')) or []:
+        path = flipbook.get('flipbook_texture')
+        if path:
+            terrain_paths.add(path)
+            for user in block_users.get(flipbook.get('atlas_tile')) or {f'flipbook {flipbook.get("atlas_tile")}'}:
+                use(path, user)
+
+    items = data_from_file(rp_path.joinpath('textures', 'item_texture.json')) or {}
+    for name, entry in (items.get('texture_data') or {}).items():
+        for path in texture_paths(entry.get('textures')):
+            use(path, f'item {name}')
+    return references, terrain_paths
+
+def texture_costs(rp_path: Path, *, mip_levels: int = None, workers: int = None) -> list[TextureCost]:
+    """
+    Estimates the memory of every texture a resource pack uses
+
+    Dimensions come from the asset index, which reads them from the png headers, textures it has no dimensions for
+    are read from their headers in a thread pool. Terrain textures are counted with their mip chain.
+
+    :param mip_levels: the mip levels of terrain textures, by default num_mip_levels of terrain_texture.json
+    :param workers: the number of threads reading headers
+    :returns: the cost of every texture, missing textures have no dimensions
+    """
+    index = get_index(rp_path)
+    references, terrain_paths = texture_references(rp_path)
+    if mip_levels is None:
+        terrain = data_from_file(rp_path.joinpath('textures', 'terrain_texture.json')) or {}
+        mip_levels = terrain.get('num_mip_levels', 0)
+
+    costs: list[TextureCost] = []
+    unsized: list[tuple[TextureCost, Path]] = []
+    for path, users in sorted(references.items()):
+        found = find_texture(index, rp_path, path)
+        cost = TextureCost(path if found is None else path + found.suffix, None, None, mip_levels if path in terrain_paths else 0, users)
+        costs.append(cost)
+        if found is None:
+            continue
+        asset = index.get(found)
+        if asset is not None and asset.width is not None:
+            cost.width, cost.height = asset.width, asset.height
+        else:
+            unsized.append((cost, found))
+
+    if unsized:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for (cost, _), size in zip(unsized, pool.map(read_texture_size, [found for _, found in unsized])):
+                if size is not None:
+                    cost.width, cost.height = size
+    return costs
+
+@app.command()
+def budget(
+    rp_path: Path = typer.Argument(None, help='The resource pack whose textures are measured'),
+    top: int = typer.Option(20, help='The number of entities, blocks and textures using the most memory to list'),
+    mip_levels: int = typer.Option(None, help='The mip levels of terrain textures, defaults to num_mip_levels of terrain_texture.json'),
+    workers: int = typer.Option(None, help='Number of threads reading texture headers'),
+    json_file: Path = typer.Option(None, '--json', help='Also write every texture of the budget to this JSON file')
+):
+    """
+    Estimates the GPU memory of the textures used by the entities, blocks and items of a resource pack
+    """
+    if not rp_path.exists():
+        raise typer.BadParameter('The resource pack provided DNE', param=rp_path)
+
+    costs = texture_costs(rp_path, mip_levels=mip_levels, workers=workers)
+    total = sum(cost.vram for cost in costs)
+    print(f'{len(costs)} textures, {format_size(total)} of video memory')
+
+    groups: dict[str, int] = {}
+    for cost in costs:
+        for user in cost.users:
+            groups[user] = groups.get(user, 0) + cost.vram
+    for kind in ['entity', 'block']:
+        totals = sorted(((user, size) for user, size in groups.items() if user.startswith(kind + ' ')), key=lambda group: group[1], reverse=True)
+        if totals:
+            print(f'\nLargest {min(top, len(totals))} of {len(totals)} {"entities" if kind == "entity" else "blocks"}:')
+            for user, size in totals[:top]:
+                print(f'  {user.split(" ", 1)[1]:<50} {format_size(size):>12}')
+
+    print(f'\nLargest {min(top, len(costs))} textures:')
+    for cost in sorted(costs, key=lambda cost: cost.vram, reverse=True)[:top]:
+        mips = f' +{cost.mip_levels} mips' if cost.mip_levels else ''
+        print(f'  {cost.path:<60} {cost.width}x{cost.height}{mips} {format_size(cost.vram):>12}')
+
+    missing = [cost for cost in costs if cost.width is None]
+    if missing:
+        print(f'\n{len(missing)} textures are missing or unreadable:')
+        for cost in missing:
+            print(f'  {cost.path} used by {", ".join(sorted(cost.users))}')
+
+    if json_file is not None:
+        write_to_file(json_file, {
+            'total_bytes': total,
+            'textures': [
+                {'path': cost.path, 'width': cost.width, 'height': cost.height, 'mip_levels': cost.mip_levels, 'bytes': cost.vram, 'users': sorted(cost.users)}
+                for cost in costs
+            ]
+        })
@@ -0,0 +1,147 @@
+"""Buffers the files a command writes so each one is written once, atomically and only if it changed"""
+import filecmp
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+from addons import metrics
+
+_active: 'Transaction | None' = None
+
+def write_atomic(path: Path, data: bytes | Iterable[bytes]) -> bool:
+    """Writes a file through a temporary file and a rename, leaving it untouched if it already holds data
+
+    :param data: the contents or chunks of them, chunks are streamed to the temporary file and compared once written
+    :returns: whether the file was written
+    """
+    path = Path(path)
+    if isinstance(data, bytes):
+        try:
+            if path.stat().st_size == len(data) and path.read_bytes() == data:
+                metrics.count(metrics.FILES_UNCHANGED)
+                return False
+        except FileNotFoundError:
+            pass
+        data = [data]
+        compare = False
+    else:
+        compare = True
+    temp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with temp_path.open('wb') as f:
+            for chunk in data:
+                f.write(chunk)
+            size = f.tell()
+        if compare and path.is_file() and filecmp.cmp(temp_path, path, shallow=False):
+            temp_path.unlink()
+            metrics.count(metrics.FILES_UNCHANGED)
+            return False
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    metrics.count(metrics.FILES_WRITTEN)
+    metrics.count(metrics.BYTES_WRITTEN, size)
+    return True
+
+class Transaction:
+    """The contents of every file written since the transaction began, keyed by absolute path
+
+    Writing a file twice keeps only the last contents and reading a written file returns the buffered contents.
+    Nothing reaches the disk until commit, and files whose bytes are unchanged are never rewritten,
+    so their modified times stay the same.
+    """
+    def __init__(self):
+        self.__pending: dict[Path, bytes] = {}
+        self.__committed: list[Path] = []
+
+    @property
+    def pending(self) -> list[Path]:
+        return list(self.__pending)
+
+    @property
+    def committed(self) -> list[Path]:
+        """The files that changed on disk at the last commit"""
+        return list(self.__committed)
+
+    def pending_bytes(self, path: Path) -> bytes | None:
+        """Returns the buffered contents of a file, None if it was not written in this transaction"""
+        return self.__pending.get(Path(path).absolute())
+
+    def read_bytes(self, path: Path) -> bytes | None:
+        """Returns the contents of a file as written in this transaction, None if it does not exist"""
+        data = self.pending_bytes(path)
+        if data is not None:
+            return data
+        try:
+            return Path(path).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write_bytes(self, path: Path, data: bytes | Iterable[bytes]) -> None:
+        path = Path(path).absolute()
+        if not path.parent.is_dir():
+            # fail where the write happens rather than at commit, as writing the file directly would
+            raise FileNotFoundError(f'No such file or directory: {str(path)!r}')
+        self.__pending[path] = data if isinstance(data, bytes) else b''.join(data)
+
+    def commit(self) -> list[Path]:
+        """Writes the buffered files
+
+        :returns: the files that changed on disk
+        """
+        written = [path for path, data in self.__pending.items() if write_atomic(path, data)]
+        self.__pending.clear()
+        self.__committed = written
+        return written
+
+    def rollback(self) -> None:
+        self.__pending.clear()
+
+def active() -> Transaction | None:
+    """Returns the transaction the current command is writing through, if any"""
+    return _active
+
+def pending_bytes(path: Path) -> bytes | None:
+    """Returns the contents of a file written in the active transaction, None if it was not"""
+    return None if _active is None else _active.pending_bytes(path)
+
+def read_bytes(path: Path) -> bytes | None:
+    """Returns the contents of a file including writes in the active transaction, None if it does not exist"""
+    if _active is not None:
+        return _active.read_bytes(path)
+    try:
+        return Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+
+def write_bytes(path: Path, data: bytes | Iterable[bytes]) -> None:
+    """Buffers a file in the active transaction or, outside of one, writes it straight away if it changed
+
+    :param data: the contents or chunks of them, chunks are streamed to disk when there is no transaction
+    """
+    if _active is not None:
+        _active.write_bytes(path, data)
+    else:
+        write_atomic(path, data)
+
+@contextmanager
+def transaction() -> Iterator[Transaction]:
+    """Buffers every file written inside the block and commits them when it exits without an error
+
+    A transaction started inside another one joins it, so the files are committed once by the outermost block.
+    If the block raises, nothing it wrote is committed.
+    """
+    global _active
+    if _active is not None:
+        yield _active
+        return
+    _active = current = Transaction()
+    try:
+        yield current
+    except BaseException:
+        current.rollback()
+        raise
+    finally:
+        _active = None
+    current.commit()
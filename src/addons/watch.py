@@ -0,0 +1,315 @@
+"""Watches a project's packs and rebuilds only what a change affects
+
+Files are watched with inotify where it is available and by polling their modified times elsewhere.
+Saves are gathered until the packs have been quiet for a moment, so an editor or exporter writing
+many files at once triggers one rebuild.
+"""
+import ctypes
+import ctypes.util
+import os
+from errno import ENOENT
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from colorama import Fore, Style
+from addons.answers import set_interactive
+from addons.assets import CACHE_DIR, get_index
+from addons.cache import BuildCache
+from addons.entity.pipeline import DefineOptions, SharedOutputs, cache_key, define_cached
+from addons.graph import ENTITY_SOUNDS, REBUILT, UNCHANGED, BuildStep, DependencyGraph, read_behavior_names, read_short_name, run_step
+from addons.sounds import entity_sound_definitions
+from addons.transaction import transaction
+
+DEBOUNCE_SECONDS = 0.3
+POLL_SECONDS = 0.5
+
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct('iIII') # wd, mask, cookie and the length of the name that follows
+
+def is_ignored(path: Path) -> bool:
+    """Whether a path is one the tools write for themselves: the cache folder, temporary and hidden files"""
+    return CACHE_DIR in path.parts or path.name.startswith('.') or path.name.endswith('~')
+
+class PollingWatcher:
+    """Finds changed files by comparing the modified time and size of every file between scans"""
+    def __init__(self, roots: list[Path], interval: float = POLL_SECONDS):
+        self.__roots: list[Path] = roots
+        self.__interval: float = interval
+        self.__snapshot: dict[str, tuple[int, int]] = self.__scan()
+
+    def __scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        stack = [os.fspath(root) for root in self.__roots]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for entry in entries:
+                if entry.name == CACHE_DIR:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    continue
+        return snapshot
+
+    def read(self, timeout: float | None) -> set[Path]:
+        """Waits up to timeout seconds, forever if None, and returns the files changed since the last read"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.__interval if deadline is None else min(self.__interval, max(0, deadline - time.monotonic()))
+            time.sleep(wait)
+            snapshot = self.__scan()
+            changed = {path for path, stat in snapshot.items() if self.__snapshot.get(path) != stat}
+            changed.update(path for path in self.__snapshot if path not in snapshot)
+            self.__snapshot = snapshot
+            changed = {Path(path) for path in changed if not is_ignored(Path(path))}
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+class InotifyWatcher:
+    """Receives the files changed from the kernel's inotify events, every directory under the roots is watched"""
+    def __init__(self, roots: list[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.__add_watch = libc.inotify_add_watch
+        self.__add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.__fd: int = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.__roots: list[Path] = roots
+        self.__dirs: dict[int, Path] = {}
+        try:
+            for root in roots:
+                self.__watch_tree(root)
+        except OSError:
+            os.close(self.__fd)
+            raise
+
+    def __watch_tree(self, folder: Path) -> list[Path]:
+        """Watches a directory and every directory under it, returns the files already in them"""
+        files = []
+        for dir_path, dir_names, file_names in os.walk(folder):
+            dir_names[:] = [name for name in dir_names if name != CACHE_DIR]
+            wd = self.__add_watch(self.__fd, os.fsencode(dir_path), _WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if errno == ENOENT:
+                    continue # removed again before it could be watched
+                raise OSError(errno, f'Could not watch {dir_path}: {os.strerror(errno)}')
+            self.__dirs[wd] = Path(dir_path)
+            files.extend(Path(dir_path, name) for name in file_names)
+        return files
+
+    def read(self, timeout: float | None) -> set[Path]:
+        """Waits up to timeout seconds, forever if None, and returns the files changed since the last read"""
+        changed: set[Path] = set()
+        if not select.select([self.__fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            try:
+                data = os.read(self.__fd, 1 << 16)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, pos)
+                name = data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b'\0')
+                pos += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    # events were dropped, so every file is reported as changed
+                    for root in self.__roots:
+                        changed.update(Path(dir_path, name) for dir_path, _, names in os.walk(root) for name in names)
+                    continue
+                folder = self.__dirs.get(wd)
+                if folder is None or not name:
+                    continue
+                path = folder.joinpath(os.fsdecode(name))
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and path.name != CACHE_DIR:
+                        # files can land in a new folder before it is watched, so they are reported with it
+                        changed.update(self.__watch_tree(path))
+                    continue
+                changed.add(path)
+        return {path for path in changed if not is_ignored(path)}
+
+    def close(self) -> None:
+        os.close(self.__fd)
+
+def create_watcher(roots: list[Path], *, polling: bool = False) -> InotifyWatcher | PollingWatcher:
+    """Watches the roots with inotify, falling back to polling where it is unavailable or polling is asked for"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass # no inotify in this libc or too many watches, polling works everywhere
+    return PollingWatcher(roots)
+
+def wait_for_changes(watcher: InotifyWatcher | PollingWatcher, debounce: float = DEBOUNCE_SECONDS) -> set[Path]:
+    """Blocks until files change, then keeps gathering changes until none arrive for debounce seconds"""
+    changed = set()
+    while not changed:
+        changed = watcher.read(None)
+    while True:
+        more = watcher.read(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+_BEHAVIOR_FOLDERS = {'entities': 'entity', 'blocks': 'block', 'items': 'item'}
+
+class ProjectBuilder:
+    """Rebuilds the parts of a project that changed, keeping what it reads between rebuilds
+
+    The build cache, sound definitions and the dependency graph of the project are loaded once
+    and kept up to date, so a rebuild only reads the files of what it defines.
+    """
+    def __init__(self, bp_path: Path, rp_path: Path, options: DefineOptions, *, rp_name: str = 'Resource Pack', namespace: str = 'custom'):
+        self.bp_path: Path = Path(bp_path).absolute()
+        self.rp_path: Path = Path(rp_path).absolute()
+        self.options: DefineOptions = options
+        self.rp_name: str = rp_name
+        self.namespace: str = namespace
+        self.__cache = BuildCache(self.rp_path)
+        self.__sound_defs: dict | None = None
+        self.__written: dict[Path, tuple[int, int]] = {}
+        self.__names: dict[str, dict[Path, str]] = read_behavior_names(self.bp_path)
+        self.__graph = DependencyGraph.from_names(self.rp_path, self.__names, options)
+
+    @property
+    def graph(self) -> DependencyGraph:
+        return self.__graph
+
+    @property
+    def sound_defs(self) -> dict:
+        if self.__sound_defs is None:
+            self.__sound_defs = entity_sound_definitions(self.rp_path)
+        return self.__sound_defs
+
+    def __wrote(self, path: Path) -> bool:
+        """Whether a file is exactly as the last rebuild wrote it"""
+        recorded = self.__written.get(path)
+        if recorded is None:
+            return False
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        return recorded == (stat.st_mtime_ns, stat.st_size)
+
+    def __update_names(self, paths: list[Path]) -> None:
+        """Rereads the identifiers of changed behavior files, rebuilding the graph if an entity, block or item was added, renamed or removed"""
+        changed = False
+        for path in paths:
+            if not path.is_relative_to(self.bp_path) or path.suffix != '.json':
+                continue
+            kind = _BEHAVIOR_FOLDERS.get(path.relative_to(self.bp_path).parts[0])
+            if kind is None:
+                continue
+            names = self.__names[kind]
+            name = read_short_name(path, kind)
+            if name is None:
+                if names.pop(path, None) is not None:
+                    changed = True
+                if kind == 'entity' and not path.exists():
+                    self.__cache.forget(cache_key(self.rp_path, path))
+            elif names.get(path) != name:
+                names[path] = name
+                changed = True
+        if changed:
+            self.__graph = DependencyGraph.from_names(self.rp_path, self.__names, self.options)
+
+    def plan(self, paths: set[Path]) -> list[list[BuildStep]]:
+        """Orders the steps to rebuild for a set of changed files, leaving out the files the last rebuild wrote"""
+        paths = [path for path in (Path(path).absolute() for path in paths) if not self.__wrote(path)]
+        self.__update_names(paths)
+        return self.__graph.plan(paths) if paths else []
+
+    def __record(self, written: list[Path]) -> None:
+        """Remembers the files a rebuild wrote so the events they cause are not mistaken for edits"""
+        for path in written:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self.__written[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def __define_entity(self, entity_file: Path) -> str:
+        key = cache_key(self.rp_path, entity_file)
+        result = define_cached(self.rp_path, entity_file, self.options, SharedOutputs(), self.__cache.get(key), sound_defs=self.sound_defs)
+        if result.skipped:
+            return UNCHANGED
+        result.outputs.write(self.rp_path)
+        self.__cache.record(key, result.cache_entry)
+        return REBUILT
+
+    def __run(self, step: BuildStep) -> str:
+        """Runs a step in its own transaction, so one that fails leaves the others written"""
+        try:
+            with transaction() as current:
+                if step.kind == 'entity':
+                    status = self.__define_entity(step.source)
+                elif step.key == ENTITY_SOUNDS:
+                    # kept for the entities defined after it instead of being read again for each of them
+                    self.__sound_defs = entity_sound_definitions(self.rp_path)
+                    status = REBUILT
+                else:
+                    run_step(step, self.rp_path, self.options, rp_name=self.rp_name, namespace=self.namespace)
+                    status = REBUILT
+        except Exception as exc:
+            return f'{type(exc).__name__}: {exc}'
+        self.__record(current.committed)
+        return status
+
+    def rebuild(self, batches: list[list[BuildStep]]) -> dict[str, str]:
+        """
+        Runs the steps of a plan in this process, reusing the state kept between rebuilds
+
+        :returns: the outcome of each step, REBUILT, UNCHANGED or the error it failed with
+        """
+        for pack_path in [self.bp_path, self.rp_path]:
+            index = get_index(pack_path)
+            index.refresh()
+            index.save()
+        results = {step.key: self.__run(step) for batch in batches for step in batch}
+        self.__cache.save()
+        return results
+
+def watch_project(builder: ProjectBuilder, *, debounce: float = DEBOUNCE_SECONDS, polling: bool = False) -> None:
+    """Rebuilds what changes in the builder's packs until interrupted"""
+    set_interactive(False) # a prompt would block every rebuild after it, unanswered questions fail the step instead
+    watcher = create_watcher([builder.bp_path, builder.rp_path], polling=polling)
+    print(f'Watching {builder.bp_path.name} and {builder.rp_path.name} with {"inotify" if isinstance(watcher, InotifyWatcher) else "polling"}, press Ctrl+C to stop')
+    try:
+        while True:
+            batches = builder.plan(wait_for_changes(watcher, debounce))
+            if not batches:
+                continue
+            start = time.perf_counter()
+            results = builder.rebuild(batches)
+            for label, status in results.items():
+                color = Fore.GREEN if status == REBUILT else Fore.YELLOW if status == UNCHANGED else Fore.RED
+                print(f'{color}{label}: {status}{Style.RESET_ALL}')
+            print(f'Rebuilt in {time.perf_counter() - start:.2f}s')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -1,17 +1,83 @@
-import addons.entity.cmds as entity
+import importlib
+from contextlib import ExitStack
+from pathlib import Path
+import click
 import typer
-import addons.project as project
-import addons.items as items
-import addons.blocks as blocks
+from typer.core import TyperGroup
 # import conversions.app as conversions
 
-app = typer.Typer()
+class LazyGroup(TyperGroup):
+    """Imports the module of a subcommand only when that subcommand is run
 
-app.add_typer(project.app, name='project')
-app.add_typer(entity.app, name='entity')
-app.add_typer(items.app, name='items')
-app.add_typer(blocks.app, name='blocks')
-# app.add_typer(conversions.app, name='convert')
+    The help listing uses the help strings below, so --help imports none of the subcommands
+    """
+    lazy_commands: dict[str, tuple[str, str]] = {
+        'project': ('addons.project', 'Create, package and export projects'),
+        'entity': ('addons.entity.cmds', 'Define entities and their client files'),
+        'items': ('addons.items', 'Define items'),
+        'blocks': ('addons.blocks', 'Define blocks'),
+        'sounds': ('addons.sounds', 'Report on the sounds of a resource pack'),
+        'textures': ('addons.textures', 'Measure the textures of a resource pack'),
+        'optimize': ('addons.optimize', 'Losslessly shrink the assets of a resource pack'),
+        # 'convert': ('conversions.app', 'Convert projects'),
+    }
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, help = self.lazy_commands[cmd_name]
+            group = typer.main.get_group(importlib.import_module(module_name).app)
+            group.name = cmd_name
+            group.help = group.help or help
+            self.add_command(group, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def invoke(self, ctx: click.Context):
+        # the subcommand's module is imported inside invoke, so measuring here includes its import time
+        profile, metrics = ctx.params.get('profile'), ctx.params.get('metrics')
+        if profile is None and metrics is None:
+            return super().invoke(ctx)
+        with ExitStack() as stack:
+            if metrics is not None:
+                from addons.metrics import recording
+                words = [word for word in [*ctx.protected_args, *ctx.args][:2] if not word.startswith('-')]
+                stack.enter_context(recording(metrics, command=' '.join(words)))
+            if profile is not None:
+                from addons.profiling import profiled
+                stack.enter_context(profiled(profile, top=ctx.params.get('profile_top')))
+            return super().invoke(ctx)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        rows = []
+        for cmd_name in self.list_commands(ctx):
+            if cmd_name in self.commands:
+                command = self.commands[cmd_name]
+                if not command.hidden:
+                    rows.append((cmd_name, command.get_short_help_str(formatter.width)))
+            else:
+                rows.append((cmd_name, self.lazy_commands[cmd_name][1]))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+app = typer.Typer(cls=LazyGroup)
+
+@app.callback()
+def main(
+    release: bool = typer.Option(False, help='Write minified JSON with rounded floats, for packs being shipped'),
+    float_precision: int = typer.Option(None, min=0, help='The decimal places floats are rounded to with --release, by default enough for 1/32 steps'),
+    profile: Path = typer.Option(None, dir_okay=False, help='Profile the command and write the pstats to this file, with the collapsed stacks flamegraph tools read next to it as .collapsed'),
+    profile_top: int = typer.Option(20, min=0, help='The number of functions with the most cumulative time printed after a profiled command'),
+    metrics: Path = typer.Option(None, dir_okay=False, help='Write the time, file counts and bytes of each phase of the command to this file, as JSON if it ends in .json and as OpenMetrics text otherwise')
+) -> None:
+    """Tools for creating Minecraft Bedrock Edition add-ons"""
+    from addons import jsonformat
+    if float_precision is None:
+        jsonformat.set_release(release)
+    else:
+        jsonformat.set_release(release, float_precision)
 
 if __name__ == '__main__':
     app()
\ No newline at end of file